@@ -5,10 +5,44 @@ Module d'Analyse de Fichiers Log - CYBER FORGE SCAN
 Extrait et analyse les données sensibles depuis les fichiers log
 """ 
 
+import bz2
+import calendar
+import codecs
+import csv
+import fnmatch
+import gzip
+import hashlib
+import heapq
+import io
+import ipaddress
+import json
+import lzma
+import mmap
 import os
+import queue
 import re
+import sqlite3
+import struct
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
-from typing import Tuple, List
+from functools import lru_cache, partial
+from typing import BinaryIO, Callable, Dict, Iterator, Optional, TextIO, Tuple, List, Union
+
+from Esquisses import HyperLogLog, SpaceSaving, TDigest
+from Gabarits import MineurGabarits
+from Menaces import FICHIER_CACHE_IOC, ListesIOC
+from Secrets import DetecteurSecrets, empreinte_secret, masquer, masquer_texte
+
+try:
+    import numpy as np
+except ImportError:  # numpy facultatif: repli sur array('q') et boucles Python
+    np = None
 
 # ============================================================================
 # CONFIGURATION
@@ -50,46 +84,59 @@ class Colors:
 # FONCTIONS D'EXTRACTION
 # ============================================================================
 
+# Motifs précompilés une seule fois au chargement du module. Sémantique ASCII (\b, \d),
+# comme leurs versions octets du parcours par blocs: une lettre accentuée ne fait pas
+# partie d'un mot, et une ligne donne les mêmes entités quel que soit le parcours
+RE_EMAIL = re.compile(
+    r"\b[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\b", re.ASCII
+)
+# Les anticipations (?=...) rejettent vite les positions sans chiffre
+# sans changer l'ensemble des correspondances
+RE_IP = re.compile(
+    r"\b(?=\d{1,3}\.)(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\b",
+    re.ASCII
+)
+# Blancs horizontaux seulement avant AM/PM: une correspondance ne franchit pas une fin de ligne
+RE_HEURE = re.compile(
+    r"\b[0-2]?[0-9]:[0-5][0-9](?::[0-5][0-9])?(?:[ \t\f\v]?(?:AM|PM|am|pm))?\b", re.ASCII
+)
+RE_DATE = re.compile(
+    r"\b(?=\d{1,4}[/-])(?:\d{1,2}[/-]\d{1,2}[/-]\d{2,4}|\d{4}[/-]\d{1,2}[/-]\d{1,2})\b", re.ASCII
+)
+RE_URL = re.compile(
+    r"https?://(?:www\.)?[-a-zA-Z0-9@:%._+~#=]{1,256}\.[a-zA-Z0-9()]{1,6}\b(?:[-a-zA-Z0-9()@:%_+.~#?&/=]*)",
+    re.ASCII
+)
+
+# Méthodes liées, évitent la recherche d'attribut à chaque ligne
+_trouver_emails = RE_EMAIL.findall
+_trouver_ips = RE_IP.findall
+_trouver_heures = RE_HEURE.findall
+_trouver_dates = RE_DATE.findall
+_trouver_urls = RE_URL.findall
+
+
 def extraire_info_ligne(ligne: str) -> Tuple[List[str], List[str], List[str], List[str], List[str]]:
     """
     Extrait les informations structurées d'une ligne de log
-    
+
+    Chaque motif n'est lancé que si son caractère déclencheur est présent
+    dans la ligne ('@' pour les emails, '.' pour les IPs, ':' pour les heures,
+    '/' ou '-' pour les dates, '://' pour les liens). Un motif sans déclencheur
+    ne peut pas correspondre : le résultat est identique à cinq findall complets.
+
     Args:
         ligne: Ligne de texte à analyser
-    
+
     Returns:
         Tuple (emails, ips, heures, dates, liens)
     """
-    # Extraction des emails (RFC 5322 simplifié)
-    emails = re.findall(
-        r"\b[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\b", 
-        ligne
-    )
-    
-    # Extraction des adresses IPv4
-    ips = re.findall(
-        r"\b(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\b", 
-        ligne
-    )
-    
-    # Extraction des heures (formats: HH:MM, HH:MM:SS, avec AM/PM optionnel)
-    heures = re.findall(
-        r"\b[0-2]?[0-9]:[0-5][0-9](?::[0-5][0-9])?(?:\s?(?:AM|PM|am|pm))?\b", 
-        ligne
-    )
-    
-    # Extraction des dates (formats: DD/MM/YYYY, DD-MM-YYYY, YYYY-MM-DD)
-    dates = re.findall(
-        r"\b(?:\d{1,2}[/-]\d{1,2}[/-]\d{2,4}|\d{4}[/-]\d{1,2}[/-]\d{1,2})\b", 
-        ligne
-    )
-
-    #Extractions des liens(http//https//w.w.w...)
-    urls= re.findall(
-        r"https?://(?:www\.)?[-a-zA-Z0-9@:%._+~#=]{1,256}\.[a-zA-Z0-9()]{1,6}\b(?:[-a-zA-Z0-9()@:%_+.~#?&/=]*)",
-        ligne
-    )
-    
+    emails = _trouver_emails(ligne) if "@" in ligne else []
+    ips = _trouver_ips(ligne) if "." in ligne else []
+    heures = _trouver_heures(ligne) if ":" in ligne else []
+    dates = _trouver_dates(ligne) if ("/" in ligne or "-" in ligne) else []
+    urls = _trouver_urls(ligne) if "://" in ligne else []
+
     return emails, ips, heures, dates, urls
 
 def valider_ip(ip: str) -> bool:
@@ -102,148 +149,5267 @@ def valider_ip(ip: str) -> bool:
     Returns:
         True si valide, False sinon
     """
-    octets = ip.split('.')
-    return all(0 <= int(octet) <= 255 for octet in octets)
+    octets = ip.split('.')
+    return all(0 <= int(octet) <= 255 for octet in octets)
+
+# ============================================================================
+# REGISTRE DES TYPES D'ENTITÉS
+# ============================================================================
+
+# Chaque type d'entité déclare un motif et des déclencheurs littéraux: son motif n'est
+# lancé sur une ligne (ou un bloc) que si l'un de ses déclencheurs y figure. Un type sans
+# littéral possible (empreintes hexadécimales) déclare à la place un préfiltre. Les cinq
+# catégories historiques gardent leur extraction dédiée (extraire_info_ligne et analyseurs
+# de format); les autres types du registre sont extraits en plus, un plan compilé par
+# combinaison de types. Les motifs restent séparés: le moteur re essaie chaque alternative
+# à chaque position, un motif unique à groupes nommés serait plus lent que des findall
+# qui profitent chacun de leur préfixe. Les types dont le déclencheur figure sur presque
+# toutes les lignes (':' des IPv6 et MAC, '.' des domaines) doublent le temps d'analyse:
+# ils ne sont pas actifs par défaut.
+
+
+class TypeEntite:
+    """Type d'entité extrait des lignes: motif, déclencheurs et présentation"""
+
+    __slots__ = ("categorie", "enregistrement", "libelle", "icone", "motif", "declencheurs", "valider", "actif",
+                 "prefiltre")
+
+    def __init__(self, categorie: str, enregistrement: str, libelle: str, icone: str, motif: str,
+                 declencheurs: Tuple[str, ...] = (), valider: Callable[[str], bool] = None,
+                 actif: bool = True, prefiltre: Callable[[object], bool] = None):
+        """
+        Args:
+            categorie: Nom de la catégorie ("ipv6")
+            enregistrement: Type des enregistrements NDJSON/CSV et de l'index ("ipv6")
+            libelle: Intitulé des rapports ("Adresses IPv6")
+            icone: Emoji des rapports
+            motif: Expression régulière ASCII qui ne franchit pas les fins de ligne; un groupe
+                capturant unique désigne la valeur, sinon toute la correspondance
+            declencheurs: Chaînes ASCII dont l'une doit figurer dans la ligne (vide = toujours lancé)
+            valider: Filtre appliqué aux valeurs trouvées (optionnel)
+            actif: Extrait par défaut (sinon seulement sur demande, EtatAnalyse.choisir_entites)
+            prefiltre: Test rapide d'une ligne (str) ou d'un bloc (octets) remplaçant les
+                déclencheurs: le motif n'est lancé que s'il est vrai (optionnel)
+        """
+        if re.compile(motif).groups > 1:
+            raise ValueError(f"Le motif de {categorie} a plus d'un groupe capturant")
+        self.categorie = categorie
+        self.enregistrement = enregistrement
+        self.libelle = libelle
+        self.icone = icone
+        self.motif = motif
+        self.declencheurs = tuple(declencheurs)
+        self.valider = valider
+        self.actif = actif
+        self.prefiltre = prefiltre
+
+
+# Types connus, dans l'ordre des rapports
+REGISTRE_ENTITES: Dict[str, TypeEntite] = {}
+
+
+def enregistrer_entite(categorie: str, enregistrement: str, libelle: str, icone: str, motif: str,
+                       declencheurs: Tuple[str, ...] = (), valider: Callable[[str], bool] = None,
+                       actif: bool = True, prefiltre: Callable[[object], bool] = None) -> TypeEntite:
+    """
+    Ajoute (ou remplace) un type d'entité du registre
+
+    Les états d'analyse créés ensuite extraient ce type s'il est actif, sauf choix
+    contraire (EtatAnalyse.choisir_entites). Les arguments sont ceux de TypeEntite.
+
+    Returns:
+        Type enregistré
+    """
+    type_entite = TypeEntite(categorie, enregistrement, libelle, icone, motif, declencheurs, valider, actif,
+                             prefiltre)
+    REGISTRE_ENTITES[categorie] = type_entite
+    compiler_entites.cache_clear()
+    return type_entite
+
+
+def categories_supplementaires(toutes: bool = False) -> Tuple[str, ...]:
+    """Catégories du registre extraites en plus des cinq catégories historiques (actives, ou toutes)"""
+    return tuple(c for c, t in REGISTRE_ENTITES.items() if c not in CATEGORIES_ENTITES and (toutes or t.actif))
+
+
+@lru_cache(maxsize=32)
+def compiler_entites(categories: Tuple[str, ...], octets: bool = False) -> Tuple[tuple, ...]:
+    """
+    Compile le plan d'extraction d'une combinaison de types du registre
+
+    Args:
+        categories: Catégories du registre
+        octets: Motifs et déclencheurs en octets (parcours par blocs), sinon en str
+
+    Returns:
+        (catégorie, déclencheurs, préfiltre, findall, valider) de chaque type; un type sans
+        déclencheur reçoit la chaîne vide, toujours présente
+    """
+    plan = []
+    for categorie in categories:
+        type_entite = REGISTRE_ENTITES[categorie]
+        declencheurs = type_entite.declencheurs or ("",)
+        if octets:
+            motif = re.compile(type_entite.motif.encode("ascii"))
+            declencheurs = tuple(d.encode("ascii") for d in declencheurs)
+        else:
+            motif = re.compile(type_entite.motif, re.ASCII)
+        plan.append((categorie, declencheurs, type_entite.prefiltre, motif.findall, type_entite.valider))
+    return tuple(plan)
+
+
+def extraire_entites(texte, categories: Tuple[str, ...]) -> Dict[str, list]:
+    """
+    Extrait les entités de plusieurs types du registre
+
+    Un type dont aucun déclencheur ne figure dans le texte ne coûte qu'une
+    recherche de sous-chaîne (ou son préfiltre); son motif n'est pas lancé.
+
+    Args:
+        texte: Ligne (str) ou bloc de lignes (octets: valeurs renvoyées en octets)
+        categories: Catégories du registre à extraire
+
+    Returns:
+        Valeurs trouvées par catégorie (catégories sans valeur absentes)
+    """
+    octets = isinstance(texte, (bytes, bytearray))
+    trouvees = {}
+    for categorie, declencheurs, prefiltre, trouver, valider in compiler_entites(categories, octets):
+        if prefiltre is not None:
+            if not prefiltre(texte):
+                continue
+        else:
+            for declencheur in declencheurs:
+                if declencheur in texte:
+                    break
+            else:
+                continue
+        valeurs = trouver(texte)
+        if valeurs and valider is not None:
+            valeurs = [v for v in valeurs if valider(v.decode("ascii") if octets else v)]
+        if valeurs:
+            trouvees[categorie] = valeurs
+    return trouvees
+
+
+def _ipv6_valide(valeur: str) -> bool:
+    """Adresse IPv6 bien formée (au plus huit groupes), hors adresse non spécifiée '::'"""
+    try:
+        return valeur != "::" and ipaddress.IPv6Address(valeur) is not None
+    except ValueError:
+        return False
+
+
+def _port_valide(valeur: str) -> bool:
+    return 0 < int(valeur) <= 65535
+
+
+# Extensions de fichiers prises à tort pour des domaines ("auth.log", "sshd.service")
+EXTENSIONS_NON_DOMAINES = frozenset((
+    "log", "txt", "conf", "cfg", "ini", "json", "xml", "yml", "yaml", "csv", "html", "htm", "php",
+    "js", "css", "py", "pl", "rb", "sh", "so", "gz", "xz", "zip", "tar", "tgz", "exe", "dll", "bin",
+    "tmp", "bak", "old", "pid", "sock", "lock", "service", "socket", "timer", "target", "mount",
+    "png", "jpg", "jpeg", "gif", "ico", "svg", "pdf", "jar", "war", "class", "java", "go", "rs",
+))
+
+
+def _domaine_valide(valeur: str) -> bool:
+    return valeur.rpartition(".")[2].lower() not in EXTENSIONS_NON_DOMAINES
+
+
+# Table de translate() ramenant un texte à ses chiffres hexadécimaux ("h", le reste en " ")
+_CLASSES_HEX = bytes(0x68 if chr(octet) in "0123456789abcdefABCDEF" else 0x20 for octet in range(256))
+_SUITE_EMPREINTE = b"h" * 32
+
+
+def _suite_hexadecimale(texte) -> bool:
+    """Une suite d'au moins 32 chiffres hexadécimaux figure dans la ligne ou le bloc (translate et find)"""
+    if isinstance(texte, str):
+        # Les caractères non ASCII ignorés ne peuvent que rapprocher deux suites
+        texte = texte.encode("ascii", "ignore")
+    return _SUITE_EMPREINTE in texte.translate(_CLASSES_HEX)
+
+
+# Catégories historiques: extraction dédiée, enregistrées pour leur présentation
+enregistrer_entite("emails", "email", "Emails", "📧", RE_EMAIL.pattern, ("@",))
+enregistrer_entite("ips", "ip", "Adresses IP", "🌐", RE_IP.pattern, (".",), valider_ip)
+enregistrer_entite("heures", "heure", "Heures", "🕐", RE_HEURE.pattern.replace(r"\s", r"[ \t\f\v]"), (":",))
+enregistrer_entite("dates", "date", "Dates", "📅", RE_DATE.pattern, ("/", "-"))
+enregistrer_entite("urls", "url", "Liens", "🔗", RE_URL.pattern, ("://",))
+
+# Forme complète (huit groupes) ou abrégée par '::'; la validation écarte les groupes en trop
+_HEX4 = r"[0-9A-Fa-f]{1,4}"
+enregistrer_entite(
+    "ipv6", "ipv6", "Adresses IPv6", "🛰️",
+    rf"(?<![\w:.])(?:(?:{_HEX4}:){{7}}{_HEX4}|(?=[0-9A-Fa-f:]*::)(?:{_HEX4}(?::{_HEX4}){{0,6}})?::"
+    rf"(?:{_HEX4}(?::{_HEX4}){{0,6}})?)(?![\w:.])",
+    (":",), _ipv6_valide, actif=False)
+enregistrer_entite(
+    "macs", "mac", "Adresses MAC", "🔌",
+    r"\b(?<![:.-])[0-9A-Fa-f]{2}(?:(?::[0-9A-Fa-f]{2}){5}|(?:-[0-9A-Fa-f]{2}){5})(?![\w:.-])",
+    (":", "-"), actif=False)
+# MD5, SHA-1 ou SHA-256 selon la longueur (32, 40 ou 64 chiffres hexadécimaux)
+enregistrer_entite(
+    "empreintes", "empreinte", "Empreintes MD5/SHA-1/SHA-256", "🔑",
+    r"\b[0-9a-fA-F]{32}(?:[0-9a-fA-F]{8}(?:[0-9a-fA-F]{24})?)?\b", prefiltre=_suite_hexadecimale)
+enregistrer_entite("cves", "cve", "Identifiants CVE", "🛡️", r"\bCVE-\d{4}-\d{4,7}\b", ("CVE-",))
+enregistrer_entite(
+    "domaines", "domaine", "Domaines", "🏷️",
+    r"\b[a-zA-Z0-9][a-zA-Z0-9-]*(?:\.[a-zA-Z0-9-]+)*\.[a-zA-Z]{2,24}\b(?![@-])",
+    (".",), _domaine_valide, actif=False)
+# Numéro qui suit le mot "port 22", "sport=5353", "Port 80" ou "SPT=53", "DPT=443" (iptables),
+# pas la fin d'un mot ("Report 443", "accept 200")
+enregistrer_entite(
+    "ports", "port", "Ports", "🚪", r"\b(?:(?:[sd]?port|Port|PORT)[ =]|[SD]?PT=)(\d{1,5})\b",
+    ("port", "Port", "PORT", "PT="), _port_valide)
+
+# ============================================================================
+# FORMATS DE LOG CONNUS (DÉTECTION ET ANALYSEURS DÉDIÉS)
+# ============================================================================
+
+# Lignes de tête examinées pour reconnaître le format d'un fichier
+LIGNES_SONDAGE_FORMAT = 200
+
+# Part minimale des lignes examinées qu'un format doit reconnaître pour être retenu
+SEUIL_FORMAT = 0.6
+
+# Apache / nginx, formats commun et combiné:
+# 203.0.113.7 - bob [15/Jan/2025:08:30:12 +0100] "GET /x HTTP/1.1" 401 123 "referer" "agent"
+RE_COMBINED = re.compile(
+    r'(\S+) \S+ (\S+) \[(\d{2})/([A-Z][a-z]{2})/(\d{4}):(\d{2}:\d{2}:\d{2}) [^\]]*\] '
+    r'"([^"]*)" (\d{3}) \S+(?: "([^"]*)" "([^"]*)")?'
+)
+# Syslog RFC 3164: "<34>Jan 15 08:33:01 hote sshd[2211]: message" (priorité facultative)
+RE_SYSLOG_3164 = re.compile(r"(?:<\d{1,3}>)?[A-Z][a-z]{2} [ \d]\d (\d{2}:\d{2}:\d{2}) (\S+) (.*)")
+# Syslog RFC 5424: "<34>1 2025-01-15T08:33:01.003Z hote appli pid msgid [données] message"
+RE_SYSLOG_5424 = re.compile(r"<\d{1,3}>\d{1,2} (\d{4}-\d{2}-\d{2})T(\d{2}:\d{2}:\d{2})\S* (\S+) \S+ \S+ \S+ ?(.*)")
+# auditd: "type=USER_LOGIN msg=audit(1736929812.123:456): pid=1 ... addr=10.0.0.5 res=failed'"
+RE_AUDITD = re.compile(r"type=\S+ msg=audit\((\d+)(?:\.\d+)?:\d+\): (.*)")
+RE_CHAMP_AUDITD = re.compile(r"""(\w+)=("[^"]*"|'|\S+)""")
+
+# Champs auditd portant une adresse, clés JSON portant une date epoch
+CHAMPS_ADRESSE_AUDITD = frozenset(("addr", "laddr", "raddr", "saddr", "hostname", "ip"))
+CLES_EPOCH_JSON = frozenset(("ts", "time", "timestamp", "@timestamp", "epoch"))
+
+
+@lru_cache(maxsize=4096)
+def _date_heure_epoch(secondes: int) -> Tuple[str, str]:
+    """("AAAA-MM-JJ", "HH:MM:SS") UTC d'une date en secondes epoch"""
+    instant = time.gmtime(secondes)
+    return time.strftime("%Y-%m-%d", instant), time.strftime("%H:%M:%S", instant)
+
+
+def _entites_combined(ligne: str) -> Optional[Tuple[List[str], List[str], List[str], List[str], List[str]]]:
+    """Entités d'une ligne Apache/nginx: IP cliente, utilisateur, date, requête et référent"""
+    correspondance = RE_COMBINED.match(ligne)
+    if correspondance is None:
+        return None
+    client, utilisateur, jour, mois, annee, heure, requete, _, referent, _ = correspondance.groups()
+    numero_mois = _NUMERO_MOIS.get(mois)
+    if numero_mois is None:
+        return None
+    # L'agent utilisateur est ignoré: ses numéros de version ("Chrome/120.0.0.0") ne sont pas des IP
+    emails = _trouver_emails(utilisateur) if "@" in utilisateur else []
+    if "@" in requete:
+        emails += _trouver_emails(requete)
+    urls = _trouver_urls(requete) if "://" in requete else []
+    if referent and "://" in referent:
+        urls += _trouver_urls(referent)
+    ips = [client] if RE_IP.fullmatch(client) else []
+    return emails, ips, [heure], [f"{annee}-{numero_mois:02d}-{jour}"], urls
+
+
+def _entites_syslog_3164(ligne: str) -> Optional[Tuple[List[str], List[str], List[str], List[str], List[str]]]:
+    """Entités d'une ligne syslog RFC 3164: heure et hôte de l'en-tête, puis le message"""
+    correspondance = RE_SYSLOG_3164.match(ligne)
+    if correspondance is None:
+        return None
+    heure, hote, message = correspondance.groups()
+    emails, ips, heures, dates, urls = extraire_info_ligne(message)
+    if RE_IP.fullmatch(hote):
+        ips = [hote, *ips]
+    return emails, ips, [heure, *heures], dates, urls
+
+
+def _entites_syslog_5424(ligne: str) -> Optional[Tuple[List[str], List[str], List[str], List[str], List[str]]]:
+    """Entités d'une ligne syslog RFC 5424: date, heure et hôte de l'en-tête, puis le message"""
+    correspondance = RE_SYSLOG_5424.match(ligne)
+    if correspondance is None:
+        return None
+    date, heure, hote, message = correspondance.groups()
+    emails, ips, heures, dates, urls = extraire_info_ligne(message)
+    if RE_IP.fullmatch(hote):
+        ips = [hote, *ips]
+    return emails, ips, [heure, *heures], [date, *dates], urls
+
+
+def _entites_auditd(ligne: str) -> Optional[Tuple[List[str], List[str], List[str], List[str], List[str]]]:
+    """Entités d'un enregistrement auditd: date epoch de l'en-tête, adresses et comptes des champs"""
+    correspondance = RE_AUDITD.match(ligne)
+    if correspondance is None:
+        return None
+    epoch, reste = correspondance.groups()
+    date, heure = _date_heure_epoch(int(epoch))
+    emails, ips = [], []
+    # msg='...' regroupe les champs du module PAM: ses guillemets simples sont ignorés
+    for cle, valeur in RE_CHAMP_AUDITD.findall(reste):
+        valeur = valeur.strip("\"'")
+        if cle in CHAMPS_ADRESSE_AUDITD:
+            if RE_IP.fullmatch(valeur):
+                ips.append(valeur)
+        elif "@" in valeur:
+            emails += _trouver_emails(valeur)
+    return emails, ips, [heure], [date], []
+
+
+def _valeurs_json(objet) -> Iterator[Tuple[str, object]]:
+    """(clé, valeur) des valeurs simples d'un objet JSON, à toute profondeur"""
+    for cle, valeur in objet.items():
+        if isinstance(valeur, dict):
+            yield from _valeurs_json(valeur)
+        elif isinstance(valeur, list):
+            for element in valeur:
+                if isinstance(element, dict):
+                    yield from _valeurs_json(element)
+                else:
+                    yield cle, element
+        else:
+            yield cle, valeur
+
+
+def _entites_json(ligne: str) -> Optional[Tuple[List[str], List[str], List[str], List[str], List[str]]]:
+    """Entités d'une ligne JSON: valeurs textes une à une (sans les clés), dates epoch numériques"""
+    if not ligne.startswith("{"):
+        return None
+    try:
+        objet = json.loads(ligne)
+    except ValueError:
+        return None
+    if not isinstance(objet, dict):
+        return None
+    emails, ips, heures, dates, urls = [], [], [], [], []
+    for cle, valeur in _valeurs_json(objet):
+        if isinstance(valeur, str):
+            e, i, h, d, u = extraire_info_ligne(valeur)
+            emails += e
+            ips += i
+            heures += h
+            dates += d
+            urls += u
+        elif cle in CLES_EPOCH_JSON and isinstance(valeur, (int, float)) and not isinstance(valeur, bool):
+            # Secondes ou millisecondes epoch (années 2001 à 2286)
+            secondes = valeur / 1000 if valeur >= 1e12 else valeur
+            if 1e9 <= secondes < 1e10:
+                date, heure = _date_heure_epoch(int(secondes))
+                dates.append(date)
+                heures.append(heure)
+    return emails, ips, heures, dates, urls
+
+
+# Analyseurs dédiés: une ligne reconnue donne (emails, ips, heures, dates, liens), sinon None
+FORMATS_LOG: Dict[str, Callable[[str], Optional[tuple]]] = {
+    "combined": _entites_combined,
+    "syslog": _entites_syslog_3164,
+    "syslog5424": _entites_syslog_5424,
+    "json": _entites_json,
+    "auditd": _entites_auditd,
+}
+
+
+def extraire_format(format_log: str, ligne: str) -> Tuple[List[str], List[str], List[str], List[str], List[str]]:
+    """
+    Extrait les informations d'une ligne avec l'analyseur de son format
+
+    Les lignes que l'analyseur ne reconnaît pas passent par extraire_info_ligne.
+
+    Args:
+        format_log: Nom d'un format de FORMATS_LOG
+        ligne: Ligne de texte à analyser
+
+    Returns:
+        Tuple (emails, ips, heures, dates, liens)
+    """
+    entites = FORMATS_LOG[format_log](ligne)
+    return entites if entites is not None else extraire_info_ligne(ligne)
+
+
+def extracteur_format(format_log: Optional[str]) -> Callable[[str], tuple]:
+    """Fonction d'extraction d'un format (picklable, pour les processus du pool); générique si None"""
+    return partial(extraire_format, format_log) if format_log else extraire_info_ligne
+
+
+def detecter_format(chemin: str, encodage: str = None,
+                    lignes: int = LIGNES_SONDAGE_FORMAT) -> Optional[str]:
+    """
+    Reconnaît le format d'un fichier log sur ses premières lignes
+
+    Args:
+        chemin: Fichier à examiner (éventuellement compressé)
+        encodage: Encodage du fichier (détecté si absent)
+        lignes: Nombre de lignes non vides examinées
+
+    Returns:
+        Nom du format de FORMATS_LOG reconnu par au moins SEUIL_FORMAT des lignes, sinon None
+    """
+    encodage = encodage or detecter_encodage(chemin)
+    comptes = dict.fromkeys(FORMATS_LOG, 0)
+    examinees = 0
+    with io.TextIOWrapper(ouvrir_flux(chemin), encoding=encodage, errors=REPLI_LATIN1) as f:
+        for ligne in f:
+            ligne = ligne.strip()
+            if not ligne or ligne.startswith("#"):
+                continue
+            examinees += 1
+            for nom, analyseur in FORMATS_LOG.items():
+                if analyseur(ligne) is not None:
+                    comptes[nom] += 1
+            if examinees >= lignes:
+                break
+    if not examinees:
+        return None
+    nom, compte = max(comptes.items(), key=lambda x: x[1])
+    return nom if compte >= SEUIL_FORMAT * examinees else None
+
+# ============================================================================
+# DÉTECTION DES MOTS-CLÉS SENSIBLES
+# ============================================================================
+
+def _motif_trie(mots: List[str]) -> str:
+    """
+    Construit une expression régulière factorisée en arbre préfixe (trie)
+
+    Les branches sont ordonnées pour que le mot le plus long partant d'une
+    position soit essayé en premier.
+
+    Args:
+        mots: Mots-clés en minuscules
+
+    Returns:
+        Motif sans groupe capturant
+    """
+    racine: Dict = {}
+    for mot in mots:
+        noeud = racine
+        for caractere in mot:
+            noeud = noeud.setdefault(caractere, {})
+        noeud[""] = {}
+
+    def construire(noeud: Dict) -> str:
+        branches = [re.escape(c) + construire(fils) for c, fils in sorted(noeud.items()) if c]
+        if not branches:
+            return ""
+        corps = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{corps})?" if "" in noeud else corps
+
+    return construire(racine)
+
+
+# Caractères de mot ASCII (\w de re.ASCII), en str et en octets
+_CARACTERES_MOT = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_")
+_OCTETS_MOT = frozenset(b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_")
+
+
+def _fin_de_mot_octets(octets: bytes, fin: int) -> bool:
+    """Indique si la position fin d'un bloc d'octets est une frontière de mot ASCII"""
+    avant = octets[fin - 1] in _OCTETS_MOT
+    apres = fin < len(octets) and octets[fin] in _OCTETS_MOT
+    return avant != apres
+
+
+class DetecteurMotsCles:
+    """Recherche de tous les mots-clés d'une liste en un seul passage par ligne"""
+
+    # Au-delà de ce nombre de mots, l'automate (trie compilé) est plus rapide
+    # que des recherches de sous-chaînes successives
+    SEUIL_AUTOMATE = 64
+
+    def __init__(self, mots: List[str], mots_entiers: bool = False):
+        """
+        Compile la liste de mots-clés
+
+        Args:
+            mots: Mots-clés à détecter (casse ignorée, doublons fusionnés)
+            mots_entiers: Ne signaler que les mots délimités (\\b)
+        """
+        self.mots_entiers = mots_entiers
+        self._originaux: Dict[str, str] = {}
+        for mot in mots:
+            if mot:
+                self._originaux.setdefault(mot.lower(), mot)
+        self._minuscules = list(self._originaux)
+        self._rang = {mot: i for i, mot in enumerate(self._minuscules)}
+
+        motif = _motif_trie(self._minuscules)
+        motif = rf"\b({motif})\b" if mots_entiers else f"({motif})"
+        self._motif = f"(?={motif})"
+        self._automate = None
+        self._automate_octets = None
+        if mots_entiers or len(self._minuscules) > self.SEUIL_AUTOMATE:
+            # Frontières de mots ASCII, comme dans les blocs d'octets
+            self._automate = re.compile(self._motif, re.ASCII)
+        # Mots plus courts qui correspondent à la même position
+        self._prefixes = {
+            mot: [p for p in self._minuscules if p != mot and mot.startswith(p)]
+            for mot in self._minuscules
+        }
+
+    @property
+    def mots(self) -> List[str]:
+        """Mots-clés tels que fournis, sans doublons"""
+        return list(self._originaux.values())
+
+    def _fin_de_mot(self, ligne: str, fin: int) -> bool:
+        """Indique si la position fin est une frontière de mot ASCII"""
+        avant = ligne[fin - 1] in _CARACTERES_MOT
+        apres = fin < len(ligne) and ligne[fin] in _CARACTERES_MOT
+        return avant != apres
+
+    def rechercher(self, ligne: str) -> List[Tuple[str, int]]:
+        """
+        Trouve les mots-clés présents dans une ligne
+
+        Args:
+            ligne: Ligne de texte (la casse est ignorée)
+
+        Returns:
+            Liste (mot_cle, position) avec la première occurrence de chaque
+            mot-clé, dans l'ordre de la liste d'origine
+        """
+        if not self._minuscules:
+            return []
+        ligne_lower = ligne.lower()
+
+        if self._automate is None:
+            # Filtre par "in" en compréhension (boucle en C), find seulement pour les mots
+            # présents, déjà dans l'ordre de la liste d'origine
+            presents = [mot for mot in self._minuscules if mot in ligne_lower]
+            if not presents:
+                return []
+            originaux = self._originaux
+            return [(originaux[mot], ligne_lower.find(mot)) for mot in presents]
+
+        trouves: Dict[str, int] = {}
+        for correspondance in self._automate.finditer(ligne_lower):
+            mot = correspondance.group(1)
+            position = correspondance.start()
+            if mot not in trouves:
+                trouves[mot] = position
+            for prefixe in self._prefixes[mot]:
+                if prefixe in trouves:
+                    continue
+                if self.mots_entiers and not self._fin_de_mot(ligne_lower, position + len(prefixe)):
+                    continue
+                trouves[prefixe] = position
+
+        if len(trouves) > 1:
+            ordre = sorted(trouves, key=self._rang.__getitem__)
+        else:
+            ordre = list(trouves)
+        return [(self._originaux[mot], trouves[mot]) for mot in ordre]
+
+    def rechercher_bloc(self, bloc: bytes) -> List[Tuple[int, List[Tuple[str, int]]]]:
+        """
+        Trouve les mots-clés d'un bloc d'octets contenant plusieurs lignes
+
+        La casse n'est ignorée que pour l'ASCII.
+
+        Args:
+            bloc: Octets bruts, lignes séparées par '\\n'
+
+        Returns:
+            Pour chaque ligne touchée, dans l'ordre: (début de la ligne dans le
+            bloc, liste (mot_cle, position dans le bloc) comme rechercher())
+        """
+        if not self._minuscules:
+            return []
+        if self._automate_octets is None:
+            self._automate_octets = re.compile(self._motif.encode("utf-8"))
+            self._decodes = {mot.encode("utf-8"): mot for mot in self._minuscules}
+
+        minuscule = bloc.lower()
+        resultats = []
+        trouves: Dict[str, int] = {}
+        debut_ligne = 0
+        fin_ligne = -1
+
+        def cloturer():
+            if trouves:
+                ordre = sorted(trouves, key=self._rang.__getitem__)
+                resultats.append((debut_ligne, [(self._originaux[m], trouves[m]) for m in ordre]))
+
+        for correspondance in self._automate_octets.finditer(minuscule):
+            position = correspondance.start()
+            if position > fin_ligne:
+                cloturer()
+                trouves = {}
+                debut_ligne = minuscule.rfind(b"\n", 0, position) + 1
+                fin_ligne = minuscule.find(b"\n", position)
+                if fin_ligne < 0:
+                    fin_ligne = len(minuscule)
+            mot = self._decodes[correspondance.group(1)]
+            if mot not in trouves:
+                trouves[mot] = position
+            for prefixe in self._prefixes[mot]:
+                if prefixe in trouves:
+                    continue
+                if self.mots_entiers and not _fin_de_mot_octets(minuscule, position + len(prefixe.encode("utf-8"))):
+                    continue
+                trouves[prefixe] = position
+        cloturer()
+        return resultats
+
+
+@lru_cache(maxsize=32)
+def _detecteur_en_cache(mots: Tuple[str, ...], mots_entiers: bool) -> DetecteurMotsCles:
+    return DetecteurMotsCles(list(mots), mots_entiers)
+
+
+def compiler_mots_cles(mots_sensibles: List[str] = None, mots_entiers: bool = False) -> DetecteurMotsCles:
+    """
+    Renvoie le détecteur compilé pour une liste de mots-clés (mis en cache)
+
+    Args:
+        mots_sensibles: Liste de mots-clés (MOTS_SENSIBLES par défaut)
+        mots_entiers: Ne signaler que les mots délimités
+
+    Returns:
+        DetecteurMotsCles prêt à l'emploi
+    """
+    if mots_sensibles is None:
+        mots_sensibles = MOTS_SENSIBLES
+    return _detecteur_en_cache(tuple(mots_sensibles), mots_entiers)
+
+# ============================================================================
+# FICHIERS COMPRESSÉS (.gz, .bz2, .xz)
+# ============================================================================
+
+# Signatures (magic bytes) des formats compressés lus en flux
+SIGNATURES_COMPRESSION = [
+    (b"\x1f\x8b", "gzip"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "xz"),
+]
+
+# Suffixes des logs tournés compressés (auth.log.2.gz)
+EXTENSIONS_COMPRESSEES = (".gz", ".bz2", ".xz")
+
+# Taille des blocs lus par les parcours en octets (projection mémoire, flux)
+TAILLE_BLOC = 1024 * 1024
+
+# Morceaux décompressés d'avance par le thread de décompression
+PROFONDEUR_FILE = 4
+
+
+def extension_supportee(chemin: str) -> bool:
+    """Vrai pour EXTENSIONS_SUPPORTEES, éventuellement suivies d'un suffixe de compression"""
+    nom = chemin.lower()
+    if nom.endswith(EXTENSIONS_COMPRESSEES):
+        nom = os.path.splitext(nom)[0]
+    return nom.endswith(EXTENSIONS_SUPPORTEES)
+
+
+def detecter_compression(chemin: str) -> Optional[str]:
+    """
+    Identifie un fichier compressé d'après ses premiers octets
+
+    Args:
+        chemin: Fichier à examiner
+
+    Returns:
+        "gzip", "bz2", "xz" ou None pour un fichier texte
+    """
+    with open(chemin, "rb") as f:
+        entete = f.read(6)
+    for signature, format_ in SIGNATURES_COMPRESSION:
+        if entete.startswith(signature):
+            return format_
+    return None
+
+
+def ouvrir_flux(chemin: str) -> BinaryIO:
+    """
+    Ouvre un fichier en lecture binaire, décompressé à la volée si nécessaire
+
+    Args:
+        chemin: Fichier texte ou compressé
+
+    Returns:
+        Objet fichier binaire (aucun fichier temporaire n'est créé)
+    """
+    format_ = detecter_compression(chemin)
+    if format_ == "gzip":
+        return gzip.open(chemin, "rb")
+    if format_ == "bz2":
+        return bz2.open(chemin, "rb")
+    if format_ == "xz":
+        return lzma.open(chemin, "rb")
+    return open(chemin, "rb")
+
+
+class LecteurDecompresse:
+    """
+    Décompression dans un thread dédié, consommée par morceaux
+
+    zlib, bz2 et lzma libèrent le GIL pendant la décompression: le thread
+    décompresse le morceau suivant pendant que l'appelant analyse le précédent.
+    """
+
+    def __init__(self, chemin: str, taille_morceau: int = TAILLE_BLOC, profondeur: int = PROFONDEUR_FILE):
+        """
+        Args:
+            chemin: Fichier compressé (ou texte)
+            taille_morceau: Octets décompressés par morceau
+            profondeur: Morceaux décompressés d'avance au maximum
+        """
+        self.chemin = chemin
+        self.taille_morceau = taille_morceau
+        self._file = queue.Queue(maxsize=profondeur)
+        self._arret = threading.Event()
+        self._thread = threading.Thread(target=self._produire, daemon=True)
+
+    def _deposer(self, element) -> bool:
+        while not self._arret.is_set():
+            try:
+                self._file.put(element, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produire(self) -> None:
+        try:
+            with ouvrir_flux(self.chemin) as flux:
+                while not self._arret.is_set():
+                    morceau = flux.read(self.taille_morceau)
+                    if not morceau:
+                        break
+                    if not self._deposer(morceau):
+                        return
+            self._deposer(None)
+        except Exception as e:  # Transmise au consommateur
+            self._deposer(e)
+
+    def __iter__(self):
+        self._thread.start()
+        try:
+            while True:
+                element = self._file.get()
+                if element is None:
+                    return
+                if isinstance(element, Exception):
+                    raise element
+                yield element
+        finally:
+            self._arret.set()
+
+    def fermer(self) -> None:
+        """Interrompt la décompression (appel facultatif après un arrêt anticipé)"""
+        self._arret.set()
+
+
+def _blocs_alignes(morceaux) -> Iterator[bytes]:
+    """Regroupe des morceaux quelconques en blocs de lignes complètes"""
+    reste = b""
+    for morceau in morceaux:
+        donnees = reste + morceau if reste else morceau
+        coupure = donnees.rfind(b"\n") + 1
+        if coupure == 0:
+            reste = donnees  # Ligne plus longue qu'un morceau
+            continue
+        yield donnees[:coupure]
+        reste = donnees[coupure:]
+    if reste:
+        yield reste
+
+# ============================================================================
+# DÉTECTION D'ENCODAGE
+# ============================================================================
+
+# Taille de l'échantillon lu en tête de fichier pour choisir l'encodage
+TAILLE_ECHANTILLON = 64 * 1024
+
+# Marques d'ordre des octets (BOM), les plus longues d'abord
+_BOMS = [
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+# Gestionnaire d'erreurs de décodage: un octet invalide devient le caractère
+# latin-1 correspondant, le reste de la ligne garde l'encodage détecté
+REPLI_LATIN1 = "cyberforge_latin1"
+
+
+def _repli_latin1(erreur: UnicodeError):
+    if not isinstance(erreur, UnicodeDecodeError):
+        raise erreur
+    return erreur.object[erreur.start:erreur.end].decode("latin-1"), erreur.end
+
+
+codecs.register_error(REPLI_LATIN1, _repli_latin1)
+
+
+def detecter_encodage(chemin: str, taille_echantillon: int = TAILLE_ECHANTILLON) -> str:
+    """
+    Choisit l'encodage d'un fichier à partir d'un échantillon de tête
+
+    Ordre: BOM éventuel, puis UTF-8, cp1252 et enfin latin-1 (qui accepte tout).
+    Pour un fichier compressé, l'échantillon est pris sur le contenu décompressé.
+    Les octets invalides rencontrés plus loin sont traités ligne par ligne par
+    le gestionnaire REPLI_LATIN1, le fichier n'est donc jamais relu.
+
+    Args:
+        chemin: Fichier à examiner
+        taille_echantillon: Nombre d'octets lus en tête de fichier
+
+    Returns:
+        Nom de l'encodage utilisable avec open()
+    """
+    with ouvrir_flux(chemin) as f:
+        echantillon = f.read(taille_echantillon)
+        complet = len(echantillon) < taille_echantillon or not f.read(1)
+
+    for bom, encodage in _BOMS:
+        if echantillon.startswith(bom):
+            return encodage
+
+    for encodage in ("utf-8", "cp1252"):
+        decodeur = codecs.getincrementaldecoder(encodage)()
+        try:
+            # final=False tolère un caractère multi-octets coupé en fin d'échantillon
+            decodeur.decode(echantillon, final=complet)
+            return encodage
+        except UnicodeDecodeError:
+            continue
+    return "latin-1"
+
+
+def _compatible_ascii(encodage: str) -> bool:
+    """Indique si l'encodage code '\\n' et l'ASCII sur un octet (parcours par octets possible)"""
+    return not encodage.startswith(("utf-16", "utf-32"))
+
+
+def _decoder_ligne(octets: bytes, encodage: str = "utf-8") -> str:
+    """Décode une ligne, les octets invalides étant lus en latin-1"""
+    return octets.decode(encodage, REPLI_LATIN1)
+
+# ============================================================================
+# ÉTAT D'ANALYSE
+# ============================================================================
+
+# Catégories d'entités extraites (attributs de EtatAnalyse)
+CATEGORIES_ENTITES = ("emails", "ips", "heures", "dates", "urls")
+
+
+class ResultatsEntites(tuple):
+    """
+    (emails, ips, heures, dates, liens) en listes, plus les valeurs triées des types
+    supplémentaires du registre par catégorie dans l'attribut autres
+    """
+
+    def __new__(cls, historiques: tuple = ([], [], [], [], []), autres: Dict[str, List[str]] = None):
+        resultats = super().__new__(cls, historiques)
+        resultats.autres = autres or {}
+        return resultats
+
+
+def _citer_ligne(alertes: List[dict], ligne: str) -> None:
+    """Cite la ligne (100 premiers caractères) dans les alertes qui n'ont pas encore de contenu"""
+    for alerte in alertes:
+        if alerte['contenu'] is None:
+            alerte['contenu'] = ligne[:100]
+            alerte['tronque'] = len(ligne) > 100
+
+
+class Etape:
+    """
+    Analyse complémentaire greffée sur un EtatAnalyse (fréquences, IOC, secrets...)
+
+    Un état porte une liste d'étapes qui s'exécutent ensemble sur le même parcours:
+    chacune déclare par ses attributs de classe les points d'accroche qu'elle utilise,
+    et l'état ne lui transmet que ceux-là. Les méthodes ci-dessous ne font rien.
+    """
+
+    # Nom de l'étape: clé de EtatAnalyse.etapes, du résumé JSON et de ETAPES
+    nom = ""
+
+    # Recevoir chaque occurrence d'entité (ajouter_entites), et pas seulement les valeurs distinctes
+    compte_occurrences = False
+
+    # Catégories dont l'étape tient les valeurs à la place de l'état (estimer, plus_frequentes)
+    estimees: Tuple[str, ...] = ()
+
+    # Réécrire le texte dont les entités sont extraites et que citent les alertes (texte_entites)
+    masque = False
+
+    # Recevoir chaque ligne horodatée (noter_ligne / noter_bloc)
+    horodate = False
+
+    # Produire des alertes (traiter_ligne / correler_bloc)
+    correle = False
+
+    # Recevoir chaque ligne en alerte (noter_alertes)
+    note_alertes = False
+
+    # Suivre l'ordre du fichier: pas d'analyse par plages parallèles
+    sequentielle = False
+
+    # Place de la section du rapport texte: "avant" les alertes, à la place des "alertes", ou "apres"
+    section = "apres"
+
+    def vierge(self) -> "Etape":
+        """Étape vide de même nature (pour un processus du pool)"""
+        return type(self)()
+
+    def choisir_reference_dates(self, reference: Optional[float]) -> None:
+        """Date de référence de l'année des dates syslog (voir EtatAnalyse)"""
+
+    def ajouter_entites(self, categorie: str, valeurs) -> None:
+        """Occurrences d'une catégorie extraites d'une ligne ou d'un bloc (compte_occurrences)"""
+
+    def texte_entites(self, texte: Union[str, bytes]) -> Union[str, bytes]:
+        """Texte réécrit avant extraction des entités (masque)"""
+        return texte
+
+    def traiter_ligne(self, ligne_num: int, ligne: str) -> List[dict]:
+        """
+        Alertes d'une ligne (correle)
+
+        Une alerte dont le contenu est None cite la ligne, telle que réécrite par les
+        étapes qui masquent.
+        """
+        return []
+
+    def correler_bloc(self, bloc: bytes, ligne_base: int,
+                      encodage: str = "utf-8") -> Iterator[Tuple[int, str, List[dict]]]:
+        """Alertes d'un bloc de lignes complètes (correle): (numéro, ligne, alertes) par ligne concernée"""
+        return iter(())
+
+    def noter_ligne(self, ligne: str, alertes: List[dict], compter_ligne: bool = True) -> None:
+        """
+        Ligne et ses alertes (horodate)
+
+        Args:
+            ligne: Ligne de log
+            alertes: Alertes produites par la ligne
+            compter_ligne: Faux si noter_bloc a déjà vu la ligne (seules ses alertes sont nouvelles)
+        """
+
+    def noter_bloc(self, bloc: bytes) -> None:
+        """Bloc de lignes complètes, avant ses lignes en alerte (horodate)"""
+
+    def noter_alertes(self, ligne: str, alertes: List[dict]) -> None:
+        """Ligne en alerte et toutes ses alertes (note_alertes)"""
+
+    def fusionner(self, autre: "Etape", decalage_lignes: int = 0) -> None:
+        """Ajoute l'étape d'un morceau qui suit celui-ci dans le fichier"""
+
+    def plus_frequentes(self, categorie: str, n: int = None) -> List[Tuple[str, int, int]]:
+        """(valeur, compte, erreur maximale) par compte décroissant; vide si l'étape ne compte pas"""
+        return []
+
+    def estimer(self, categorie: str) -> int:
+        """Nombre estimé de valeurs distinctes d'une catégorie de estimees"""
+        return 0
+
+    def resume(self) -> Optional[dict]:
+        """Résumé sérialisable en JSON de la sortie en flux (None = aucun)"""
+        return None
+
+    def afficher(self) -> None:
+        """Lignes de l'étape dans les statistiques affichées en fin d'analyse"""
+
+    def ecrire_rapport(self, f: TextIO) -> None:
+        """Section de l'étape dans le rapport texte (voir section)"""
+
+    def terminer(self) -> None:
+        """Fin de l'analyse, avant le rapport (fichiers propres à l'étape)"""
+
+    def vers_dict(self) -> Optional[dict]:
+        """Représentation sérialisable en JSON, pour une reprise (None = non sérialisée)"""
+        return None
+
+    @classmethod
+    def depuis_dict(cls, donnees: dict) -> "Etape":
+        """Reconstruit une étape à partir de vers_dict()"""
+        return cls()
+
+
+class EtatAnalyse:
+    """
+    Entités et alertes accumulées pendant l'analyse d'un fichier (ou d'un morceau)
+
+    Les analyses complémentaires (Etape) s'y greffent et s'exécutent ensemble sur le
+    même parcours, chacune recevant seulement les points d'accroche qu'elle déclare.
+    """
+
+    def __init__(self, sur_entite: Callable[[str, str], None] = None, conserver_alertes: bool = True,
+                 etapes: List[Etape] = None):
+        """
+        Args:
+            sur_entite: Fonction appelée (catégorie, valeur) à la première apparition d'une entité
+            conserver_alertes: Garder la liste des alertes (sinon elles sont seulement comptées,
+                pour une sortie en flux qui les écrit au fil de l'eau)
+            etapes: Analyses complémentaires, dans l'ordre de leurs alertes et de leurs sections
+                du rapport (voir creer_etapes)
+        """
+        self.emails = set()
+        self.ips = set()
+        self.heures = set()
+        self.dates = set()
+        self.urls = set()
+        # Types supplémentaires du registre: catégorie -> valeurs
+        self.autres: Dict[str, set] = {}
+        self.alertes = []
+        self.nombre_alertes = 0
+        self.lignes = 0
+        self.sur_entite = sur_entite
+        self.conserver_alertes = conserver_alertes
+        self.reference_dates: Optional[float] = None
+        self.etapes: Dict[str, Etape] = {}
+        for etape in etapes or ():
+            if etape.nom in self.etapes:
+                raise ValueError(f"Étape en double: {etape.nom}")
+            self.etapes[etape.nom] = etape
+        self._repartir_etapes()
+        self.choisir_format(None)
+        self.choisir_entites(None)
+
+    def _repartir_etapes(self) -> None:
+        """Listes des étapes par point d'accroche, et drapeaux lus par les parcours"""
+        etapes = list(self.etapes.values())
+        self._comptantes = [etape for etape in etapes if etape.compte_occurrences]
+        self._masquantes = [etape for etape in etapes if etape.masque]
+        self._horodatees = [etape for etape in etapes if etape.horodate]
+        self._correlantes = [etape for etape in etapes if etape.correle]
+        self._notantes = [etape for etape in etapes if etape.note_alertes]
+        self._estimateurs = {categorie: etape for etape in etapes for categorie in etape.estimees}
+        # Transmettre chaque occurrence à ajouter_entites, et pas seulement les valeurs distinctes
+        self.compte_occurrences = bool(self._comptantes)
+        # Catégories dont le nombre de valeurs distinctes est une estimation
+        self.estimees = tuple(self._estimateurs)
+        self.masque = bool(self._masquantes)
+        self.horodate = bool(self._horodatees)
+        self.correle = bool(self._correlantes)
+        self.note_alertes = bool(self._notantes)
+        self.sequentielle = any(etape.sequentielle for etape in etapes)
+
+    def ensemble(self, categorie: str) -> set:
+        """Valeurs distinctes d'une catégorie, historique ou du registre"""
+        ensemble = self.autres.get(categorie)
+        return getattr(self, categorie) if ensemble is None else ensemble
+
+    def ajouter_entites(self, categorie: str, valeurs) -> None:
+        """Transmet des valeurs aux étapes qui comptent, puis les ajoute à leur catégorie"""
+        for etape in self._comptantes:
+            etape.ajouter_entites(categorie, valeurs)
+        if categorie not in self._estimateurs:
+            self._ajouter_valeurs(categorie, valeurs)
+
+    def _ajouter_valeurs(self, categorie: str, valeurs) -> None:
+        """Ajoute des valeurs à une catégorie, en signalant les nouvelles à sur_entite"""
+        ensemble = self.ensemble(categorie)
+        if self.sur_entite is None:
+            ensemble.update(valeurs)
+            return
+        for valeur in valeurs:
+            if valeur not in ensemble:
+                ensemble.add(valeur)
+                self.sur_entite(categorie, valeur)
+
+    def vierge(self) -> "EtatAnalyse":
+        """État vide aux mêmes étapes, sans fonction de rappel (pour un processus du pool)"""
+        return EtatAnalyse(etapes=[etape.vierge() for etape in self.etapes.values()])
+
+    def choisir_format(self, format_log: Optional[str]) -> None:
+        """Extrait les lignes avec l'analyseur d'un format de FORMATS_LOG (générique si None)"""
+        if format_log is not None and format_log not in FORMATS_LOG:
+            raise ValueError(f"Format de log inconnu: {format_log} (choix: {', '.join(FORMATS_LOG)})")
+        self.format_log = format_log
+        self.extracteur = extracteur_format(format_log)
+
+    def choisir_reference_dates(self, reference: Optional[float]) -> None:
+        """
+        Date de référence de l'année des dates syslog (AnneesSyslog)
+
+        Args:
+            reference: Secondes epoch de la dernière modification du fichier analysé (None = maintenant)
+        """
+        self.reference_dates = reference
+        for etape in self.etapes.values():
+            etape.choisir_reference_dates(reference)
+
+    def choisir_entites(self, categories: Optional[Tuple[str, ...]]) -> None:
+        """
+        Choisit les types du registre extraits en plus des cinq catégories historiques
+
+        Args:
+            categories: Catégories de REGISTRE_ENTITES (None = types actifs par défaut)
+        """
+        if categories is None:
+            categories = categories_supplementaires()
+        inconnues = [c for c in categories if c not in REGISTRE_ENTITES]
+        if inconnues:
+            raise ValueError(f"Type d'entité inconnu: {', '.join(inconnues)} "
+                             f"(choix: {', '.join(categories_supplementaires(toutes=True))})")
+        self.supplementaires = tuple(c for c in categories if c not in CATEGORIES_ENTITES)
+        self.autres = {categorie: self.autres.get(categorie, set()) for categorie in self.supplementaires}
+
+    def texte_entites(self, texte: Union[str, bytes]) -> Union[str, bytes]:
+        """
+        Texte dont les entités sont extraites et que citent les alertes
+
+        Args:
+            texte: Ligne nettoyée (str) ou bloc de lignes complètes (bytes)
+
+        Returns:
+            Le texte réécrit par chaque étape qui masque des valeurs (le texte lui-même sans elles)
+        """
+        for etape in self._masquantes:
+            texte = etape.texte_entites(texte)
+        return texte
+
+    def noter_ligne(self, ligne: str, alertes: List[dict], compter_ligne: bool = True) -> None:
+        """Transmet une ligne et ses alertes aux étapes horodatées (voir Etape.noter_ligne)"""
+        for etape in self._horodatees:
+            etape.noter_ligne(ligne, alertes, compter_ligne)
+
+    def noter_bloc(self, bloc: bytes) -> None:
+        """Transmet un bloc de lignes complètes aux étapes horodatées"""
+        for etape in self._horodatees:
+            etape.noter_bloc(bloc)
+
+    def noter_alertes(self, ligne: str, alertes: List[dict]) -> None:
+        """Transmet une ligne en alerte aux étapes qui la notent"""
+        for etape in self._notantes:
+            etape.noter_alertes(ligne, alertes)
+
+    def correler_bloc(self, bloc: bytes, ligne_base: int,
+                      encodage: str = "utf-8") -> Iterator[Tuple[int, str, List[dict]]]:
+        """(numéro, ligne, alertes) des étapes qui alertent, étape par étape (non comptées dans l'état)"""
+        for etape in self._correlantes:
+            yield from etape.correler_bloc(bloc, ligne_base, encodage)
+
+    def ajouter_alertes(self, alertes: List[dict]) -> None:
+        """Compte des alertes et les conserve si demandé"""
+        self.nombre_alertes += len(alertes)
+        if self.conserver_alertes:
+            self.alertes.extend(alertes)
+
+    def traiter_ligne(self, ligne_num: int, ligne: str, detecteur: DetecteurMotsCles) -> List[dict]:
+        """
+        Extrait les entités d'une ligne (déjà nettoyée) et détecte les mots-clés
+
+        Args:
+            ligne_num: Numéro de la ligne dans le fichier
+            ligne: Contenu de la ligne, sans espaces de début/fin
+            detecteur: Détecteur de mots-clés compilé
+
+        Returns:
+            Alertes produites par cette ligne: mots-clés, puis alertes des étapes
+        """
+        # Extraction des données
+        texte = self.texte_entites(ligne) if self._masquantes else ligne
+        e, i, h, d, u = self.extracteur(texte)
+
+        # Ajout aux ensembles (déduplique automatiquement)
+        if e:
+            self.ajouter_entites('emails', e)
+        if h:
+            self.ajouter_entites('heures', h)
+        if d:
+            self.ajouter_entites('dates', d)
+        if u:
+            self.ajouter_entites('urls', u)
+
+        # Validation et ajout des IPs
+        if i:
+            self.ajouter_entites('ips', [ip for ip in i if valider_ip(ip)])
+
+        # Types supplémentaires du registre (IPv6, MAC, empreintes...)
+        if self.supplementaires:
+            for categorie, valeurs in extraire_entites(texte, self.supplementaires).items():
+                self.ajouter_entites(categorie, valeurs)
+
+        # Détection de mots sensibles
+        nouvelles = []
+        for mot, position in detecteur.rechercher(ligne):
+            nouvelles.append({
+                'ligne': ligne_num,
+                'mot_cle': mot,
+                'position': position,
+                'contenu': None,  # Cité par _citer_ligne, 100 caractères au plus
+                'tronque': False
+            })
+        for etape in self._correlantes:
+            nouvelles.extend(etape.traiter_ligne(ligne_num, ligne))
+        if nouvelles:
+            _citer_ligne(nouvelles, texte)
+            self.ajouter_alertes(nouvelles)
+            if self._notantes:
+                self.noter_alertes(texte, nouvelles)
+        if self._horodatees:
+            self.noter_ligne(texte, nouvelles)
+        return nouvelles
+
+    def fusionner(self, autre: "EtatAnalyse", decalage_lignes: int = 0) -> None:
+        """
+        Ajoute l'état d'un morceau qui suit celui-ci dans le fichier
+
+        Args:
+            autre: État à fusionner
+            decalage_lignes: Nombre de lignes précédant le morceau fusionné
+        """
+        for nom, etape in self.etapes.items():
+            if nom in autre.etapes:
+                etape.fusionner(autre.etapes[nom], decalage_lignes)
+        self._fusionner_entites(autre)
+        for alerte in autre.alertes:
+            alerte['ligne'] += decalage_lignes
+        self.nombre_alertes += autre.nombre_alertes
+        if self.conserver_alertes:
+            self.alertes.extend(autre.alertes)
+        self.lignes += autre.lignes
+
+    def _fusionner_entites(self, autre: "EtatAnalyse") -> None:
+        """Ajoute les entités d'un autre état, sans les recompter (les étapes fusionnent leurs comptes)"""
+        for categorie in CATEGORIES_ENTITES:
+            self._ajouter_valeurs(categorie, getattr(autre, categorie))
+        self._fusionner_autres(autre)
+
+    def _fusionner_autres(self, autre: "EtatAnalyse") -> None:
+        """Ajoute les types supplémentaires du registre d'un autre état"""
+        for categorie, valeurs in autre.autres.items():
+            self.autres.setdefault(categorie, set())
+            self._ajouter_valeurs(categorie, valeurs)
+
+    def resultats(self) -> ResultatsEntites:
+        """
+        Renvoie (emails, ips, heures, dates, liens) sous forme de listes triées, plus .autres
+
+        Les catégories estimées par une étape sont ses valeurs les plus fréquentes, par
+        fréquence décroissante.
+        """
+        historiques = []
+        for categorie in CATEGORIES_ENTITES:
+            etape = self._estimateurs.get(categorie)
+            if etape is None:
+                historiques.append(sorted(getattr(self, categorie)))
+            else:
+                historiques.append([valeur for valeur, _, _ in etape.plus_frequentes(categorie)])
+        return ResultatsEntites(tuple(historiques), self._autres_tries())
+
+    def _autres_tries(self) -> Dict[str, List[str]]:
+        """Valeurs triées de chaque type supplémentaire du registre"""
+        return {categorie: sorted(valeurs) for categorie, valeurs in self.autres.items()}
+
+    def plus_frequentes(self, categorie: str, n: int = None) -> List[Tuple[str, int, int]]:
+        """(valeur, compte, erreur maximale) de la première étape qui compte la catégorie, sinon vide"""
+        for etape in self._comptantes:
+            classement = etape.plus_frequentes(categorie, n)
+            if classement:
+                return classement
+        return []
+
+    def cardinalites(self) -> Dict[str, int]:
+        """Nombre de valeurs distinctes de chaque catégorie (estimé pour celles de estimees)"""
+        cardinalites = {categorie: len(getattr(self, categorie)) for categorie in CATEGORIES_ENTITES}
+        cardinalites.update((categorie, len(valeurs)) for categorie, valeurs in self.autres.items())
+        for categorie, etape in self._estimateurs.items():
+            cardinalites[categorie] = etape.estimer(categorie)
+        return cardinalites
+
+    def vers_dict(self, avec_alertes: bool = True) -> dict:
+        """
+        Représentation sérialisable en JSON
+
+        Args:
+            avec_alertes: Inclure la liste des alertes (sinon seulement leur nombre)
+        """
+        emails, ips, heures, dates, urls = self.resultats()
+        donnees = {
+            'emails': emails, 'ips': ips, 'heures': heures, 'dates': dates, 'urls': urls,
+            'autres': self._autres_tries(), 'alertes': self.alertes if avec_alertes else [],
+            'nombre_alertes': self.nombre_alertes, 'lignes': self.lignes
+        }
+        etapes = {nom: etape.vers_dict() for nom, etape in self.etapes.items()}
+        etapes = {nom: valeur for nom, valeur in etapes.items() if valeur is not None}
+        if etapes:
+            donnees['etapes'] = etapes
+        return donnees
+
+    @classmethod
+    def depuis_dict(cls, donnees: dict) -> "EtatAnalyse":
+        """Reconstruit un état à partir de vers_dict()"""
+        etat = cls(etapes=[ETAPES[nom].depuis_dict(valeur) for nom, valeur in donnees.get('etapes', {}).items()])
+        etat.emails = set(donnees['emails'])
+        etat.ips = set(donnees['ips'])
+        etat.heures = set(donnees['heures'])
+        etat.dates = set(donnees['dates'])
+        etat.urls = set(donnees['urls'])
+        for categorie in etat.estimees:
+            # Les listes de vers_dict() ne sont que les valeurs les plus fréquentes
+            setattr(etat, categorie, set())
+        for categorie, valeurs in donnees.get('autres', {}).items():
+            etat.autres[categorie] = set(valeurs)
+        etat.alertes = list(donnees['alertes'])
+        etat.nombre_alertes = donnees.get('nombre_alertes', len(etat.alertes))
+        etat.lignes = donnees['lignes']
+        return etat
+
+# ============================================================================
+# ÉTAPE À MÉMOIRE BORNÉE (ESQUISSES)
+# ============================================================================
+
+# Catégories résumées par des esquisses (les heures et dates restent en nombre limité)
+CATEGORIES_ESQUISSEES = ("emails", "ips", "urls")
+
+
+class EtapeEsquisse(Etape):
+    """
+    Mémoire fixe: emails, IPs et liens résumés par des esquisses
+
+    Chaque catégorie esquissée garde une HyperLogLog (nombre de valeurs
+    distinctes) et un Space-Saving (top_k valeurs les plus fréquentes) au lieu
+    de l'ensemble complet de l'état. Les esquisses se fusionnent entre plages
+    parallèles comme entre exécutions (vers_dict / depuis_dict). sur_entite n'est
+    pas appelée pour ces catégories: une esquisse ne sait pas si une valeur est nouvelle.
+    """
+
+    nom = "esquisses"
+    compte_occurrences = True
+    estimees = CATEGORIES_ESQUISSEES
+
+    def __init__(self, top_k: int = 100, precision: int = 14):
+        """
+        Args:
+            top_k: Nombre de valeurs les plus fréquentes suivies par catégorie
+            precision: Précision des HyperLogLog (2**precision registres d'un octet)
+        """
+        self.top_k = top_k
+        self.precision = precision
+        self.distinctes = {categorie: HyperLogLog(precision) for categorie in CATEGORIES_ESQUISSEES}
+        self.frequentes = {categorie: SpaceSaving(top_k) for categorie in CATEGORIES_ESQUISSEES}
+
+    def vierge(self) -> "EtapeEsquisse":
+        return EtapeEsquisse(self.top_k, self.precision)
+
+    def ajouter_entites(self, categorie: str, valeurs) -> None:
+        if categorie not in self.frequentes:
+            return
+        distinctes = self.distinctes[categorie]
+        frequentes = self.frequentes[categorie]
+        comptes = frequentes.comptes
+        for valeur in valeurs:
+            # Une valeur suivie a déjà été vue par l'HyperLogLog: pas de hachage à refaire
+            if valeur not in comptes:
+                distinctes.ajouter(valeur)
+            frequentes.ajouter(valeur)
+
+    def fusionner(self, autre: "EtapeEsquisse", decalage_lignes: int = 0) -> None:
+        for categorie in CATEGORIES_ESQUISSEES:
+            self.distinctes[categorie].fusionner(autre.distinctes[categorie])
+            self.frequentes[categorie].fusionner(autre.frequentes[categorie])
+
+    def plus_frequentes(self, categorie: str, n: int = None) -> List[Tuple[str, int, int]]:
+        if categorie not in self.frequentes:
+            return []
+        return self.frequentes[categorie].plus_frequents(n)
+
+    def estimer(self, categorie: str) -> int:
+        return self.distinctes[categorie].estimation()
+
+    def vers_dict(self) -> dict:
+        return {
+            'top_k': self.top_k,
+            'precision': self.precision,
+            'distinctes': {c: self.distinctes[c].vers_dict() for c in CATEGORIES_ESQUISSEES},
+            'frequentes': {c: self.frequentes[c].vers_dict() for c in CATEGORIES_ESQUISSEES},
+        }
+
+    @classmethod
+    def depuis_dict(cls, donnees: dict) -> "EtapeEsquisse":
+        etape = cls(donnees['top_k'], donnees['precision'])
+        for categorie in CATEGORIES_ESQUISSEES:
+            etape.distinctes[categorie] = HyperLogLog.depuis_dict(donnees['distinctes'][categorie])
+            etape.frequentes[categorie] = SpaceSaving.depuis_dict(donnees['frequentes'][categorie])
+        return etape
+
+# ============================================================================
+# HORODATAGE DES LIGNES
+# ============================================================================
+
+_MOIS = "Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec"
+_NUMERO_MOIS = {mois: numero for numero, mois in enumerate(_MOIS.split("|"), 1)}
+_NUMERO_MOIS.update({mois.encode("ascii"): numero for mois, numero in list(_NUMERO_MOIS.items())})
+
+# Formats reconnus (motif ASCII, utilisable en str comme en bytes), par ordre de priorité
+FORMATS_HORODATAGE = {
+    # 2025-01-15T08:30:12.123+01:00, 2025-01-15 08:30:12
+    "iso": r"(\d{4})-(\d{2})-(\d{2})[T ](\d{2}):(\d{2}):(\d{2})(?:[.,]\d+)?(?:Z|([+-])(\d{2}):?(\d{2}))?",
+    # Apache / nginx: [15/Jan/2025:08:30:12 +0000]
+    "apache": r"\[(\d{2})/(" + _MOIS + r")/(\d{4}):(\d{2}):(\d{2}):(\d{2})(?: ([+-])(\d{2})(\d{2}))?",
+    # syslog RFC 3164: Jan 15 08:30:12 (sans année)
+    "syslog": r"\b(" + _MOIS + r") +(\d{1,2}) (\d{2}):(\d{2}):(\d{2})",
+    # 15/01/2025 08:30[:12]
+    "jour_mois": r"\b(\d{2})/(\d{2})/(\d{4}) (\d{2}):(\d{2})(?::(\d{2}))?",
+}
+
+# Tous les formats à la fois: le groupe nommé ayant correspondu désigne le format
+MOTIF_HORODATAGE = "|".join(f"(?P<{nom}>{motif})" for nom, motif in FORMATS_HORODATAGE.items())
+RE_HORODATAGE = re.compile(MOTIF_HORODATAGE, re.ASCII)
+
+
+# Première date de chaque ligne d'un bloc d'octets
+RE_HORODATAGE_LIGNE_OCTETS = re.compile((r"(?m)^[^\n]*?(?:" + MOTIF_HORODATAGE + ")").encode("ascii"))
+
+
+
+class AnneesSyslog:
+    """
+    Année des dates syslog (RFC 3164, sans année) d'un fichier
+
+    La référence est la date de dernière modification du fichier: un mois postérieur
+    au mois de la référence appartient à l'année précédente (auth.log.4.gz de décembre
+    analysé en janvier, log qui passe le Nouvel An). fixe() ne dépend que du mois et
+    sert aux accès directs (dichotomie, index temporel); suivre() accompagne un parcours
+    dans l'ordre du fichier et avance d'une année à chaque passage de décembre à janvier.
+    """
+
+    def __init__(self, reference: float = None):
+        """
+        Args:
+            reference: Secondes epoch de la dernière modification du fichier (maintenant si None);
+                un jour de marge couvre les dates locales en avance sur UTC
+        """
+        moment = time.gmtime((time.time() if reference is None else reference) + 86400)
+        self.annee, self.mois = moment.tm_year, moment.tm_mon
+        self._annee_suivie: Optional[int] = None
+        self._mois_suivi = 0
+
+    def fixe(self, mois: int) -> int:
+        """Année d'une date syslog lue isolément"""
+        return self.annee if mois <= self.mois else self.annee - 1
+
+    def suivre(self, mois: int) -> int:
+        """Année d'une date syslog lue dans l'ordre du fichier, après les précédentes"""
+        if self._annee_suivie is None:
+            self._annee_suivie = self.fixe(mois)
+        elif mois < self._mois_suivi - 6:
+            self._annee_suivie += 1  # Décembre → janvier
+        elif mois > self._mois_suivi + 6:
+            return self._annee_suivie - 1  # Ligne de décembre égarée après janvier
+        self._mois_suivi = mois
+        return self._annee_suivie
+
+
+# Année des dates syslog sans fichier de référence (ligne isolée, borne de fenêtre)
+ANNEES_SYSLOG = AnneesSyslog()
+
+
+@lru_cache(maxsize=4096)
+def _epoch_minute(annee: int, mois: int, jour: int, heure: int, minute: int) -> Optional[int]:
+    """Secondes epoch (UTC) du début d'une minute, None si la date est invalide"""
+    if not (1 <= mois <= 12 and 1 <= jour <= 31 and heure < 24 and minute < 60):
+        return None
+    return calendar.timegm((annee, mois, jour, heure, minute, 0))
+
+
+def _epoch(annee, mois, jour, heure, minute, seconde, signe=None, decalage_h=None, decalage_m=None) -> Optional[int]:
+    """Secondes epoch à partir de champs str ou bytes, décalage horaire éventuel ramené en UTC"""
+    debut = _epoch_minute(int(annee), int(mois), int(jour), int(heure), int(minute))
+    if debut is None:
+        return None
+    epoch = debut + int(seconde or 0)
+    if signe:
+        decalage = int(decalage_h) * 3600 + int(decalage_m) * 60
+        epoch += decalage if signe in ("-", b"-") else -decalage
+    return epoch
+
+
+# Conversion des groupes de chaque format en secondes epoch (annee: mois -> année des dates syslog)
+_CONVERSIONS = {
+    "iso": lambda g, annee: _epoch(*g),
+    "apache": lambda g, annee: _epoch(g[2], _NUMERO_MOIS[g[1]], g[0], *g[3:]),
+    "syslog": lambda g, annee: _epoch(annee(_NUMERO_MOIS[g[0]]), _NUMERO_MOIS[g[0]], *g[1:]),
+    "jour_mois": lambda g, annee: _epoch(g[2], g[1], g[0], *g[3:]),
+}
+
+# Position des groupes de chaque format dans MOTIF_HORODATAGE
+_GROUPES_FORMAT = {}
+for _nom in FORMATS_HORODATAGE:
+    _indice = RE_HORODATAGE.groupindex[_nom]
+    _GROUPES_FORMAT[_nom] = slice(_indice, _indice + re.compile(FORMATS_HORODATAGE[_nom]).groups)
+
+
+def _convertir(correspondance: "re.Match", annee: Callable[[int], int]) -> Optional[int]:
+    """Secondes epoch d'une correspondance de MOTIF_HORODATAGE (motif str ou octets)"""
+    nom = correspondance.lastgroup
+    return _CONVERSIONS[nom](correspondance.groups()[_GROUPES_FORMAT[nom]], annee)
+
+
+def horodatage_ligne(ligne: str, annee: Callable[[int], int] = None) -> Optional[int]:
+    """
+    Date et heure de la ligne en secondes epoch (UTC; sans fuseau, lue comme UTC)
+
+    Args:
+        ligne: Ligne de log
+        annee: Année des dates syslog selon leur mois, AnneesSyslog.fixe ou .suivre du
+            fichier de la ligne (ANNEES_SYSLOG.fixe par défaut)
+
+    Returns:
+        Secondes epoch de la première date reconnue, None sinon
+    """
+    correspondance = RE_HORODATAGE.search(ligne)
+    if correspondance is None:
+        return None
+    return _convertir(correspondance, annee or ANNEES_SYSLOG.fixe)
+
+
+class NormaliseurHorodatage:
+    """
+    Conversion des dates d'un fichier en secondes epoch, format détecté une seule fois
+
+    Le premier format reconnu est retenu: les lignes suivantes sont lues avec
+    son seul motif. Une ligne qui n'y correspond pas repasse par la détection
+    complète, et le format retenu change si elle en reconnaît un autre.
+    Les blocs d'octets sont lus en un seul finditer de l'alternative complète,
+    exécuté en C pour toutes les lignes du bloc. Les dates syslog prennent leur
+    année dans l'ordre du fichier (AnneesSyslog.suivre).
+    """
+
+    def __init__(self, reference: float = None):
+        """
+        Args:
+            reference: Secondes epoch de la dernière modification du fichier (AnneesSyslog)
+        """
+        self.format: Optional[str] = None
+        self.changements = 0
+        self._chercher = None
+        self._conversion = None
+        self.annees = AnneesSyslog(reference)
+
+    def choisir_reference(self, reference: Optional[float]) -> None:
+        """Repart de la date de modification du fichier parcouru pour l'année des dates syslog"""
+        self.annees = AnneesSyslog(reference)
+
+    def _retenir(self, nom: str) -> None:
+        if nom != self.format:
+            self.changements += self.format is not None
+            self.format = nom
+            self._chercher = re.compile(FORMATS_HORODATAGE[nom], re.ASCII).search
+            self._conversion = _CONVERSIONS[nom]
+
+    def normaliser(self, ligne: str) -> Optional[int]:
+        """Secondes epoch de la première date de la ligne, None sans date reconnue"""
+        if self._chercher is not None:
+            correspondance = self._chercher(ligne)
+            if correspondance is not None:
+                return self._conversion(correspondance.groups(), self.annees.suivre)
+        correspondance = RE_HORODATAGE.search(ligne)
+        if correspondance is None:
+            return None
+        self._retenir(correspondance.lastgroup)
+        return _convertir(correspondance, self.annees.suivre)
+
+    def normaliser_bloc(self, bloc: bytes) -> List[int]:
+        """Secondes epoch de chaque ligne datée d'un bloc d'octets, dans l'ordre"""
+        epochs = []
+        for correspondance in RE_HORODATAGE_LIGNE_OCTETS.finditer(bloc):
+            if self.format is None:
+                self._retenir(correspondance.lastgroup)
+            epoch = _convertir(correspondance, self.annees.suivre)
+            if epoch is not None:
+                epochs.append(epoch)
+        return epochs
+
+# ============================================================================
+# CHRONOLOGIE (DATES EN SECONDES EPOCH)
+# ============================================================================
+
+# Écart minimal (secondes) entre deux lignes datées pour signaler un trou
+SEUIL_TROU = 300
+
+
+def statistiques_chronologie(horodatages, seuil_trou: int = SEUIL_TROU, n: int = 10) -> dict:
+    """
+    Début, fin, désordres et trous d'une suite de dates, calculés en bloc
+
+    Avec numpy, tri et différences sont vectorisés; sinon, repli sur sorted() et zip().
+
+    Args:
+        horodatages: Secondes epoch (tableau numpy int64, array('q') ou liste)
+        seuil_trou: Écart minimal en secondes pour compter un trou
+        n: Nombre de trous détaillés (les plus longs)
+
+    Returns:
+        Dictionnaire: nombre, debut, fin, etendue, inversions (lignes plus anciennes que
+        la précédente), trous (nombre) et plus_longs_trous [{debut, fin, duree}]
+    """
+    if np is not None:
+        t = np.asarray(horodatages, dtype=np.int64)
+        if t.size == 0:
+            return {'nombre': 0}
+        inversions = int(np.count_nonzero(t[1:] < t[:-1]))
+        tri = np.sort(t) if inversions else t
+        ecarts = np.diff(tri)
+        indices = np.nonzero(ecarts > seuil_trou)[0]
+        plus_longs = indices[np.argsort(-ecarts[indices], kind="stable")[:n]]
+        trous = [(int(tri[i]), int(tri[i + 1])) for i in plus_longs]
+        nombre_trous = int(indices.size)
+        debut, fin = int(tri[0]), int(tri[-1])
+    else:
+        if not len(horodatages):
+            return {'nombre': 0}
+        inversions = sum(1 for a, b in zip(horodatages, horodatages[1:]) if b < a)
+        tri = sorted(horodatages) if inversions else horodatages
+        candidats = [(a, b) for a, b in zip(tri, tri[1:]) if b - a > seuil_trou]
+        trous = heapq.nsmallest(n, candidats, key=lambda x: (x[0] - x[1], x[0]))
+        nombre_trous = len(candidats)
+        debut, fin = tri[0], tri[-1]
+    return {
+        'nombre': len(horodatages),
+        'debut': debut,
+        'fin': fin,
+        'etendue': fin - debut,
+        'inversions': inversions,
+        'trous': nombre_trous,
+        'plus_longs_trous': [{'debut': a, 'fin': b, 'duree': b - a} for a, b in trous],
+    }
+
+
+class EtapeChronologie(Etape):
+    """
+    Relève la date de chaque ligne datée, en secondes epoch
+
+    Les dates sont accumulées dans un array('q') (int64) au fil du parcours,
+    le format étant détecté une fois par fichier (NormaliseurHorodatage).
+    tableau() les rend sous forme de tableau numpy quand numpy est installé.
+    """
+
+    nom = "chronologie"
+    horodate = True
+
+    def __init__(self):
+        self.horodatages = array("q")
+        self.normaliseur = NormaliseurHorodatage()
+
+    def choisir_reference_dates(self, reference: Optional[float]) -> None:
+        self.normaliseur.choisir_reference(reference)
+
+    def noter_ligne(self, ligne: str, alertes: List[dict], compter_ligne: bool = True) -> None:
+        if compter_ligne:
+            horodatage = self.normaliseur.normaliser(ligne)
+            if horodatage is not None:
+                self.horodatages.append(horodatage)
+
+    def noter_bloc(self, bloc: bytes) -> None:
+        self.horodatages.extend(self.normaliseur.normaliser_bloc(bloc))
+
+    def fusionner(self, autre: "EtapeChronologie", decalage_lignes: int = 0) -> None:
+        self.horodatages.extend(autre.horodatages)
+
+    def tableau(self, trie: bool = False):
+        """Dates des lignes (ordre du fichier ou triées): numpy int64 si disponible, sinon array('q')"""
+        if np is not None:
+            # Copie: une vue sur l'array('q') l'empêcherait de grandir
+            tableau = np.frombuffer(self.horodatages, dtype=np.int64).copy()
+            if trie:
+                tableau.sort()
+            return tableau
+        return array("q", sorted(self.horodatages)) if trie else array("q", self.horodatages)
+
+    def chronologie(self, seuil_trou: int = SEUIL_TROU, n: int = 10) -> dict:
+        """Statistiques de statistiques_chronologie sur les dates relevées"""
+        return statistiques_chronologie(self.tableau() if np is not None else self.horodatages, seuil_trou, n)
+
+    def resume(self) -> dict:
+        return self.chronologie()
+
+    def afficher(self) -> None:
+        stats = self.chronologie(n=1)
+        if stats['nombre']:
+            debut, fin = (time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(stats[c])) for c in ('debut', 'fin'))
+            print(f"   • Période couverte: {debut} → {fin} UTC ({stats['nombre']} lignes datées)")
+            print(f"   • Trous de plus de {SEUIL_TROU} s: {stats['trous']}, lignes hors ordre: {stats['inversions']}")
+            for trou in stats['plus_longs_trous']:
+                print(f"   • Plus long trou: {trou['duree']} s à partir de "
+                      f"{time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(trou['debut']))}")
+
+    def ecrire_rapport(self, f: TextIO, n: int = 10) -> None:
+        """Ajoute au rapport texte la période couverte et les plus longs trous entre lignes datées"""
+        def moment(epoch: int) -> str:
+            return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(epoch))
+
+        stats = self.chronologie(n=n)
+        f.write("\n⏱️ CHRONOLOGIE (UTC):\n")
+        f.write("-" * 80 + "\n")
+        if not stats['nombre']:
+            f.write("Aucune ligne datée.\n")
+            return
+        f.write(f"Lignes datées: {stats['nombre']} (format {self.normaliseur.format})\n")
+        f.write(f"Période: {moment(stats['debut'])} → {moment(stats['fin'])} ({stats['etendue']} s)\n")
+        f.write(f"Lignes plus anciennes que la précédente: {stats['inversions']}\n")
+        f.write(f"Trous de plus de {SEUIL_TROU} s: {stats['trous']}\n")
+        for trou in stats['plus_longs_trous']:
+            f.write(f"  {trou['duree']:>10} s  {moment(trou['debut'])} → {moment(trou['fin'])}\n")
+
+# ============================================================================
+# FENÊTRE TEMPORELLE (RECHERCHE DICHOTOMIQUE DANS UN LOG TRIÉ)
+# ============================================================================
+
+# Borne donnée par une heure seule ("02:10", "02:10:30"): jour de la première ligne datée
+RE_HEURE_SEULE = re.compile(r"(\d{1,2}):(\d{2})(?::(\d{2}))?")
+
+
+def borne_horodatage(valeur, reference: Optional[int] = None, annee: Callable[[int], int] = None) -> int:
+    """
+    Convertit une borne de fenêtre temporelle en secondes epoch (UTC)
+
+    Args:
+        valeur: Secondes epoch, date dans un format reconnu par horodatage_ligne
+            ("2025-01-15 02:10:00", "2025-01-15 02:10", "Jan 15 02:10:00"...) ou heure seule
+        reference: Secondes epoch dont le jour complète une heure seule
+        annee: Année d'une borne syslog selon son mois (AnneesSyslog.fixe du fichier)
+
+    Returns:
+        Secondes epoch de la borne
+
+    Raises:
+        ValueError: Borne illisible
+    """
+    if isinstance(valeur, (int, float)):
+        return int(valeur)
+    texte = valeur.strip()
+    epoch = horodatage_ligne(texte, annee)
+    if epoch is None:
+        # Date ISO sans les secondes
+        epoch = horodatage_ligne(texte + ":00", annee)
+    if epoch is None and reference is not None:
+        heure = RE_HEURE_SEULE.fullmatch(texte)
+        if heure:
+            heures, minutes, secondes = heure.groups()
+            epoch = reference - reference % 86400 + int(heures) * 3600 + int(minutes) * 60 + int(secondes or 0)
+    if epoch is None:
+        raise ValueError(f"Borne de date illisible: {valeur} (ex: 2025-01-15 02:10, Jan 15 02:10:00, 02:10)")
+    return epoch
+
+
+def _premiere_ligne_datee(f: BinaryIO, position: int, limite: int, encodage: str,
+                          annee: Callable[[int], int] = None) -> Tuple[Optional[int], int]:
+    """
+    Première ligne datée qui commence à partir d'un octet
+
+    Args:
+        f: Fichier ouvert en binaire
+        position: Octet quelconque; la lecture reprend au début de ligne suivant
+        limite: Octet au-delà duquel aucune ligne n'est examinée
+        encodage: Encodage des lignes
+        annee: Année des dates syslog selon leur mois (AnneesSyslog.fixe du fichier)
+
+    Returns:
+        (secondes epoch, octet de début de la ligne), ou (None, limite) sans ligne datée
+    """
+    if position:
+        # Resynchronisation: terminer la ligne en cours (sauf si position en est le début)
+        f.seek(position - 1)
+        f.readline()
+    else:
+        f.seek(0)
+    debut = f.tell()
+    while debut < limite:
+        ligne = f.readline()
+        if not ligne:
+            break
+        epoch = horodatage_ligne(_decoder_ligne(ligne, encodage), annee)
+        if epoch is not None:
+            return epoch, debut
+        debut += len(ligne)
+    return None, limite
+
+
+def chercher_position(f: BinaryIO, cible: int, taille: int, encodage: str = "utf-8",
+                      bas: int = 0, haut: int = None, annee: Callable[[int], int] = None) -> int:
+    """
+    Début de la première ligne datée d'au moins cible, par dichotomie sur les octets
+
+    Le fichier doit être trié par date. Chaque étape lit seulement quelques lignes autour
+    du milieu de l'intervalle restant: O(log taille) lectures. Les lignes sans date (trace
+    de pile...) restent avec la ligne datée qui les précède.
+
+    Args:
+        f: Fichier ouvert en binaire
+        cible: Secondes epoch recherchées
+        taille: Taille du fichier
+        encodage: Encodage des lignes (compatible ASCII)
+        bas: Octet avant lequel la ligne cherchée ne peut pas commencer (IndexTemporel.encadrer)
+        haut: Octet à partir duquel la première ligne datée est d'au moins cible (taille par défaut)
+        annee: Année des dates syslog selon leur mois (AnneesSyslog.fixe du fichier)
+
+    Returns:
+        Octet de début de ligne (taille si toutes les lignes datées précèdent cible)
+    """
+    # Invariant: la première ligne datée à partir de haut est d'au moins cible (ou n'existe pas)
+    if haut is None:
+        haut = taille
+    while bas < haut:
+        milieu = (bas + haut) // 2
+        epoch, _ = _premiere_ligne_datee(f, milieu, haut, encodage, annee)
+        if epoch is None or epoch >= cible:
+            haut = milieu
+        else:
+            bas = milieu + 1
+    _, position = _premiere_ligne_datee(f, bas, taille, encodage, annee)
+    return position
+
+
+# Index temporel creux écrit à côté du log: un repère (date, octet) par tranche d'octets
+PAS_INDEX_TEMPOREL = 1024 * 1024
+TAILLE_MIN_INDEX_TEMPOREL = 16 * 1024 * 1024
+SUFFIXE_INDEX_TEMPOREL = ".cfsidx"
+MAGIQUE_INDEX_TEMPOREL = b"CFSTIX1\n"
+
+# En-tête (petit-boutiste): taille, inode et périphérique du log indexé, pas, nombre de repères
+ENTETE_INDEX_TEMPOREL = struct.Struct("<QQQQQ")
+
+
+class IndexTemporel:
+    """
+    Repères (secondes epoch, octet de début de ligne) d'un log trié par date
+
+    Un repère par tranche de pas octets: la date de la première ligne datée de
+    la tranche et sa position. Une recherche de fenêtre commence par une
+    dichotomie sur les repères en mémoire, puis ne lit le fichier qu'entre deux
+    repères. Le fichier compagnon (<log>.cfsidx) stocke les deux tableaux tels
+    quels; il est ignoré dès que la taille ou l'inode du log ne correspondent plus.
+    """
+
+    def __init__(self, taille: int, inode: int, peripherique: int, pas: int = PAS_INDEX_TEMPOREL):
+        """
+        Args:
+            taille: Taille du log indexé
+            inode: Inode du log indexé
+            peripherique: Périphérique du log indexé
+            pas: Octets entre deux repères
+        """
+        self.taille = taille
+        self.inode = inode
+        self.peripherique = peripherique
+        self.pas = pas
+        self.horodatages = array("q")
+        self.positions = array("Q")
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    @staticmethod
+    def chemin_index(chemin: str) -> str:
+        """Fichier compagnon de l'index d'un log"""
+        return chemin + SUFFIXE_INDEX_TEMPOREL
+
+    @classmethod
+    def construire(cls, chemin: str, pas: int = PAS_INDEX_TEMPOREL) -> Optional["IndexTemporel"]:
+        """
+        Relève un repère par tranche de pas octets (quelques lignes lues par tranche)
+
+        Returns:
+            Index, ou None si le log est compressé, d'encodage non compatible ASCII,
+            sans date ou non trié
+        """
+        if detecter_compression(chemin) is not None:
+            return None
+        encodage = detecter_encodage(chemin)
+        if not _compatible_ascii(encodage):
+            return None
+        infos = os.stat(chemin)
+        index = cls(infos.st_size, infos.st_ino, infos.st_dev, pas)
+        annee = AnneesSyslog(infos.st_mtime).fixe
+        with open(chemin, "rb") as f:
+            position = 0
+            while position < index.taille:
+                epoch, debut = _premiere_ligne_datee(f, position, index.taille, encodage, annee)
+                if epoch is None:
+                    break
+                if index.horodatages and epoch < index.horodatages[-1]:
+                    return None  # Log non trié: la dichotomie n'aurait pas de sens
+                if not index.positions or debut > index.positions[-1]:
+                    index.horodatages.append(epoch)
+                    index.positions.append(debut)
+                position = max(position + pas, debut + 1)
+        return index if index.positions else None
+
+    def ecrire(self, chemin_index: str) -> None:
+        """Écrit l'en-tête puis les deux tableaux en petit-boutiste"""
+        horodatages, positions = array("q", self.horodatages), array("Q", self.positions)
+        if sys.byteorder == "big":
+            horodatages.byteswap()
+            positions.byteswap()
+        provisoire = chemin_index + ".tmp"
+        with open(provisoire, "wb") as f:
+            f.write(MAGIQUE_INDEX_TEMPOREL)
+            f.write(ENTETE_INDEX_TEMPOREL.pack(self.taille, self.inode, self.peripherique, self.pas, len(self)))
+            horodatages.tofile(f)
+            positions.tofile(f)
+        os.replace(provisoire, chemin_index)
+
+    @classmethod
+    def charger(cls, chemin: str) -> Optional["IndexTemporel"]:
+        """Index compagnon d'un log, None s'il manque, est illisible ou ne correspond plus au log"""
+        try:
+            infos = os.stat(chemin)
+            with open(cls.chemin_index(chemin), "rb") as f:
+                if f.read(len(MAGIQUE_INDEX_TEMPOREL)) != MAGIQUE_INDEX_TEMPOREL:
+                    return None
+                taille, inode, peripherique, pas, nombre = ENTETE_INDEX_TEMPOREL.unpack(
+                    f.read(ENTETE_INDEX_TEMPOREL.size))
+                if (taille, inode, peripherique) != (infos.st_size, infos.st_ino, infos.st_dev):
+                    return None  # Log modifié, tourné ou remplacé
+                index = cls(taille, inode, peripherique, pas)
+                index.horodatages.fromfile(f, nombre)
+                index.positions.fromfile(f, nombre)
+        except (OSError, EOFError, struct.error):
+            return None
+        if sys.byteorder == "big":
+            index.horodatages.byteswap()
+            index.positions.byteswap()
+        return index
+
+    @classmethod
+    def mettre_a_jour(cls, chemin: str) -> Optional["IndexTemporel"]:
+        """
+        Index valide d'un log: celui du fichier compagnon, sinon construit et écrit
+
+        Returns:
+            Index, ou None pour un log trop petit pour en avoir besoin ou non indexable
+
+        Raises:
+            OSError: Fichier compagnon impossible à écrire (dossier en lecture seule...)
+        """
+        if os.path.getsize(chemin) < TAILLE_MIN_INDEX_TEMPOREL:
+            return None
+        index = cls.charger(chemin)
+        if index is None:
+            index = cls.construire(chemin)
+            if index is not None:
+                index.ecrire(cls.chemin_index(chemin))
+        return index
+
+    def encadrer(self, cible: int) -> Tuple[int, int]:
+        """
+        Octets entre lesquels commence la première ligne datée d'au moins cible
+
+        Returns:
+            (bas, haut) à passer à chercher_position
+        """
+        i = bisect_left(self.horodatages, cible)
+        bas = self.positions[i - 1] + 1 if i else 0
+        haut = self.positions[i] if i < len(self.positions) else self.taille
+        return bas, haut
+
+
+def plage_temporelle(chemin: str, depuis=None, jusqua=None,
+                     index: IndexTemporel = None) -> Tuple[int, int, Optional[int], Optional[int]]:
+    """
+    Plage d'octets des lignes d'un log trié par date comprises dans une fenêtre temporelle
+
+    Args:
+        chemin: Fichier log non compressé, trié par date
+        depuis: Début de la fenêtre, inclus (voir borne_horodatage; début du fichier si None)
+        jusqua: Fin de la fenêtre, incluse à la seconde près (fin du fichier si None);
+            une heure seule antérieure à depuis désigne le lendemain
+        index: Index temporel valide du fichier (IndexTemporel.charger), qui réduit la
+            dichotomie dans le fichier à l'intervalle entre deux repères (optionnel)
+
+    Returns:
+        (premier octet, octet suivant le dernier, début, fin en secondes epoch)
+
+    Raises:
+        ValueError: Fichier compressé, encodage non compatible ASCII ou borne illisible
+    """
+    if detecter_compression(chemin) is not None:
+        raise ValueError("Fenêtre temporelle: un fichier compressé ne permet pas d'accès direct, "
+                         "le décompresser d'abord")
+    encodage = detecter_encodage(chemin)
+    if not _compatible_ascii(encodage):
+        raise ValueError(f"Fenêtre temporelle: encodage {encodage} non pris en charge")
+    taille = os.path.getsize(chemin)
+    annee = AnneesSyslog(os.path.getmtime(chemin)).fixe
+    with open(chemin, "rb") as f:
+        reference, _ = _premiere_ligne_datee(f, 0, taille, encodage, annee)
+        debut_epoch = borne_horodatage(depuis, reference, annee) if depuis is not None else None
+        fin_epoch = borne_horodatage(jusqua, reference, annee) if jusqua is not None else None
+        if (debut_epoch is not None and fin_epoch is not None and fin_epoch < debut_epoch
+                and RE_HEURE_SEULE.fullmatch(str(jusqua).strip())):
+            fin_epoch += 86400  # 23:50 → 00:20: la fenêtre passe minuit
+        def position(cible: int) -> int:
+            bas, haut = index.encadrer(cible) if index else (0, taille)
+            return chercher_position(f, cible, taille, encodage, bas, haut, annee)
+
+        debut = position(debut_epoch) if debut_epoch is not None else 0
+        fin = position(fin_epoch + 1) if fin_epoch is not None else taille
+    return debut, max(debut, fin), debut_epoch, fin_epoch
+
+# ============================================================================
+# FRÉQUENCES ET HISTOGRAMMES TEMPORELS
+# ============================================================================
+
+# Largeur des intervalles d'histogramme, en secondes
+RESOLUTIONS_HISTOGRAMME = {"minute": 60, "heure": 3600}
+
+# Nombre maximal d'intervalles par série (une date aberrante n'alloue pas des années de cases)
+ETENDUE_MAX_HISTOGRAMME = 400 * 24 * 60
+
+# Catégories dont chaque occurrence est comptée
+CATEGORIES_COMPTEES = ("emails", "ips", "urls")
+
+
+class HistogrammeTemps:
+    """
+    Comptes d'événements par intervalle de temps
+
+    Chaque série est un tableau compact array('L') couvrant ses intervalles
+    du premier au dernier, et non un dictionnaire par intervalle.
+    """
+
+    def __init__(self, resolution: int = 60):
+        """
+        Args:
+            resolution: Largeur d'un intervalle en secondes
+        """
+        self.resolution = resolution
+        self.series: Dict[str, list] = {}  # nom -> [premier intervalle, array('L')]
+        self.hors_etendue = 0
+
+    def ajouter(self, serie: str, horodatage: int, n: int = 1) -> None:
+        """Compte n événements à la date donnée (secondes epoch)"""
+        case = horodatage // self.resolution
+        entree = self.series.get(serie)
+        if entree is None:
+            self.series[serie] = [case, array("L", [n])]
+            return
+        debut, comptes = entree
+        index = case - debut
+        if index < 0:
+            if len(comptes) - index > ETENDUE_MAX_HISTOGRAMME:
+                self.hors_etendue += n
+                return
+            comptes[0:0] = array("L", bytes(comptes.itemsize * -index))
+            entree[0] = debut = case
+            index = 0
+        elif index >= len(comptes):
+            if index >= ETENDUE_MAX_HISTOGRAMME:
+                self.hors_etendue += n
+                return
+            comptes.frombytes(bytes(comptes.itemsize * (index + 1 - len(comptes))))
+        comptes[index] += n
+
+    def fusionner(self, autre: "HistogrammeTemps") -> None:
+        """Ajoute les comptes d'un autre histogramme de même résolution"""
+        for serie, (debut, comptes) in autre.series.items():
+            for index, n in enumerate(comptes):
+                if n:
+                    self.ajouter(serie, (debut + index) * self.resolution, n)
+        self.hors_etendue += autre.hors_etendue
+
+    def serie(self, nom: str) -> List[Tuple[int, int]]:
+        """(début d'intervalle en secondes epoch, compte) des intervalles non vides d'une série"""
+        if nom not in self.series:
+            return []
+        debut, comptes = self.series[nom]
+        return [((debut + index) * self.resolution, n) for index, n in enumerate(comptes) if n]
+
+    def plus_charges(self, nom: str, n: int = 10) -> List[Tuple[int, int]]:
+        """Les n intervalles les plus chargés d'une série"""
+        return sorted(self.serie(nom), key=lambda x: (-x[1], x[0]))[:n]
+
+    def vers_dict(self) -> dict:
+        """Représentation sérialisable en JSON"""
+        return {
+            'resolution': self.resolution,
+            'series': {nom: {'debut': debut * self.resolution, 'comptes': comptes.tolist()}
+                       for nom, (debut, comptes) in self.series.items()}
+        }
+
+
+class EtapeFrequences(Etape):
+    """
+    Compte les occurrences et les répartit dans le temps
+
+    Nombre d'occurrences de chaque email, IP et lien, nombre d'alertes par
+    mot-clé, histogrammes des lignes, des alertes et de chaque mot-clé, et pour
+    chaque couple (mot-clé, IP) le plus grand nombre d'alertes dans un même
+    intervalle (rafale de 401 depuis une adresse, etc.).
+    """
+
+    nom = "frequences"
+    compte_occurrences = True
+    horodate = True
+
+    def __init__(self, resolution: int = 60):
+        """
+        Args:
+            resolution: Largeur des intervalles en secondes (voir RESOLUTIONS_HISTOGRAMME)
+        """
+        self.resolution = resolution
+        self.occurrences: Dict[str, Counter] = {categorie: Counter() for categorie in CATEGORIES_COMPTEES}
+        self.mots_cles: Counter = Counter()
+        self.histogramme = HistogrammeTemps(resolution)
+        self.normaliseur = NormaliseurHorodatage()
+        # (mot, ip) -> [intervalle courant, son compte, max, intervalle du max, premier intervalle, son compte]
+        self.pics: Dict[Tuple[str, str], List[int]] = {}
+
+    def vierge(self) -> "EtapeFrequences":
+        return EtapeFrequences(self.resolution)
+
+    def choisir_reference_dates(self, reference: Optional[float]) -> None:
+        self.normaliseur.choisir_reference(reference)
+
+    def ajouter_entites(self, categorie: str, valeurs) -> None:
+        if categorie in self.occurrences:
+            self.occurrences[categorie].update(valeurs)
+
+    def noter_ligne(self, ligne: str, alertes: List[dict], compter_ligne: bool = True) -> None:
+        """
+        Compte les alertes d'une ligne par mot-clé et les place dans les histogrammes
+
+        Args:
+            ligne: Ligne de log
+            alertes: Alertes produites par la ligne
+            compter_ligne: Compter la ligne dans la série "lignes" (faux si noter_bloc l'a fait)
+        """
+        if alertes:
+            self.mots_cles.update(alerte['mot_cle'] for alerte in alertes)
+        horodatage = self.normaliseur.normaliser(ligne)
+        if horodatage is None:
+            return
+        histogramme = self.histogramme
+        if compter_ligne:
+            histogramme.ajouter("lignes", horodatage)
+        if not alertes:
+            return
+        histogramme.ajouter("alertes", horodatage, len(alertes))
+        case = horodatage // self.resolution
+        ips = [ip for ip in _trouver_ips(ligne) if valider_ip(ip)] if "." in ligne else []
+        for alerte in alertes:
+            mot = alerte['mot_cle']
+            histogramme.ajouter("mot:" + mot, horodatage)
+            for ip in ips:
+                pic = self.pics.get((mot, ip))
+                if pic is None:
+                    self.pics[(mot, ip)] = [case, 1, 1, case, case, 1]
+                    continue
+                if pic[0] == case:
+                    pic[1] += 1
+                    if case == pic[4]:
+                        pic[5] += 1
+                else:
+                    pic[0], pic[1] = case, 1
+                if pic[1] > pic[2]:
+                    pic[2], pic[3] = pic[1], case
+
+    def noter_bloc(self, bloc: bytes) -> None:
+        """Compte les lignes horodatées d'un bloc d'octets dans la série « lignes »"""
+        ajouter = self.histogramme.ajouter
+        for horodatage in self.normaliseur.normaliser_bloc(bloc):
+            ajouter("lignes", horodatage)
+
+    def _fusionner_pic(self, cle: Tuple[str, str], pic: List[int]) -> None:
+        """Raccorde le pic d'un morceau suivant, une rafale à cheval sur les deux étant réunie"""
+        actuel = self.pics.get(cle)
+        if actuel is None:
+            self.pics[cle] = list(pic)
+            return
+        courant, compte = pic[0], pic[1]
+        if actuel[0] == pic[4]:
+            # Même intervalle de part et d'autre de la frontière
+            raccord = actuel[1] + pic[5]
+            if raccord > actuel[2]:
+                actuel[2], actuel[3] = raccord, pic[4]
+            if courant == pic[4]:
+                compte = raccord
+        if pic[2] > actuel[2]:
+            actuel[2], actuel[3] = pic[2], pic[3]
+        if actuel[4] == actuel[0] == pic[4]:
+            actuel[5] += pic[5]
+        actuel[0], actuel[1] = courant, compte
+
+    def fusionner(self, autre: "EtapeFrequences", decalage_lignes: int = 0) -> None:
+        for categorie in CATEGORIES_COMPTEES:
+            self.occurrences[categorie].update(autre.occurrences[categorie])
+        self.mots_cles.update(autre.mots_cles)
+        self.histogramme.fusionner(autre.histogramme)
+        for cle, pic in autre.pics.items():
+            self._fusionner_pic(cle, pic)
+
+    def plus_frequentes(self, categorie: str, n: int = None) -> List[Tuple[str, int, int]]:
+        if categorie not in self.occurrences:
+            return []
+        classement = sorted(self.occurrences[categorie].items(), key=lambda x: (-x[1], x[0]))
+        return [(valeur, compte, 0) for valeur, compte in classement[:n]]
+
+    def rafales(self, n: int = 10) -> List[Tuple[str, str, int, int]]:
+        """
+        Plus fortes concentrations d'alertes d'un mot-clé depuis une même IP
+
+        Returns:
+            Liste de (mot-clé, ip, alertes dans l'intervalle, début de l'intervalle en secondes epoch)
+        """
+        classement = sorted(self.pics.items(), key=lambda x: (-x[1][2], x[0]))
+        return [(mot, ip, pic[2], pic[3] * self.resolution) for (mot, ip), pic in classement[:n]]
+
+    def resume(self, n: int = 20) -> dict:
+        """Comptes, rafales et histogrammes sous forme sérialisable en JSON"""
+        return {
+            'mots_cles': dict(self.mots_cles.most_common()),
+            'rafales': [{'mot_cle': mot, 'ip': ip, 'alertes': nombre, 'debut': debut}
+                        for mot, ip, nombre, debut in self.rafales(n)],
+            'histogrammes': self.histogramme.vers_dict(),
+        }
+
+    def afficher(self) -> None:
+        for mot, ip, nombre, debut in self.rafales(3):
+            moment = time.strftime('%Y-%m-%d %H:%M', time.gmtime(debut))
+            print(f"   • Rafale: {nombre}× '{mot}' depuis {ip} ({moment}, par {self.resolution} s)")
+
+    def ecrire_rapport(self, f: TextIO, n: int = 20) -> None:
+        """Ajoute au rapport texte les comptes, les rafales et les intervalles les plus chargés"""
+        def moment(debut: int) -> str:
+            return time.strftime('%Y-%m-%d %H:%M', time.gmtime(debut))
+
+        f.write(f"\n📈 FRÉQUENCES (intervalles de {self.resolution} s):\n")
+        f.write("-" * 80 + "\n")
+        for categorie, titre in (("ips", "IPs"), ("emails", "Emails"), ("urls", "Liens")):
+            classement = self.plus_frequentes(categorie, n)
+            if classement:
+                f.write(f"\n{titre} les plus fréquents:\n")
+                for valeur, compte, _ in classement:
+                    f.write(f"  {compte:>8}  {valeur}\n")
+        if self.mots_cles:
+            f.write("\nAlertes par mot-clé:\n")
+            for mot, compte in self.mots_cles.most_common():
+                f.write(f"  {compte:>8}  {mot}\n")
+        rafales = self.rafales(n)
+        if rafales:
+            f.write("\nRafales (alertes d'un mot-clé depuis une IP dans un même intervalle):\n")
+            for mot, ip, nombre, debut in rafales:
+                f.write(f"  {nombre:>8}  {mot:<15} {ip:<16} {moment(debut)}\n")
+        charges = self.histogramme.plus_charges("alertes", n)
+        if charges:
+            f.write("\nIntervalles les plus chargés en alertes:\n")
+            lignes = dict(self.histogramme.serie("lignes"))
+            for debut, nombre in charges:
+                f.write(f"  {moment(debut)}  {nombre:>8} alertes  {lignes.get(debut, 0):>8} lignes\n")
+
+# ============================================================================
+# CORRÉLATION DES ÉCHECS D'AUTHENTIFICATION (FORCE BRUTE)
+# ============================================================================
+
+# Seuils de détection: (nombre d'échecs, fenêtre glissante en secondes)
+SEUILS_FORCE_BRUTE = {
+    "ip": (10, 60),            # Échecs depuis une même adresse source
+    "utilisateur": (10, 300),  # Échecs visant un même compte, toutes sources confondues
+    "comptes": (5, 300),       # Comptes distincts essayés depuis une même adresse (bourrage d'identifiants)
+}
+
+# Mot-clé des alertes de corrélation, par type de seuil
+MOTS_CLES_CORRELATION = {
+    "ip": "force brute (ip)",
+    "utilisateur": "force brute (utilisateur)",
+    "comptes": "bourrage d'identifiants",
+}
+
+# Sources suivies avant un balayage des fenêtres inactives
+SOURCES_AVANT_BALAYAGE = 1024
+
+_IP_AUTH = r"(?P<ip>[0-9a-fA-F:.]{3,45})"
+
+# Lignes d'échec d'authentification: adresse source et compte visé (l'un ou l'autre peut manquer)
+MOTIFS_ECHEC_AUTH = [
+    # sshd: "Failed password for [invalid user] bob from 1.2.3.4 port 22 ssh2"
+    re.compile(r"Failed (?:password|publickey|none|keyboard-interactive(?:/pam)?) for "
+               r"(?:invalid user )?(?P<utilisateur>\S+) from " + _IP_AUTH),
+    # PAM: "authentication failure; logname= uid=0 ... rhost=1.2.3.4  user=bob"
+    re.compile(r"authentication failure;.*?\brhost=" + _IP_AUTH + r"?(?:\s+user=(?P<utilisateur>\S+))?"),
+    # Journal d'accès HTTP (format commun ou combiné) répondant 401
+    re.compile(r'^' + _IP_AUTH + r' \S+ (?P<utilisateur>\S+) \[[^\]]*\] "[^"]*" 401 '),
+    # Messages applicatifs: "Login failed for bob from 1.2.3.4"
+    re.compile(r"(?i:login failed|authentication failed|failed login) for (?:user )?'?(?P<utilisateur>[^\s']+)'?"
+               r"(?: from " + _IP_AUTH + r")?"),
+]
+
+# Préfiltre commun aux motifs, appliqué aux lignes puis aux blocs d'octets entiers
+_FILTRE_ECHEC_AUTH = r"""Failed |authentication failure|" 401 |(?i:login failed|authentication failed|failed login)"""
+RE_FILTRE_ECHEC_AUTH = re.compile(_FILTRE_ECHEC_AUTH)
+RE_LIGNE_ECHEC_AUTH_OCTETS = re.compile((r"(?m)^[^\n]*?(?:" + _FILTRE_ECHEC_AUTH + ")").encode("ascii"))
+
+
+def echec_authentification(ligne: str) -> Optional[Tuple[Optional[str], Optional[str]]]:
+    """
+    Reconnaît une ligne d'échec d'authentification
+
+    Returns:
+        (ip, utilisateur), chacun pouvant valoir None, ou None si la ligne n'est pas un échec
+    """
+    if not RE_FILTRE_ECHEC_AUTH.search(ligne):
+        return None
+    for motif in MOTIFS_ECHEC_AUTH:
+        correspondance = motif.search(ligne)
+        if correspondance:
+            ip, utilisateur = correspondance.group("ip", "utilisateur")
+            if utilisateur == "-":
+                utilisateur = None
+            if ip or utilisateur:
+                return ip, utilisateur
+    return None
+
+
+class DetecteurForceBrute:
+    """
+    Corrélation des échecs d'authentification dans des fenêtres de temps glissantes
+
+    Chaque source (IP ou compte) a sa file (deque) des dates d'échec de la fenêtre:
+    un échec ajoute une date et retire les dates expirées, en temps constant amorti.
+    Une seule alerte est levée par épisode, jusqu'à ce que la source reste inactive
+    le temps d'une fenêtre. Les sources inactives sont oubliées au fil des balayages,
+    si bien que la mémoire dépend du nombre de sources actives et non de la taille du log.
+    Les dates viennent des lignes elles-mêmes: le même détecteur sert au suivi en
+    continu comme aux journaux historiques.
+    """
+
+    def __init__(self, seuils: Dict[str, Tuple[int, int]] = None):
+        """
+        Args:
+            seuils: Seuils remplaçant ceux de SEUILS_FORCE_BRUTE, par type
+                ("ip", "utilisateur", "comptes"): (nombre, secondes)
+        """
+        self.seuils = {**SEUILS_FORCE_BRUTE, **(seuils or {})}
+        self.normaliseur = NormaliseurHorodatage()
+        self.maintenant = None     # Date du dernier échec daté (secondes epoch)
+        self.echecs = 0
+        self.detections: List[dict] = []
+        # Par type: source -> [file des dates, alerte levée pour l'épisode en cours]
+        self._fenetres: Dict[str, Dict[str, list]] = {"ip": {}, "utilisateur": {}}
+        # Comptes essayés par IP: ip -> [file des (date, compte), comptes de la fenêtre, alerte levée]
+        self._comptes: Dict[str, list] = {}
+        self._limite_balayage = SOURCES_AVANT_BALAYAGE
+
+    def sources_actives(self) -> int:
+        """Nombre de fenêtres actuellement en mémoire"""
+        return sum(len(fenetres) for fenetres in self._fenetres.values()) + len(self._comptes)
+
+    def observer(self, ligne_num: int, ligne: str) -> List[dict]:
+        """
+        Prend en compte une ligne (déjà nettoyée) et renvoie les alertes de corrélation
+
+        Les lignes d'échec sans date reprennent la date du dernier échec daté;
+        elles sont ignorées tant qu'aucune date n'a été vue.
+        """
+        echec = echec_authentification(ligne)
+        if echec is None:
+            return []
+        horodatage = self.normaliseur.normaliser(ligne)
+        if horodatage is None:
+            horodatage = self.maintenant
+            if horodatage is None:
+                return []
+        self.maintenant = horodatage
+        self.echecs += 1
+        ip, utilisateur = echec
+
+        alertes = []
+        if ip:
+            nombre = self._glisser("ip", ip, horodatage)
+            if nombre:
+                alertes.append(self._detecter("ip", ip, nombre, ligne_num, horodatage))
+        if utilisateur:
+            nombre = self._glisser("utilisateur", utilisateur, horodatage)
+            if nombre:
+                alertes.append(self._detecter("utilisateur", utilisateur, nombre, ligne_num, horodatage))
+        if ip and utilisateur:
+            nombre = self._glisser_comptes(ip, utilisateur, horodatage)
+            if nombre:
+                alertes.append(self._detecter("comptes", ip, nombre, ligne_num, horodatage))
+
+        if self.sources_actives() > self._limite_balayage:
+            self.balayer()
+        return alertes
+
+    def _glisser(self, type_seuil: str, source: str, horodatage: int) -> int:
+        """Ajoute un échec à la fenêtre d'une source; renvoie le compte si le seuil est franchi"""
+        seuil, fenetre = self.seuils[type_seuil]
+        fenetres = self._fenetres[type_seuil]
+        entree = fenetres.get(source)
+        if entree is None or horodatage - entree[0][-1] >= fenetre or horodatage < entree[0][0] - fenetre:
+            # Nouvel épisode: source inconnue, inactive depuis une fenêtre, ou saut de date en arrière
+            entree = fenetres[source] = [deque(), False]
+        dates = entree[0]
+        # Léger désordre entre lignes: la file reste croissante
+        dates.append(max(horodatage, dates[-1]) if dates else horodatage)
+        limite = dates[-1] - fenetre
+        while dates[0] <= limite:
+            dates.popleft()
+        if len(dates) >= seuil and not entree[1]:
+            entree[1] = True
+            return len(dates)
+        return 0
+
+    def _glisser_comptes(self, ip: str, utilisateur: str, horodatage: int) -> int:
+        """Ajoute un compte essayé depuis une IP; renvoie le nombre de comptes distincts si le seuil est franchi"""
+        seuil, fenetre = self.seuils["comptes"]
+        entree = self._comptes.get(ip)
+        if entree is None or horodatage - entree[0][-1][0] >= fenetre or horodatage < entree[0][0][0] - fenetre:
+            entree = self._comptes[ip] = [deque(), {}, False]
+        essais, comptes = entree[0], entree[1]
+        date = max(horodatage, essais[-1][0]) if essais else horodatage
+        essais.append((date, utilisateur))
+        comptes[utilisateur] = comptes.get(utilisateur, 0) + 1
+        limite = date - fenetre
+        while essais[0][0] <= limite:
+            _, ancien = essais.popleft()
+            comptes[ancien] -= 1
+            if not comptes[ancien]:
+                del comptes[ancien]
+        if len(comptes) >= seuil and not entree[2]:
+            entree[2] = True
+            return len(comptes)
+        return 0
+
+    def _detecter(self, type_seuil: str, source: str, nombre: int, ligne_num: int, horodatage: int) -> dict:
+        """Enregistre une détection et construit l'alerte correspondante"""
+        fenetre = self.seuils[type_seuil][1]
+        self.detections.append({'type': type_seuil, 'source': source, 'nombre': nombre,
+                                'fenetre': fenetre, 'ligne': ligne_num, 'date': horodatage})
+        if type_seuil == "comptes":
+            contenu = f"{nombre} comptes distincts essayés en {fenetre} s depuis {source}"
+        elif type_seuil == "ip":
+            contenu = f"{nombre} échecs d'authentification en {fenetre} s depuis {source}"
+        else:
+            contenu = f"{nombre} échecs d'authentification en {fenetre} s pour le compte {source}"
+        return {
+            'ligne': ligne_num,
+            'mot_cle': MOTS_CLES_CORRELATION[type_seuil],
+            'position': 0,
+            'contenu': contenu,
+            'tronque': False
+        }
+
+    def balayer(self) -> None:
+        """Oublie les sources sans échec depuis plus d'une fenêtre (ou datées bien après maintenant)"""
+        maintenant = self.maintenant
+        for type_seuil, fenetres in self._fenetres.items():
+            fenetre = self.seuils[type_seuil][1]
+            for source in [s for s, (dates, _) in fenetres.items() if abs(maintenant - dates[-1]) >= fenetre]:
+                del fenetres[source]
+        fenetre = self.seuils["comptes"][1]
+        for ip in [ip for ip, (essais, _, _) in self._comptes.items() if abs(maintenant - essais[-1][0]) >= fenetre]:
+            del self._comptes[ip]
+        # Prochain balayage quand le nombre de sources actives aura doublé
+        self._limite_balayage = max(SOURCES_AVANT_BALAYAGE, 2 * self.sources_actives())
+
+    def resume(self) -> dict:
+        """Échecs vus et détections sous forme sérialisable en JSON"""
+        return {
+            'echecs_authentification': self.echecs,
+            'seuils': {type_seuil: {'nombre': n, 'fenetre': t} for type_seuil, (n, t) in self.seuils.items()},
+            'detections': self.detections,
+        }
+
+
+class EtapeCorrelation(Etape):
+    """
+    Corrèle les échecs d'authentification (DetecteurForceBrute)
+
+    Les fenêtres glissantes suivent l'ordre du fichier: l'analyse reste séquentielle.
+    Les alertes de corrélation rejoignent le flux des alertes, avec leur propre contenu.
+    """
+
+    nom = "correlation"
+    correle = True
+    sequentielle = True
+
+    def __init__(self, seuils: Dict[str, Tuple[int, int]] = None):
+        """
+        Args:
+            seuils: Seuils remplaçant ceux de SEUILS_FORCE_BRUTE
+        """
+        self.force_brute = DetecteurForceBrute(seuils)
+
+    def vierge(self) -> "EtapeCorrelation":
+        return EtapeCorrelation(self.force_brute.seuils)
+
+    def choisir_reference_dates(self, reference: Optional[float]) -> None:
+        self.force_brute.normaliseur.choisir_reference(reference)
+
+    def traiter_ligne(self, ligne_num: int, ligne: str) -> List[dict]:
+        return self.force_brute.observer(ligne_num, ligne)
+
+    def correler_bloc(self, bloc: bytes, ligne_base: int,
+                      encodage: str = "utf-8") -> Iterator[Tuple[int, str, List[dict]]]:
+        """
+        Alertes de corrélation d'un bloc de lignes complètes
+
+        Un seul parcours en C repère les lignes candidates; seules celles-ci sont décodées.
+        """
+        ligne_num = ligne_base
+        dernier_debut = 0
+        for correspondance in RE_LIGNE_ECHEC_AUTH_OCTETS.finditer(bloc):
+            debut = correspondance.start()
+            ligne_num += bloc.count(b"\n", dernier_debut, debut)
+            dernier_debut = debut
+            fin = bloc.find(b"\n", debut)
+            ligne = _decoder_ligne(bloc[debut:fin if fin >= 0 else len(bloc)], encodage).strip()
+            alertes = self.force_brute.observer(ligne_num + 1, ligne)
+            if alertes:
+                yield ligne_num + 1, ligne, alertes
+
+    def resume(self) -> dict:
+        return self.force_brute.resume()
+
+    def afficher(self) -> None:
+        print(f"   • Échecs d'authentification: {self.force_brute.echecs}, "
+              f"détections de force brute: {len(self.force_brute.detections)}")
+
+# ============================================================================
+# GABARITS DES LIGNES EN ALERTE
+# ============================================================================
+
+class EtapeGabarits(Etape):
+    """
+    Regroupe les lignes en alerte par gabarit (MineurGabarits)
+
+    Le rapport liste les gabarits à la place des alertes, qui sont alors comptées sans
+    être conservées: des millions de lignes presque identiques tiennent en quelques
+    gabarits, avec leurs comptes et leurs mots-clés.
+    """
+
+    nom = "gabarits"
+    note_alertes = True
+    section = "alertes"
+
+    def __init__(self):
+        self.mineur = MineurGabarits()
+
+    def noter_alertes(self, ligne: str, alertes: List[dict]) -> None:
+        self.mineur.ajouter(ligne, alertes[0]['ligne'], [alerte['mot_cle'] for alerte in alertes])
+
+    def fusionner(self, autre: "EtapeGabarits", decalage_lignes: int = 0) -> None:
+        autre.mineur.decaler_lignes(decalage_lignes)
+        self.mineur.fusionner(autre.mineur)
+
+    def resume(self) -> dict:
+        return self.mineur.vers_dict(100)
+
+    def afficher(self) -> None:
+        print(f"   • Lignes en alerte regroupées en {len(self.mineur.gabarits)} gabarits:")
+        for gabarit in self.mineur.plus_frequents(5):
+            print(f"     {gabarit.nombre:>8}× {gabarit.texte[:90]}")
+
+    def ecrire_rapport(self, f: TextIO) -> None:
+        """Écrit la section des alertes du rapport texte, un gabarit par groupe de lignes semblables"""
+        mineur = self.mineur
+        f.write(f"🚨 ALERTES DE SÉCURITÉ ({mineur.lignes} lignes, {len(mineur.gabarits)} gabarits):\n")
+        f.write("-" * 80 + "\n")
+        if not mineur.gabarits:
+            f.write("Aucune alerte détectée.\n")
+            return
+        for i, gabarit in enumerate(mineur.plus_frequents(), 1):
+            mots = ", ".join(f"{mot} ({compte})" for mot, compte in gabarit.mots_cles.most_common())
+            f.write(f"\n{i}. {gabarit.nombre} lignes - première: ligne {gabarit.premiere_ligne}\n")
+            f.write(f"   Gabarit: {gabarit.texte}\n")
+            f.write(f"   Exemple: {gabarit.exemple}\n")
+            f.write(f"   Mots-clés: {mots}\n")
+
+# ============================================================================
+# CORRESPONDANCES AVEC DES LISTES D'IOC (RENSEIGNEMENT SUR LES MENACES)
+# ============================================================================
+
+# Gravité des alertes d'indicateurs de compromission (les alertes de mots-clés n'en portent pas)
+GRAVITE_HAUTE = "haute"
+
+# Hôte d'une URL, sans identifiants ni port
+RE_HOTE_URL = re.compile(r"://(?:[^/@\s]*@)?([^/:?#\s]+)")
+
+
+class EtapeMenaces(Etape):
+    """
+    Confronte chaque IP, domaine (emails, liens) et URL aux listes d'IOC
+
+    Une entité présente dans une liste (ListesIOC) devient une alerte de gravité
+    haute sur sa ligne, à côté des alertes de mots-clés. Les résultats de recherche
+    sont mémorisés: une IP répétée un million de fois n'est cherchée qu'une fois.
+    Copiée vers un worker, une étape ne transporte que le chemin du cache des listes,
+    relu une fois par processus.
+    """
+
+    nom = "ioc"
+    correle = True
+    section = "avant"
+
+    def __init__(self, listes: ListesIOC, secrets: DetecteurSecrets = None):
+        """
+        Args:
+            listes: Listes de blocage compilées
+            secrets: Détecteur des secrets à masquer dans les indicateurs (une URL listée peut
+                porter un jeton), celui de l'étape secrets qui les cherche (None = aucun)
+        """
+        self.listes = listes
+        self.secrets = secrets
+        # (type, indicateur, liste) -> nombre de lignes, et première ligne
+        self.correspondances: Counter = Counter()
+        self.premieres: Dict[Tuple[str, str, str], int] = {}
+
+    def vierge(self) -> "EtapeMenaces":
+        return EtapeMenaces(self.listes, self.secrets)
+
+    def _verifier(self, categorie: str, valeur: str) -> Optional[Tuple[str, str, str]]:
+        """(type, indicateur, liste) si une entité figure dans les listes, sinon None"""
+        resultat = self._chercher(categorie, valeur)
+        if resultat and self.secrets is not None:
+            trouves = self.secrets.rechercher(resultat[1])
+            if trouves:
+                return resultat[0], masquer_texte(resultat[1], trouves), resultat[2]
+        return resultat
+
+    def _chercher(self, categorie: str, valeur: str) -> Optional[Tuple[str, str, str]]:
+        """(type, indicateur, liste) d'une entité dans les listes, indicateur en clair"""
+        listes = self.listes
+        if categorie == "ips":
+            liste = listes.verifier_ip(valeur) if valider_ip(valeur) else None
+            return ("ip", valeur, liste) if liste else None
+        if categorie == "emails":
+            domaine = valeur.rsplit("@", 1)[1]
+            liste = listes.verifier_domaine(domaine)
+            return ("domaine", domaine, liste) if liste else None
+        liste = listes.verifier_url(valeur)
+        if liste:
+            return "url", valeur, liste
+        hote = RE_HOTE_URL.search(valeur)
+        # Un hôte IP est déjà confronté aux listes par le parcours des IP
+        if hote and not RE_IP.fullmatch(hote.group(1)):
+            liste = listes.verifier_domaine(hote.group(1))
+            if liste:
+                return "domaine", hote.group(1).lower(), liste
+        return None
+
+    def _correspondances(self, texte, motifs) -> List[Tuple[int, str, str, str]]:
+        """(position, type, indicateur, liste) des entités d'une ligne ou d'un bloc présentes dans les listes"""
+        trouvees = []
+        for categorie, motif, declencheur in motifs:
+            if declencheur in texte:
+                for correspondance in motif.finditer(texte):
+                    valeur = correspondance.group()
+                    if isinstance(valeur, bytes):
+                        valeur = valeur.decode("ascii")
+                    resultat = self._verifier(categorie, valeur)
+                    if resultat:
+                        trouvees.append((correspondance.start(), *resultat))
+        trouvees.sort()
+        return trouvees
+
+    def _alerte(self, ligne_num: int, position: int, type_ioc: str, indicateur: str, liste: str) -> dict:
+        """Alerte d'un indicateur listé, qui cite sa ligne (contenu None)"""
+        cle = (type_ioc, indicateur, liste)
+        self.correspondances[cle] += 1
+        self.premieres.setdefault(cle, ligne_num)
+        return {
+            'ligne': ligne_num,
+            'mot_cle': f"IOC {type_ioc}",
+            'position': position,
+            'contenu': None,
+            'tronque': False,
+            'gravite': GRAVITE_HAUTE,
+            'indicateur': indicateur,
+            'liste': liste,
+        }
+
+    def traiter_ligne(self, ligne_num: int, ligne: str) -> List[dict]:
+        menaces, vues = [], set()
+        for position, type_ioc, indicateur, liste in self._correspondances(
+                ligne, (("ips", RE_IP, "."), ("emails", RE_EMAIL, "@"), ("urls", RE_URL, "://"))):
+            if (type_ioc, indicateur) not in vues:
+                vues.add((type_ioc, indicateur))
+                menaces.append(self._alerte(ligne_num, position, type_ioc, indicateur, liste))
+        return menaces
+
+    def correler_bloc(self, bloc: bytes, ligne_base: int,
+                      encodage: str = "utf-8") -> Iterator[Tuple[int, str, List[dict]]]:
+        """
+        Alertes d'IOC d'un bloc de lignes complètes
+
+        Les entités sont repérées en octets sur tout le bloc; seules les lignes
+        portant un indicateur listé sont décodées.
+        """
+        ligne_num = ligne_base
+        dernier_debut, debut_ligne = 0, -1
+        ligne, retrait, vues, alertes = "", 0, set(), []
+        for position, type_ioc, indicateur, liste in self._correspondances(
+                bloc, (("ips", RE_IP_OCTETS, b"."), ("emails", RE_EMAIL_OCTETS, b"@"),
+                       ("urls", RE_URL_OCTETS, b"://"))):
+            debut = bloc.rfind(b"\n", 0, position) + 1
+            if debut != debut_ligne:
+                if alertes:
+                    yield ligne_num + 1, ligne, alertes
+                ligne_num += bloc.count(b"\n", dernier_debut, debut)
+                dernier_debut = debut_ligne = debut
+                fin = bloc.find(b"\n", position)
+                brute = bloc[debut:fin if fin >= 0 else len(bloc)]
+                retrait = len(brute) - len(brute.lstrip())
+                ligne = _decoder_ligne(brute, encodage).strip()
+                vues, alertes = set(), []
+            if (type_ioc, indicateur) not in vues:
+                vues.add((type_ioc, indicateur))
+                colonne = len(_decoder_ligne(bloc[debut + retrait:position], encodage))
+                alertes.append(self._alerte(ligne_num + 1, colonne, type_ioc, indicateur, liste))
+        if alertes:
+            yield ligne_num + 1, ligne, alertes
+
+    def fusionner(self, autre: "EtapeMenaces", decalage_lignes: int = 0) -> None:
+        self.correspondances.update(autre.correspondances)
+        for cle, ligne in autre.premieres.items():
+            self.premieres.setdefault(cle, ligne + decalage_lignes)
+
+    def indicateurs(self, n: int = None) -> List[dict]:
+        """Indicateurs rencontrés, du plus fréquent au plus rare"""
+        return [{'type': type_ioc, 'indicateur': indicateur, 'liste': liste, 'lignes': nombre,
+                 'premiere_ligne': self.premieres[(type_ioc, indicateur, liste)]}
+                for (type_ioc, indicateur, liste), nombre in self.correspondances.most_common(n)]
+
+    def resume(self, n: int = 100) -> dict:
+        """Résumé sérialisable en JSON: listes chargées et indicateurs rencontrés"""
+        return {
+            'listes': self.listes.resume(),
+            'alertes': sum(self.correspondances.values()),
+            'indicateurs_distincts': len(self.correspondances),
+            'indicateurs': self.indicateurs(n),
+        }
+
+    def afficher(self) -> None:
+        print(f"   • Correspondances IOC: {sum(self.correspondances.values())} "
+              f"({len(self.correspondances)} indicateurs distincts)")
+        for ligne in self.indicateurs(3):
+            print(f"   • {Colors.RED}IOC {ligne['type']}: {ligne['indicateur']}{Colors.ENDC} "
+                  f"({ligne['liste']}, {ligne['lignes']} lignes dès la ligne {ligne['premiere_ligne']})")
+
+    def ecrire_rapport(self, f: TextIO, n: int = 50) -> None:
+        """Ajoute au rapport texte les indicateurs de compromission rencontrés (gravité haute)"""
+        resume = self.listes.resume()
+        f.write(f"🔥 CORRESPONDANCES IOC - GRAVITÉ HAUTE ({sum(self.correspondances.values())}):\n")
+        f.write("-" * 80 + "\n")
+        f.write(f"Listes: {', '.join(resume['listes'])} ({resume['plages_ip']} plages IP, "
+                f"{resume['domaines']} domaines, {resume['urls']} URL)\n")
+        if not self.correspondances:
+            f.write("Aucun indicateur listé rencontré.\n\n")
+            return
+        f.write(f"{'Type':<8} {'Indicateur':<40} {'Liste':<20} {'Lignes':>8} {'1re ligne':>10}\n")
+        for ligne in self.indicateurs(n):
+            f.write(f"{ligne['type']:<8} {ligne['indicateur'][:40]:<40} {ligne['liste'][:20]:<20} "
+                    f"{ligne['lignes']:>8} {ligne['premiere_ligne']:>10}\n")
+        f.write("\n")
+
+# ============================================================================
+# SECRETS EXPOSÉS (CLÉS D'API, JETONS, IDENTIFIANTS ENCODÉS)
+# ============================================================================
+
+class EtapeSecrets(Etape):
+    """
+    Cherche les secrets exposés dans les lignes (DetecteurSecrets)
+
+    Un jeton reconnu à son préfixe (AKIA, ghp_, xoxb-, eyJ...) ou d'entropie élevée
+    devient une alerte de gravité haute. Seules des valeurs masquées sont restituées:
+    le texte dont l'état extrait les entités et que citent toutes les alertes de la
+    ligne est réécrit (texte_entites), une URL ou un type du registre pouvant porter
+    un jeton. Les occurrences d'un même secret sont rapprochées par son empreinte.
+    """
+
+    nom = "secrets"
+    correle = True
+    masque = True
+    section = "avant"
+
+    def __init__(self, detecteur: DetecteurSecrets = None):
+        """
+        Args:
+            detecteur: Détecteur de secrets (None = seuils par défaut)
+        """
+        self.detecteur = detecteur or DetecteurSecrets()
+        # Empreinte -> [type, valeur masquée, nombre de lignes, première ligne, entropie]
+        self.secrets: Dict[str, list] = {}
+        # (texte, secrets) de la dernière extraction, repris par les alertes du même texte
+        self._trouves: Tuple[object, list] = (None, [])
+
+    def vierge(self) -> "EtapeSecrets":
+        return EtapeSecrets(self.detecteur)
+
+    def __getstate__(self) -> dict:
+        # Le dernier texte cherché (un bloc d'un Mo) ne suit pas l'étape d'un processus à l'autre
+        etat = self.__dict__.copy()
+        etat['_trouves'] = (None, [])
+        return etat
+
+    def texte_entites(self, texte: Union[str, bytes]) -> Union[str, bytes]:
+        """Ligne ou bloc aux secrets masqués: aucune entité extraite ni alerte n'en contient"""
+        trouves = self.detecteur.rechercher(texte)
+        self._trouves = (texte, trouves)
+        if not trouves:
+            return texte
+        if isinstance(texte, bytes):
+            # latin-1: un caractère par octet, les positions des secrets restent valables
+            return masquer_texte(texte.decode("latin-1"), trouves).encode("latin-1")
+        return masquer_texte(texte, trouves)
+
+    def _rechercher(self, texte: Union[str, bytes]) -> List[Tuple[int, int, str, float]]:
+        """Secrets d'un texte, repris de texte_entites s'il vient de les chercher"""
+        source, trouves = self._trouves
+        self._trouves = (None, [])
+        return trouves if source is texte else self.detecteur.rechercher(texte)
+
+    def _alertes(self, ligne_num: int, ligne: str, trouves: List[Tuple[int, int, str, float]]) -> List[dict]:
+        """Alertes des secrets (début, fin, type, entropie) d'une ligne, une par secret distinct"""
+        alertes, vues = [], set()
+        for debut, fin, type_secret, entropie in trouves:
+            valeur = ligne[debut:fin]
+            cle = empreinte_secret(valeur)
+            if cle in vues:
+                continue
+            vues.add(cle)
+            secret = self.secrets.get(cle)
+            if secret:
+                secret[2] += 1
+            else:
+                secret = self.secrets[cle] = [type_secret, masquer(valeur), 1, ligne_num, round(entropie, 2)]
+            alertes.append({
+                'ligne': ligne_num,
+                'mot_cle': f"secret {type_secret}",
+                'position': debut,
+                'contenu': None,  # Ligne masquée, citée par l'état
+                'tronque': False,
+                'gravite': GRAVITE_HAUTE,
+                'indicateur': secret[1],
+            })
+        return alertes
+
+    def traiter_ligne(self, ligne_num: int, ligne: str) -> List[dict]:
+        trouves = self._rechercher(ligne)
+        return self._alertes(ligne_num, ligne, trouves) if trouves else []
+
+    def correler_bloc(self, bloc: bytes, ligne_base: int,
+                      encodage: str = "utf-8") -> Iterator[Tuple[int, str, List[dict]]]:
+        """
+        Alertes de secrets d'un bloc de lignes complètes
+
+        Les jetons candidats sont cherchés et mesurés en octets sur tout le bloc;
+        seules les lignes portant un secret sont décodées et analysées à nouveau.
+        """
+        ligne_num = ligne_base
+        dernier_debut, debut_ligne = 0, -1
+        for position, _, _, _ in self._rechercher(bloc):
+            debut = bloc.rfind(b"\n", 0, position) + 1
+            if debut == debut_ligne:
+                continue
+            ligne_num += bloc.count(b"\n", dernier_debut, debut)
+            dernier_debut = debut_ligne = debut
+            fin = bloc.find(b"\n", position)
+            ligne = _decoder_ligne(bloc[debut:fin if fin >= 0 else len(bloc)], encodage).strip()
+            trouves = self.detecteur.rechercher(ligne)
+            if trouves:
+                yield ligne_num + 1, ligne, self._alertes(ligne_num + 1, ligne, trouves)
+
+    def fusionner(self, autre: "EtapeSecrets", decalage_lignes: int = 0) -> None:
+        for cle, (type_secret, masque, nombre, premiere, entropie) in autre.secrets.items():
+            secret = self.secrets.get(cle)
+            if secret:
+                secret[2] += nombre
+            else:
+                self.secrets[cle] = [type_secret, masque, nombre, premiere + decalage_lignes, entropie]
+
+    def plus_frequents(self, n: int = None) -> List[dict]:
+        """Secrets distincts (masqués), du plus fréquent au plus rare"""
+        tries = sorted(self.secrets.items(), key=lambda x: (-x[1][2], x[1][3]))[:n]
+        return [{'type': type_secret, 'valeur': masque, 'empreinte': cle, 'lignes': nombre,
+                 'premiere_ligne': premiere, 'entropie': entropie}
+                for cle, (type_secret, masque, nombre, premiere, entropie) in tries]
+
+    def resume(self, n: int = 100) -> dict:
+        """Résumé sérialisable en JSON: secrets rencontrés, masqués"""
+        par_type = Counter()
+        for type_secret, _, nombre, _, _ in self.secrets.values():
+            par_type[type_secret] += nombre
+        return {
+            'alertes': sum(par_type.values()),
+            'secrets_distincts': len(self.secrets),
+            'par_type': dict(par_type.most_common()),
+            'secrets': self.plus_frequents(n),
+        }
+
+    def afficher(self) -> None:
+        resume = self.resume(3)
+        print(f"   • Secrets exposés: {resume['alertes']} ({resume['secrets_distincts']} distincts"
+              f"{', ' if resume['par_type'] else ''}"
+              f"{', '.join(f'{type_secret}: {n}' for type_secret, n in resume['par_type'].items())})")
+        for secret in resume['secrets']:
+            print(f"   • {Colors.RED}Secret {secret['type']}: {secret['valeur']}{Colors.ENDC} "
+                  f"({secret['lignes']} lignes dès la ligne {secret['premiere_ligne']})")
+
+    def ecrire_rapport(self, f: TextIO, n: int = 50) -> None:
+        """Ajoute au rapport texte les secrets exposés rencontrés, masqués (gravité haute)"""
+        resume = self.resume(n)
+        f.write(f"🔑 SECRETS EXPOSÉS - GRAVITÉ HAUTE ({resume['alertes']}):\n")
+        f.write("-" * 80 + "\n")
+        if not self.secrets:
+            f.write("Aucun secret rencontré.\n\n")
+            return
+        f.write(f"{'Type':<10} {'Valeur masquée':<16} {'Empreinte':<14} {'Entropie':>8} {'Lignes':>8} {'1re ligne':>10}\n")
+        for secret in resume['secrets']:
+            f.write(f"{secret['type']:<10} {secret['valeur']:<16} {secret['empreinte']:<14} {secret['entropie']:>8.2f} "
+                    f"{secret['lignes']:>8} {secret['premiere_ligne']:>10}\n")
+        f.write("\n")
+
+# ============================================================================
+# STATISTIQUES DES JOURNAUX D'ACCÈS WEB
+# ============================================================================
+
+# Requête d'un journal Apache/nginx (format commun ou combiné), champs utiles aux statistiques:
+# date (décalage horaire compris), méthode, cible, statut, taille, agent, puis la suite de la
+# ligne où nginx ajoute souvent le temps de réponse ($request_time)
+MOTIF_ACCES = (
+    r'\S+ \S+ \S+ \[(\d{2})/([A-Z][a-z]{2})/(\d{4}):(\d{2}):(\d{2}):\d{2}(?: ([+-])(\d{2})(\d{2}))?\] '
+    r'"(?:(\S+) (\S+)[^"\n]*|[^"\n]*)" (\d{3}) (\S+)(?: "[^"\n]*" "([^"\n]*)")?([^\n]*)'
+)
+RE_ACCES = re.compile(MOTIF_ACCES)
+RE_ACCES_LIGNES = re.compile("(?m)^" + MOTIF_ACCES)
+
+# Temps de réponse en secondes: "request_time=0.123" / "rt=0.123", sinon premier décimal après l'agent
+RE_TEMPS_CLE = re.compile(r'\b(?:request_time|rt)="?(\d+(?:\.\d+)?)')
+RE_TEMPS_SUITE = re.compile(r'\s+"?(\d+\.\d+)')
+
+# Segments de chemin retenus pour regrouper les requêtes (/api/v1/users/42 -> /api/v1/users)
+PROFONDEUR_CHEMIN = 3
+
+# Préfixes de chemin suivis (Space-Saving) et préfixes ayant leurs propres temps de réponse
+TOP_CHEMINS = 200
+LIMITE_CHEMINS_LATENCE = 500
+
+# Compression des t-digest: global, par préfixe, par minute
+COMPRESSION_LATENCES = 200
+COMPRESSION_CHEMIN = 50
+COMPRESSION_MINUTE = 25
+
+# Percentiles rapportés
+PERCENTILES = (0.5, 0.9, 0.95, 0.99)
+
+# Intervalles de la table par minute gardés au plus (deux jours à la minute): au-delà, la table
+# passe à l'intervalle suivant de PAS_INTERVALLES (chacun multiple du précédent), si bien que
+# la mémoire ne dépend pas de la période couverte par le journal
+LIMITE_INTERVALLES = 2880
+PAS_INTERVALLES = (60, 300, 900, 1800, 3600, 10800, 21600, 43200, 86400)
+
+# Familles d'agents utilisateurs: premier fragment trouvé dans l'agent (ordre significatif)
+FAMILLES_AGENTS = [
+    ("robot", ("bot", "crawl", "spider", "slurp")),
+    ("curl", ("curl/",)),
+    ("wget", ("wget/",)),
+    ("python", ("python",)),
+    ("go", ("go-http-client",)),
+    ("java", ("java/", "okhttp")),
+    ("scanner", ("nikto", "sqlmap", "nmap", "masscan", "zgrab")),
+    ("edge", ("edg/",)),
+    ("opera", ("opr/",)),
+    ("chrome", ("chrome/", "crios/")),
+    ("firefox", ("firefox/", "fxios/")),
+    ("safari", ("safari/",)),
+    ("ie", ("msie", "trident/")),
+]
+
+
+@lru_cache(maxsize=1024)
+def famille_agent(agent: str) -> str:
+    """Famille d'un agent utilisateur (chrome, robot, curl...), "inconnu" si absent, "autre" sinon"""
+    if not agent or agent == "-":
+        return "inconnu"
+    agent = agent.lower()
+    for famille, fragments in FAMILLES_AGENTS:
+        if any(fragment in agent for fragment in fragments):
+            return famille
+    return "autre"
+
+
+def prefixe_chemin(cible: str, profondeur: int = PROFONDEUR_CHEMIN) -> str:
+    """Premiers segments du chemin d'une requête, sans paramètres; segments numériques notés *"""
+    chemin = cible.split("?", 1)[0]
+    if "://" in chemin:
+        # Requête de mandataire: URL absolue
+        chemin = "/" + chemin.split("/", 3)[3] if chemin.count("/") >= 3 else "/"
+    segments = [segment for segment in chemin.split("/") if segment][:profondeur]
+    return "/" + "/".join("*" if segment.isdigit() else segment for segment in segments)
+
+
+@lru_cache(maxsize=4096)
+def _minute_acces(jour: str, mois: str, annee: str, heure: str, minute: str,
+                  signe: str, decalage_h: str, decalage_m: str) -> Optional[int]:
+    """Début (secondes epoch UTC) de la minute d'une requête"""
+    numero_mois = _NUMERO_MOIS.get(mois)
+    if numero_mois is None:
+        return None
+    return _epoch(annee, numero_mois, jour, heure, minute, 0, signe, decalage_h, decalage_m)
+
+
+def _temps_reponse(suite: str) -> Optional[float]:
+    """Temps de réponse en millisecondes trouvé après les champs standard, sinon None"""
+    if not suite:
+        return None
+    correspondance = RE_TEMPS_CLE.search(suite) or RE_TEMPS_SUITE.match(suite)
+    return float(correspondance.group(1)) * 1000 if correspondance else None
+
+
+class EtapeAcces(Etape):
+    """
+    Agrège les requêtes d'un journal d'accès web (Apache/nginx)
+
+    En une seule passe et en mémoire bornée: requêtes par statut, méthode, famille
+    d'agent et préfixe de chemin (Space-Saving), temps de réponse en t-digest (global
+    et par préfixe), et une ligne par minute (requêtes, 4xx, 5xx, octets, percentiles).
+    Au-delà de LIMITE_INTERVALLES minutes, la table regroupe les lignes par intervalles
+    plus larges (5 min, 15 min, 1 h...). Toutes les structures se fusionnent, pour les
+    plages analysées en parallèle.
+    """
+
+    nom = "acces"
+    horodate = True
+
+    def __init__(self, minutes: str = None):
+        """
+        Args:
+            minutes: Fichier CSV recevant la table par minute en fin d'analyse (optionnel)
+        """
+        self.minutes_csv = minutes
+        self.requetes = 0
+        self.statuts: Counter = Counter()
+        self.methodes: Counter = Counter()
+        self.agents: Counter = Counter()
+        self.chemins = SpaceSaving(TOP_CHEMINS)
+        self.latences = TDigest(COMPRESSION_LATENCES)
+        self.latences_chemins: Dict[str, TDigest] = {}
+        # Début de l'intervalle (secondes epoch) -> [requêtes, 4xx, 5xx, octets, t-digest des temps
+        # de réponse]; intervalles de self.pas secondes
+        self.minutes: Dict[int, list] = {}
+        self.pas = PAS_INTERVALLES[0]
+
+    def vierge(self) -> "EtapeAcces":
+        # La table par minute n'est écrite qu'une fois, par l'étape de l'analyse entière
+        return EtapeAcces()
+
+    def noter_ligne(self, ligne: str, alertes: List[dict], compter_ligne: bool = True) -> None:
+        if compter_ligne:
+            correspondance = RE_ACCES.match(ligne)
+            if correspondance is not None:
+                self._noter_requete(correspondance.groups())
+
+    def noter_bloc(self, bloc: bytes) -> None:
+        # latin-1: décodage direct octet par octet, sans échec possible
+        for correspondance in RE_ACCES_LIGNES.finditer(bloc.decode("latin-1")):
+            self._noter_requete(correspondance.groups())
+
+    def _noter_requete(self, groupes: tuple) -> None:
+        """Compte une requête à partir des groupes de MOTIF_ACCES"""
+        (jour, mois, annee, heure, minute, signe, decalage_h, decalage_m,
+         methode, cible, statut, taille, agent, suite) = groupes
+        self.requetes += 1
+        self.statuts[statut] += 1
+        self.methodes[methode or "-"] += 1
+        self.agents[famille_agent(agent)] += 1
+        prefixe = prefixe_chemin(cible) if cible else "-"
+        self.chemins.ajouter(prefixe)
+        latence = _temps_reponse(suite)
+        if latence is not None:
+            self.latences.ajouter(latence)
+            self._latences_chemin(prefixe).ajouter(latence)
+
+        debut = _minute_acces(jour, mois, annee, heure, minute, signe, decalage_h, decalage_m)
+        if debut is not None:
+            debut -= debut % self.pas
+            ligne = self.minutes.get(debut)
+            if ligne is None:
+                if len(self.minutes) >= LIMITE_INTERVALLES:
+                    self._elargir()
+                    debut -= debut % self.pas
+                ligne = self.minutes.get(debut)
+                if ligne is None:
+                    ligne = self.minutes[debut] = [0, 0, 0, 0, TDigest(COMPRESSION_MINUTE)]
+            ligne[0] += 1
+            if statut[0] == "4":
+                ligne[1] += 1
+            elif statut[0] == "5":
+                ligne[2] += 1
+            if taille.isdigit():
+                ligne[3] += int(taille)
+            if latence is not None:
+                ligne[4].ajouter(latence)
+
+    def _elargir(self, pas: int = None) -> None:
+        """Regroupe la table par minute en intervalles de pas secondes (par défaut, le pas suivant)"""
+        if pas is None:
+            suivants = [p for p in PAS_INTERVALLES if p > self.pas]
+            pas = suivants[0] if suivants else self.pas * 2
+        if pas <= self.pas:
+            return
+        anciennes, self.minutes, self.pas = self.minutes, {}, pas
+        for debut, ligne in anciennes.items():
+            self._cumuler_intervalle(debut, ligne)
+
+    def _cumuler_intervalle(self, debut: int, ligne: list) -> None:
+        """Ajoute une ligne [requêtes, 4xx, 5xx, octets, t-digest] à l'intervalle qui contient debut"""
+        debut -= debut % self.pas
+        cible = self.minutes.get(debut)
+        if cible is None:
+            self.minutes[debut] = ligne
+        else:
+            for i in range(4):
+                cible[i] += ligne[i]
+            cible[4].fusionner(ligne[4])
+
+    def _latences_chemin(self, prefixe: str) -> TDigest:
+        """t-digest d'un préfixe; au-delà de LIMITE_CHEMINS_LATENCE préfixes, celui de "<autres>" """
+        digest = self.latences_chemins.get(prefixe)
+        if digest is None:
+            if len(self.latences_chemins) >= LIMITE_CHEMINS_LATENCE:
+                prefixe = "<autres>"
+                digest = self.latences_chemins.get(prefixe)
+            if digest is None:
+                digest = self.latences_chemins[prefixe] = TDigest(COMPRESSION_CHEMIN)
+        return digest
+
+    def fusionner(self, autre: "EtapeAcces", decalage_lignes: int = 0) -> None:
+        self.requetes += autre.requetes
+        self.statuts.update(autre.statuts)
+        self.methodes.update(autre.methodes)
+        self.agents.update(autre.agents)
+        self.chemins.fusionner(autre.chemins)
+        self.latences.fusionner(autre.latences)
+        for prefixe, digest in autre.latences_chemins.items():
+            self._latences_chemin(prefixe).fusionner(digest)
+        self._elargir(autre.pas)
+        for debut, ligne in autre.minutes.items():
+            self._cumuler_intervalle(debut, ligne)
+        while len(self.minutes) > LIMITE_INTERVALLES:
+            self._elargir()
+
+    @staticmethod
+    def _percentiles(digest: TDigest) -> Dict[str, Optional[float]]:
+        """Percentiles (ms, arrondis) d'un t-digest, None s'il est vide"""
+        return {f"p{round(q * 100)}": (round(digest.quantile(q), 1) if digest.nombre else None)
+                for q in PERCENTILES}
+
+    def plus_demandes(self, n: int = 20) -> List[dict]:
+        """Préfixes de chemin les plus demandés, avec leurs percentiles de temps de réponse"""
+        classement = []
+        for prefixe, compte, erreur in self.chemins.plus_frequents(n):
+            digest = self.latences_chemins.get(prefixe)
+            classement.append({'chemin': prefixe, 'requetes': compte, 'erreur': erreur,
+                               **(self._percentiles(digest) if digest else {})})
+        return classement
+
+    def table_minutes(self) -> List[dict]:
+        """Une ligne par minute (ou par intervalle de self.pas secondes), dans l'ordre chronologique"""
+        return [{'minute': time.strftime('%Y-%m-%d %H:%M', time.gmtime(debut)), 'secondes': self.pas,
+                 'requetes': requetes, '4xx': e4xx, '5xx': e5xx, 'octets': octets,
+                 **self._percentiles(digest)}
+                for debut, (requetes, e4xx, e5xx, octets, digest) in sorted(self.minutes.items())]
+
+    def ecrire_minutes(self, chemin: str) -> None:
+        """Écrit la table par minute au format CSV"""
+        lignes = self.table_minutes()
+        champs = ['minute', 'secondes', 'requetes', '4xx', '5xx', 'octets', *(f"p{round(q * 100)}" for q in PERCENTILES)]
+        with open(chemin, "w", encoding="utf-8", newline="") as f:
+            ecrivain = csv.DictWriter(f, fieldnames=champs)
+            ecrivain.writeheader()
+            ecrivain.writerows(lignes)
+
+    def resume(self, n: int = 20) -> dict:
+        """Agrégats des requêtes sous forme sérialisable en JSON"""
+        return {
+            'requetes': self.requetes,
+            'statuts': dict(sorted(self.statuts.items())),
+            'methodes': dict(self.methodes.most_common()),
+            'agents': dict(self.agents.most_common()),
+            'temps_reponse_ms': {**self._percentiles(self.latences), 'mesures': int(self.latences.nombre)},
+            'chemins': self.plus_demandes(n),
+            'minutes': self.table_minutes(),
+        }
+
+    def terminer(self) -> None:
+        if self.minutes_csv:
+            self.ecrire_minutes(self.minutes_csv)
+            print(f"{Colors.GREEN}💾 Table par minute: {self.minutes_csv}{Colors.ENDC}")
+
+    def afficher(self) -> None:
+        latences = self._percentiles(self.latences)
+        print(f"   • Requêtes web: {self.requetes} "
+              f"({', '.join(f'{statut}: {n}' for statut, n in sorted(self.statuts.items()))})")
+        if self.latences.nombre:
+            print("   • Temps de réponse: " + ", ".join(f"{nom} {valeur} ms" for nom, valeur in latences.items()))
+        for ligne in self.plus_demandes(3):
+            p95 = f", p95 {ligne['p95']} ms" if ligne.get('p95') is not None else ""
+            print(f"   • Chemin: {ligne['chemin']} ({ligne['requetes']} requêtes{p95})")
+
+    def ecrire_rapport(self, f: TextIO, n: int = 20) -> None:
+        """Ajoute au rapport texte les agrégats des requêtes web et la table par minute"""
+        def cellule(valeur) -> str:
+            return "-" if valeur is None else str(valeur)
+
+        noms_percentiles = [f"p{round(q * 100)}" for q in PERCENTILES]
+        f.write(f"\n🌍 JOURNAL D'ACCÈS WEB ({self.requetes} requêtes):\n")
+        f.write("-" * 80 + "\n")
+        if not self.requetes:
+            f.write("Aucune requête reconnue.\n")
+            return
+        latences = self._percentiles(self.latences)
+        f.write(f"Temps de réponse (ms, {int(self.latences.nombre)} mesures): "
+                + "  ".join(f"{nom} {cellule(valeur)}" for nom, valeur in latences.items()) + "\n")
+        for titre, comptes in (("Statuts", sorted(self.statuts.items())),
+                               ("Méthodes", self.methodes.most_common()),
+                               ("Agents", self.agents.most_common())):
+            f.write(f"\n{titre}:\n")
+            for valeur, compte in comptes:
+                f.write(f"  {compte:>10}  {valeur}\n")
+        f.write("\nChemins les plus demandés:\n")
+        f.write(f"  {'requêtes':>10}  " + "".join(f"{nom:>9}" for nom in noms_percentiles) + "  chemin\n")
+        for ligne in self.plus_demandes(n):
+            f.write(f"  {ligne['requetes']:>10}  "
+                    + "".join(f"{cellule(ligne.get(nom)):>9}" for nom in noms_percentiles) + f"  {ligne['chemin']}\n")
+        f.write("\nPar minute (UTC):\n" if self.pas == 60 else f"\nPar intervalle de {self.pas // 60} minutes (UTC):\n")
+        f.write(f"  {'minute':<16} {'requêtes':>9} {'4xx':>7} {'5xx':>7} {'octets':>12}"
+                + "".join(f"{nom:>9}" for nom in noms_percentiles) + "\n")
+        for ligne in self.table_minutes():
+            f.write(f"  {ligne['minute']:<16} {ligne['requetes']:>9} {ligne['4xx']:>7} {ligne['5xx']:>7} {ligne['octets']:>12}"
+                    + "".join(f"{cellule(ligne[nom]):>9}" for nom in noms_percentiles) + "\n")
+
+# ============================================================================
+# ANALYSE PAR MEMOIRE MAPPÉE (OCTETS)
+# ============================================================================
+
+# Versions octets des motifs d'extraction, de même sémantique ASCII que les motifs str
+RE_EMAIL_OCTETS = re.compile(RE_EMAIL.pattern.encode("ascii"))
+RE_IP_OCTETS = re.compile(RE_IP.pattern.encode("ascii"))
+RE_HEURE_OCTETS = re.compile(RE_HEURE.pattern.encode("ascii"))
+RE_DATE_OCTETS = re.compile(RE_DATE.pattern.encode("ascii"))
+RE_URL_OCTETS = re.compile(RE_URL.pattern.encode("ascii"))
+
+
+def _ajouter_fragments(etat: "EtatAnalyse", categorie: str, fragments: List[bytes]) -> None:
+    """Décode (ASCII) et ajoute des fragments à une catégorie de l'état (distincts sauf s'il compte les occurrences)"""
+    if fragments:
+        if not etat.compte_occurrences:
+            fragments = set(fragments)
+        etat.ajouter_entites(categorie, [fragment.decode("ascii") for fragment in fragments])
+
+
+def _scanner_bloc(bloc: bytes, ligne_base: int, etat: "EtatAnalyse",
+                  detecteur: DetecteurMotsCles, encodage: str = "utf-8") -> List[dict]:
+    """
+    Extrait entités et alertes d'un bloc de lignes complètes
+
+    Args:
+        bloc: Lignes complètes (terminées par '\\n', sauf éventuellement la dernière)
+        ligne_base: Nombre de lignes précédant le bloc
+        etat: État à compléter
+        detecteur: Détecteur de mots-clés compilé
+        encodage: Encodage des lignes en alerte
+
+    Returns:
+        Alertes produites par le bloc, par ligne: mots-clés, puis alertes des étapes
+    """
+    texte = etat.texte_entites(bloc)
+    _ajouter_fragments(etat, 'emails', RE_EMAIL_OCTETS.findall(texte))
+    _ajouter_fragments(etat, 'ips', RE_IP_OCTETS.findall(texte))
+    _ajouter_fragments(etat, 'heures', RE_HEURE_OCTETS.findall(texte))
+    _ajouter_fragments(etat, 'dates', RE_DATE_OCTETS.findall(texte))
+    _ajouter_fragments(etat, 'urls', RE_URL_OCTETS.findall(texte))
+    if etat.supplementaires:
+        for categorie, fragments in extraire_entites(texte, etat.supplementaires).items():
+            _ajouter_fragments(etat, categorie, fragments)
+    if etat.horodate:
+        etat.noter_bloc(texte)
+
+    # Numéro de ligne -> [ligne, alertes]
+    lignes: Dict[int, list] = {}
+    ligne_num = ligne_base
+    dernier_debut = 0
+    for debut, mots in detecteur.rechercher_bloc(bloc):
+        # Numéro de ligne calculé de proche en proche, seules les lignes touchées sont décodées
+        ligne_num += bloc.count(b"\n", dernier_debut, debut)
+        dernier_debut = debut
+        fin = bloc.find(b"\n", debut)
+        brute = bloc[debut:fin if fin >= 0 else len(bloc)]
+        retrait = len(brute) - len(brute.lstrip())
+        ligne = _decoder_ligne(brute, encodage).strip()
+        lignes[ligne_num + 1] = [ligne, [{
+            'ligne': ligne_num + 1,
+            'mot_cle': mot,
+            'position': len(_decoder_ligne(brute[retrait:position - debut], encodage)),
+            'contenu': None,
+            'tronque': False
+        } for mot, position in mots]]
+    if etat.correle:
+        for numero, ligne, alertes in etat.correler_bloc(bloc, ligne_base, encodage):
+            lignes.setdefault(numero, [ligne, []])[1].extend(alertes)
+        lignes = dict(sorted(lignes.items()))
+
+    nouvelles = []
+    for ligne, alertes in lignes.values():
+        if etat.masque:
+            ligne = etat.texte_entites(ligne)
+        _citer_ligne(alertes, ligne)
+        if etat.horodate:
+            etat.noter_ligne(ligne, alertes, compter_ligne=False)
+        if etat.note_alertes:
+            etat.noter_alertes(ligne, alertes)
+        nouvelles.extend(alertes)
+    if nouvelles:
+        etat.ajouter_alertes(nouvelles)
+    return nouvelles
+
+
+def _analyser_plage_mmap(chemin: str, debut: int, fin: int, mots_sensibles: List[str],
+                         mots_entiers: bool, sur_alerte: Callable[[dict], None] = None,
+                         encodage: str = "utf-8", etat: EtatAnalyse = None) -> EtatAnalyse:
+    """
+    Analyse une plage d'octets par projection mémoire, sans décoder chaque ligne
+
+    Le fichier est parcouru par blocs bornés alignés sur les fins de ligne, si bien
+    que la mémoire utilisée ne dépend pas de la taille du fichier. Seuls les
+    fragments extraits et les lignes en alerte sont décodés.
+
+    Args:
+        chemin: Fichier à analyser
+        debut: Premier octet de la plage
+        fin: Octet suivant la fin de la plage
+        mots_sensibles: Liste de mots-clés (None pour la liste par défaut)
+        mots_entiers: Mode mots délimités
+        sur_alerte: Fonction appelée pour chaque alerte (optionnel)
+        encodage: Encodage des lignes en alerte (compatible ASCII)
+        etat: État vierge à compléter (un nouvel état par défaut)
+
+    Returns:
+        État de la plage, numéros de ligne relatifs à son début
+    """
+    if fin <= debut:
+        return etat or EtatAnalyse()
+
+    def blocs():
+        with open(chemin, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as projection:
+            position = debut
+            while position < fin:
+                limite = min(position + TAILLE_BLOC, fin)
+                if limite < fin:
+                    saut = projection.rfind(b"\n", position, limite)
+                    if saut >= 0:
+                        limite = saut + 1
+                    else:
+                        # Ligne plus longue qu'un bloc: l'étendre jusqu'à sa fin
+                        limite = projection.find(b"\n", limite, fin) + 1 or fin
+                yield projection[position:limite]
+                position = limite
+
+    return _analyser_blocs(blocs(), mots_sensibles, mots_entiers, sur_alerte, encodage, etat)
+
+
+def _analyser_blocs(blocs, mots_sensibles: List[str], mots_entiers: bool,
+                    sur_alerte: Callable[[dict], None] = None, encodage: str = "utf-8",
+                    etat: EtatAnalyse = None) -> EtatAnalyse:
+    """
+    Analyse une suite de blocs de lignes complètes (projection mémoire ou flux décompressé)
+
+    Args:
+        blocs: Itérable de blocs d'octets, chacun terminé par '\\n' sauf éventuellement le dernier
+        mots_sensibles: Liste de mots-clés (None pour la liste par défaut)
+        mots_entiers: Mode mots délimités
+        sur_alerte: Fonction appelée pour chaque alerte (optionnel)
+        encodage: Encodage des lignes en alerte (compatible ASCII)
+        etat: État vierge à compléter (un nouvel état par défaut)
+
+    Returns:
+        État accumulé, numéros de ligne relatifs au premier bloc
+    """
+    detecteur = compiler_mots_cles(mots_sensibles, mots_entiers)
+    etat = etat or EtatAnalyse()
+    bloc = b""
+    for bloc in blocs:
+        for alerte in _scanner_bloc(bloc, etat.lignes, etat, detecteur, encodage):
+            if sur_alerte:
+                sur_alerte(alerte)
+        etat.lignes += bloc.count(b"\n")
+    if bloc and not bloc.endswith(b"\n"):
+        etat.lignes += 1  # Dernière ligne sans fin de ligne
+    return etat
+
+
+def _analyser_compresse(chemin: str, mots_sensibles: List[str], mots_entiers: bool,
+                        sur_alerte: Callable[[dict], None] = None, encodage: str = "utf-8",
+                        etat: EtatAnalyse = None) -> EtatAnalyse:
+    """
+    Analyse un fichier compressé en flux, la décompression tournant dans un autre thread
+
+    Args:
+        chemin: Fichier .gz, .bz2 ou .xz
+        mots_sensibles: Liste de mots-clés (None pour la liste par défaut)
+        mots_entiers: Mode mots délimités
+        sur_alerte: Fonction appelée pour chaque alerte (optionnel)
+        encodage: Encodage du contenu décompressé (compatible ASCII)
+        etat: État vierge à compléter (un nouvel état par défaut)
+
+    Returns:
+        État du fichier
+    """
+    lecteur = LecteurDecompresse(chemin)
+    try:
+        return _analyser_blocs(_blocs_alignes(lecteur), mots_sensibles, mots_entiers, sur_alerte,
+                               encodage, etat)
+    finally:
+        lecteur.fermer()
+
+# ============================================================================
+# ANALYSE PARALLÈLE PAR PLAGES D'OCTETS
+# ============================================================================
+
+# En dessous de cette taille par morceau, le coût des processus domine
+TAILLE_MIN_MORCEAU = 4 * 1024 * 1024
+
+# Morceaux par processus, pour équilibrer la charge entre les cœurs
+MORCEAUX_PAR_WORKER = 4
+
+
+def decouper_fichier(chemin: str, nombre: int, debut: int = 0, fin: int = None) -> List[Tuple[int, int]]:
+    """
+    Découpe un fichier en plages d'octets alignées sur les fins de ligne
+
+    Args:
+        chemin: Fichier à découper
+        nombre: Nombre de plages souhaité
+        debut: Début de la zone à découper (début d'une ligne)
+        fin: Fin de la zone à découper (taille du fichier par défaut)
+
+    Returns:
+        Liste de (debut, fin) couvrant toute la zone, sans chevauchement
+    """
+    if fin is None:
+        fin = os.path.getsize(chemin)
+    taille = fin - debut
+    if taille <= 0:
+        return []
+    nombre = max(1, min(nombre, taille // TAILLE_MIN_MORCEAU or 1))
+    bornes = [debut]
+    with open(chemin, "rb") as f:
+        for k in range(1, nombre):
+            cible = max(debut + taille * k // nombre, bornes[-1])
+            f.seek(cible)
+            if cible > 0:
+                f.readline()  # Avancer jusqu'au début de la ligne suivante
+            position = f.tell()
+            if position >= fin:
+                break
+            if position > bornes[-1]:
+                bornes.append(position)
+    bornes.append(fin)
+    return list(zip(bornes[:-1], bornes[1:]))
+
+
+def _analyser_plage(chemin: str, debut: int, fin: int, mots_sensibles: List[str],
+                    mots_entiers: bool, sur_alerte: Callable[[dict], None] = None,
+                    encodage: str = "utf-8", etat: EtatAnalyse = None) -> EtatAnalyse:
+    """
+    Analyse les lignes d'une plage d'octets (exécuté notamment dans un processus du pool)
+
+    Les numéros de ligne des alertes sont relatifs au début de la plage.
+    """
+    detecteur = compiler_mots_cles(mots_sensibles, mots_entiers)
+    etat = etat or EtatAnalyse()
+    ligne_num = 0
+    with open(chemin, "rb") as f:
+        f.seek(debut)
+        restant = fin - debut
+        while restant > 0:
+            octets = f.readline(restant)
+            if not octets:
+                break
+            restant -= len(octets)
+            ligne_num += 1
+            ligne = _decoder_ligne(octets, encodage).strip()
+            if ligne:
+                for alerte in etat.traiter_ligne(ligne_num, ligne, detecteur):
+                    if sur_alerte:
+                        sur_alerte(alerte)
+    etat.lignes = ligne_num
+    return etat
+
+
+def _analyser_parallele(chemin: str, mots_sensibles: List[str], mots_entiers: bool, workers: int,
+                        memoire_mappee: bool = False, encodage: str = "utf-8",
+                        debut: int = 0, fin: int = None, sur_alerte: Callable[[dict], None] = None,
+                        etat: EtatAnalyse = None) -> EtatAnalyse:
+    """
+    Répartit les plages d'un fichier sur un pool de processus et fusionne les états
+
+    Args:
+        chemin: Fichier à analyser
+        mots_sensibles: Liste de mots-clés (None pour la liste par défaut)
+        mots_entiers: Mode mots délimités
+        workers: Nombre de processus
+        memoire_mappee: Analyser chaque plage par projection mémoire
+        encodage: Encodage détecté pour le fichier (compatible ASCII)
+        debut: Premier octet à analyser (début d'une ligne)
+        fin: Octet suivant le dernier à analyser (fin du fichier par défaut)
+        sur_alerte: Fonction appelée pour chaque alerte, plage par plage dans l'ordre du fichier
+        etat: État vierge recevant la fusion (un nouvel état par défaut)
+
+    Returns:
+        État fusionné, alertes dans l'ordre du fichier avec numéros de ligne globaux
+    """
+    analyser = _analyser_plage_mmap if memoire_mappee else _analyser_plage
+    plages = decouper_fichier(chemin, workers * MORCEAUX_PAR_WORKER, debut, fin)
+    etat = etat or EtatAnalyse()
+    if len(plages) <= 1:
+        for debut, fin in plages:
+            analyser(chemin, debut, fin, mots_sensibles, mots_entiers, sur_alerte, encodage, etat)
+        return etat
+
+    def etat_plage() -> EtatAnalyse:
+        partiel = etat.vierge()
+        partiel.choisir_format(etat.format_log)
+        partiel.choisir_entites(etat.supplementaires)
+        partiel.choisir_reference_dates(etat.reference_dates)
+        return partiel
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(plages))) as pool:
+        futures = [
+            pool.submit(analyser, chemin, debut, fin, mots_sensibles, mots_entiers,
+                        encodage=encodage, etat=etat_plage())
+            for debut, fin in plages
+        ]
+        # Fusion dans l'ordre des plages pour des numéros de ligne corrects
+        for future in futures:
+            partiel = future.result()
+            etat.fusionner(partiel, decalage_lignes=etat.lignes)
+            if sur_alerte:
+                for alerte in partiel.alertes:
+                    sur_alerte(alerte)
+    return etat
+
+# ============================================================================
+# RENDU DES ALERTES
+# ============================================================================
+
+# Modes d'affichage des alertes pendant l'analyse
+MODES_RENDU = ("detail", "limite", "agrege", "silencieux")
+
+
+def formater_alerte(alerte: dict) -> str:
+    """Texte coloré d'une alerte de mot-clé sensible (4 lignes + ligne vide, 5 pour un IOC)"""
+    titre = "🔥 ALERTE GRAVITÉ HAUTE" if alerte.get('gravite') == GRAVITE_HAUTE else "🚨 ALERTE"
+    if alerte.get('fichier'):
+        entete = f"{Colors.RED}{titre} - {alerte['fichier']} - Ligne {alerte['ligne']}{Colors.ENDC}"
+    else:
+        entete = f"{Colors.RED}{titre} - Ligne {alerte['ligne']}{Colors.ENDC}"
+    if alerte.get('indicateur'):
+        liste = f" (liste: {alerte['liste']})" if alerte.get('liste') else ""
+        entete += f"\n{Colors.RED}   Indicateur: {alerte['indicateur']}{liste}{Colors.ENDC}"
+    return (f"{entete}\n"
+            f"{Colors.YELLOW}   Mot-clé: {alerte['mot_cle']}{Colors.ENDC}\n"
+            f"{Colors.CYAN}   Contenu: {alerte['contenu']}{'...' if alerte.get('tronque') else ''}{Colors.ENDC}\n"
+            f"{Colors.CYAN}   {'─' * 70}{Colors.ENDC}\n\n")
+
+
+def afficher_alerte(alerte: dict) -> None:
+    """Affiche une alerte de mot-clé sensible dans le terminal"""
+    print(formater_alerte(alerte), end="")
+
+
+class EcrivainTampon:
+    """Regroupe les écritures console en gros blocs plutôt qu'un print par alerte"""
+
+    def __init__(self, sortie: TextIO = None, taille: int = 64 * 1024, delai: float = 0.5):
+        """
+        Args:
+            sortie: Flux de sortie (sys.stdout par défaut)
+            taille: Nombre de caractères accumulés avant écriture
+            delai: Délai maximal en secondes avant écriture (latence bornée)
+        """
+        self.sortie = sortie or sys.stdout
+        self.taille = taille
+        self.delai = delai
+        self._morceaux: List[str] = []
+        self._longueur = 0
+        self._derniere = time.monotonic()
+
+    def ecrire(self, texte: str) -> None:
+        self._morceaux.append(texte)
+        self._longueur += len(texte)
+        if self._longueur >= self.taille or time.monotonic() - self._derniere >= self.delai:
+            self.vider()
+
+    def vider(self) -> None:
+        if self._morceaux:
+            self.sortie.write("".join(self._morceaux))
+            self.sortie.flush()
+            self._morceaux = []
+            self._longueur = 0
+        self._derniere = time.monotonic()
+
+
+class RenduAlertes:
+    """
+    Affichage des alertes selon un mode, utilisable comme sur_alerte
+
+    Modes:
+        detail: chaque alerte (comportement historique), via un écrivain tamponné
+        limite: au plus limite_par_seconde alertes par seconde, les autres sont comptées
+        agrege: compteurs par mot-clé et quelques lignes d'exemple, affichés à la fin
+        silencieux: rien pendant l'analyse, seul le résumé final s'affiche
+    """
+
+    def __init__(self, mode: str = "detail", limite_par_seconde: int = 20, echantillons: int = 3,
+                 sortie: TextIO = None):
+        """
+        Args:
+            mode: Un des MODES_RENDU
+            limite_par_seconde: Débit maximal du mode "limite"
+            echantillons: Lignes d'exemple conservées par mot-clé en mode "agrege"
+            sortie: Flux de sortie (sys.stdout par défaut)
+        """
+        if mode not in MODES_RENDU:
+            raise ValueError(f"Mode d'affichage inconnu: {mode} (choix: {', '.join(MODES_RENDU)})")
+        self.mode = mode
+        self.limite_par_seconde = limite_par_seconde
+        self.echantillons = echantillons
+        self.ecrivain = EcrivainTampon(sortie)
+        self.compteurs: Dict[str, int] = {}
+        self.exemples: Dict[str, List[dict]] = {}
+        self.masquees = 0
+        self._fenetre = time.monotonic()
+        self._dans_fenetre = 0
+
+    def __call__(self, alerte: dict) -> None:
+        mot = alerte['mot_cle']
+        self.compteurs[mot] = self.compteurs.get(mot, 0) + 1
+
+        if self.mode == "detail":
+            self.ecrivain.ecrire(formater_alerte(alerte))
+        elif self.mode == "limite":
+            maintenant = time.monotonic()
+            if maintenant - self._fenetre >= 1.0:
+                self._signaler_masquees()
+                self._fenetre = maintenant
+                self._dans_fenetre = 0
+            if self._dans_fenetre < self.limite_par_seconde:
+                self._dans_fenetre += 1
+                self.ecrivain.ecrire(formater_alerte(alerte))
+            else:
+                self.masquees += 1
+        elif self.mode == "agrege":
+            exemples = self.exemples.setdefault(mot, [])
+            if len(exemples) < self.echantillons:
+                exemples.append(alerte)
+
+    def _signaler_masquees(self) -> None:
+        if self.masquees:
+            self.ecrivain.ecrire(f"{Colors.YELLOW}   … {self.masquees} alerte(s) non affichée(s){Colors.ENDC}\n\n")
+            self.masquees = 0
+
+    def vider(self) -> None:
+        """Écrit immédiatement ce qui est en attente (avant un print direct)"""
+        self._signaler_masquees()
+        self.ecrivain.vider()
+
+    def terminer(self) -> None:
+        """Termine l'affichage: reliquat du mode limite, tableau du mode agrégé"""
+        self._signaler_masquees()
+        if self.mode == "agrege" and self.compteurs:
+            self.ecrivain.ecrire(f"{Colors.BOLD}🚨 ALERTES PAR MOT-CLÉ:{Colors.ENDC}\n")
+            for mot, nombre in sorted(self.compteurs.items(), key=lambda x: (-x[1], x[0])):
+                self.ecrivain.ecrire(f"{Colors.YELLOW}   {mot:<20}{Colors.ENDC} {nombre:>8}\n")
+                for alerte in self.exemples.get(mot, []):
+                    lieu = f"{alerte['fichier']}:{alerte['ligne']}" if alerte.get('fichier') else f"Ligne {alerte['ligne']}"
+                    self.ecrivain.ecrire(f"{Colors.CYAN}      {lieu}: {alerte['contenu']}{Colors.ENDC}\n")
+            self.ecrivain.ecrire("\n")
+        self.ecrivain.vider()
+
+# ============================================================================
+# SORTIES STRUCTURÉES EN FLUX (NDJSON / CSV)
+# ============================================================================
+
+# Format déduit de l'extension du fichier de sortie
+FORMATS_SORTIE = {".ndjson": "ndjson", ".jsonl": "ndjson", ".csv": "csv"}
+
+# Colonnes du format CSV (une ligne par alerte ou par entité)
+CHAMPS_CSV = ["type", "fichier", "ligne", "mot_cle", "position", "valeur", "contenu", "tronque",
+              "gravite", "indicateur", "liste"]
+
+
+class SortieFlux:
+    """
+    Écrit alertes et entités au fil de l'analyse, puis un résumé JSON à la fin
+
+    Chaque alerte et chaque nouvelle entité devient un enregistrement NDJSON
+    (un objet JSON par ligne) ou une ligne CSV dès sa détection: un SIEM peut
+    ingérer le fichier pendant l'analyse. S'utilise comme sur_alerte, et
+    sa méthode entite comme sur_entite d'un EtatAnalyse.
+    """
+
+    def __init__(self, chemin: str, chemin_resume: str = None, format_sortie: str = None):
+        """
+        Args:
+            chemin: Fichier des enregistrements (.ndjson, .jsonl ou .csv)
+            chemin_resume: Fichier du résumé JSON (<chemin sans extension>_resume.json par défaut)
+            format_sortie: "ndjson" ou "csv" (déduit de l'extension par défaut)
+        """
+        base, extension = os.path.splitext(chemin)
+        self.format = format_sortie or FORMATS_SORTIE.get(extension.lower(), "ndjson")
+        if self.format not in ("ndjson", "csv"):
+            raise ValueError(f"Format de sortie inconnu: {self.format} (choix: ndjson, csv)")
+        self.chemin = chemin
+        self.chemin_resume = chemin_resume or base + "_resume.json"
+        self.alertes_par_mot: Dict[str, int] = {}
+        self._debut = time.monotonic()
+        self._fichier = open(chemin, "w", encoding="utf-8", newline="")
+        self._csv = None
+        if self.format == "csv":
+            self._csv = csv.DictWriter(self._fichier, CHAMPS_CSV, extrasaction="ignore")
+            self._csv.writeheader()
+
+    def _ecrire(self, enregistrement: dict) -> None:
+        if self._csv:
+            self._csv.writerow(enregistrement)
+        else:
+            self._fichier.write(json.dumps(enregistrement, ensure_ascii=False) + "\n")
+
+    def __call__(self, alerte: dict) -> None:
+        mot = alerte['mot_cle']
+        self.alertes_par_mot[mot] = self.alertes_par_mot.get(mot, 0) + 1
+        self._ecrire({'type': 'alerte', **alerte})
+
+    def entite(self, categorie: str, valeur: str, fichier: str = None) -> None:
+        """Écrit une entité (catégorie de REGISTRE_ENTITES) à sa première apparition"""
+        enregistrement = {'type': REGISTRE_ENTITES[categorie].enregistrement, 'valeur': valeur}
+        if fichier:
+            enregistrement['fichier'] = fichier
+        self._ecrire(enregistrement)
+
+    def vider(self) -> None:
+        """Rend visibles les enregistrements en attente (suivi en continu)"""
+        self._fichier.flush()
+
+    def terminer(self, source: str, etat: EtatAnalyse, **infos) -> None:
+        """
+        Ferme le flux et écrit le résumé JSON
+
+        Args:
+            source: Fichier ou dossier analysé
+            etat: État final (comptes d'entités, de lignes et d'alertes)
+            infos: Champs supplémentaires du résumé
+        """
+        self._fichier.close()
+        resume = {
+            'source': source,
+            'date': datetime.now().isoformat(timespec="seconds"),
+            'duree_secondes': round(time.monotonic() - self._debut, 3),
+            'flux': self.chemin,
+            'format': self.format,
+            'lignes': etat.lignes,
+            'entites': etat.cardinalites(),
+            'entites_estimees': list(etat.estimees),
+            'alertes': etat.nombre_alertes,
+            'alertes_par_mot_cle': dict(sorted(self.alertes_par_mot.items(), key=lambda x: (-x[1], x[0]))),
+            **infos
+        }
+        plus_frequentes = {c: etat.plus_frequentes(c, 100) for c in CATEGORIES_COMPTEES}
+        if any(plus_frequentes.values()):
+            resume['plus_frequentes'] = plus_frequentes
+        for nom, etape in etat.etapes.items():
+            resume_etape = etape.resume()
+            if resume_etape is not None:
+                resume[nom] = resume_etape
+        with open(self.chemin_resume, "w", encoding="utf-8") as f:
+            json.dump(resume, f, ensure_ascii=False, indent=2)
+
+# ============================================================================
+# INDEX PERSISTANT DES ENTITÉS (SQLITE)
+# ============================================================================
+
+# Base SQLite par défaut de l'index des analyses
+FICHIER_INDEX = "index_analyse.sqlite"
+
+# Enregistrements mis en attente avant une insertion groupée (une transaction)
+TAILLE_LOT_INDEX = 10_000
+
+# Les entités sont indexées par fichier (les ensembles d'entités ne retiennent pas leurs
+# lignes), les alertes par ligne avec leur date en secondes epoch. La clé primaire des
+# entités commence par la valeur: recherche exacte et par préfixe sans parcours de table.
+SCHEMA_INDEX = """
+CREATE TABLE IF NOT EXISTS fichiers (
+    id INTEGER PRIMARY KEY,
+    chemin TEXT NOT NULL UNIQUE,
+    taille INTEGER,
+    modification REAL,
+    analyse TEXT NOT NULL,
+    lignes INTEGER NOT NULL DEFAULT 0,
+    alertes INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS entites (
+    valeur TEXT NOT NULL,
+    categorie TEXT NOT NULL,
+    fichier_id INTEGER NOT NULL REFERENCES fichiers(id),
+    PRIMARY KEY (valeur, categorie, fichier_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entites_fichier ON entites(fichier_id);
+CREATE TABLE IF NOT EXISTS alertes (
+    id INTEGER PRIMARY KEY,
+    fichier_id INTEGER NOT NULL REFERENCES fichiers(id),
+    ligne INTEGER NOT NULL,
+    mot_cle TEXT NOT NULL,
+    position INTEGER,
+    contenu TEXT,
+    horodatage INTEGER
+);
+CREATE INDEX IF NOT EXISTS alertes_fichier ON alertes(fichier_id, ligne);
+CREATE INDEX IF NOT EXISTS alertes_mot_cle ON alertes(mot_cle, horodatage);
+CREATE INDEX IF NOT EXISTS alertes_horodatage ON alertes(horodatage);
+"""
+
+
+class IndexEntites:
+    """
+    Index SQLite des entités et alertes de toutes les analyses
+
+    Reçoit alertes et entités au fil de l'analyse, comme SortieFlux (s'utilise
+    comme sur_alerte, et sa méthode entite comme sur_entite), et les insère par
+    lots dans une transaction. Les analyses successives s'accumulent dans la même
+    base: « dans quels fichiers apparaît cette IP ? » devient une requête indexée
+    au lieu d'une nouvelle lecture de tous les logs.
+    """
+
+    def __init__(self, chemin: str = FICHIER_INDEX, taille_lot: int = TAILLE_LOT_INDEX):
+        """
+        Args:
+            chemin: Fichier de la base (créé au besoin)
+            taille_lot: Enregistrements mis en attente avant insertion
+        """
+        self.chemin = chemin
+        self.taille_lot = taille_lot
+        self.connexion = sqlite3.connect(chemin)
+        # Journal WAL: les recherches restent possibles pendant une insertion
+        self.connexion.execute("PRAGMA journal_mode=WAL")
+        self.connexion.execute("PRAGMA synchronous=NORMAL")
+        self.connexion.executescript(SCHEMA_INDEX)
+        self.fichier_id: Optional[int] = None
+        self._identifiants: Dict[str, int] = {}
+        # Année des dates syslog des alertes du fichier en cours
+        self._annee: Callable[[int], int] = ANNEES_SYSLOG.fixe
+        self._entites: List[tuple] = []
+        self._alertes: List[tuple] = []
+
+    # ------------------------------------------------------------------
+    # Alimentation
+    # ------------------------------------------------------------------
+
+    def commencer(self, chemin_log: str, remplacer: bool = True) -> int:
+        """
+        Enregistre un fichier analysé et en fait la destination des enregistrements suivants
+
+        Args:
+            chemin_log: Fichier analysé
+            remplacer: Effacer ce que l'index contient déjà pour ce fichier
+                (False pour une reprise, qui n'analyse que les ajouts)
+
+        Returns:
+            Identifiant du fichier dans l'index
+        """
+        self.vider()
+        chemin_log = os.path.abspath(chemin_log)
+        infos = os.stat(chemin_log)
+        with self.connexion:
+            self.connexion.execute(
+                "INSERT INTO fichiers (chemin, taille, modification, analyse) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(chemin) DO UPDATE SET taille = excluded.taille, "
+                "modification = excluded.modification, analyse = excluded.analyse",
+                (chemin_log, infos.st_size, infos.st_mtime, datetime.now().isoformat(timespec="seconds")))
+            fichier_id = self.connexion.execute("SELECT id FROM fichiers WHERE chemin = ?",
+                                                (chemin_log,)).fetchone()[0]
+            if remplacer:
+                self.connexion.execute("DELETE FROM entites WHERE fichier_id = ?", (fichier_id,))
+                self.connexion.execute("DELETE FROM alertes WHERE fichier_id = ?", (fichier_id,))
+        self._identifiants[chemin_log] = self.fichier_id = fichier_id
+        self._annee = AnneesSyslog(infos.st_mtime).fixe
+        return fichier_id
+
+    def __call__(self, alerte: dict) -> None:
+        self._alertes.append((self.fichier_id, alerte['ligne'], alerte['mot_cle'], alerte.get('position'),
+                              alerte['contenu'], horodatage_ligne(alerte['contenu'], self._annee)))
+        if len(self._alertes) >= self.taille_lot:
+            self.vider()
+
+    def entite(self, categorie: str, valeur: str, fichier: str = None) -> None:
+        """Enregistre une entité (catégorie de REGISTRE_ENTITES) du fichier en cours"""
+        self._entites.append((valeur, REGISTRE_ENTITES[categorie].enregistrement, self.fichier_id))
+        if len(self._entites) >= self.taille_lot:
+            self.vider()
+
+    def vider(self) -> None:
+        """Insère les enregistrements en attente en une seule transaction"""
+        if not self._entites and not self._alertes:
+            return
+        with self.connexion:
+            self.connexion.executemany(
+                "INSERT OR IGNORE INTO entites (valeur, categorie, fichier_id) VALUES (?, ?, ?)",
+                self._entites)
+            self.connexion.executemany(
+                "INSERT INTO alertes (fichier_id, ligne, mot_cle, position, contenu, horodatage) "
+                "VALUES (?, ?, ?, ?, ?, ?)", self._alertes)
+        self._entites.clear()
+        self._alertes.clear()
+
+    def terminer(self, etat: EtatAnalyse) -> None:
+        """Insère le reliquat et enregistre les comptes de lignes et d'alertes du fichier en cours"""
+        self.vider()
+        with self.connexion:
+            self.connexion.execute("UPDATE fichiers SET lignes = ?, alertes = ? WHERE id = ?",
+                                   (etat.lignes, etat.nombre_alertes, self.fichier_id))
+
+    def fermer(self) -> None:
+        """Insère le reliquat et ferme la base"""
+        self.vider()
+        self.connexion.close()
+
+    # ------------------------------------------------------------------
+    # Requêtes
+    # ------------------------------------------------------------------
+
+    def rechercher(self, valeur: str, categorie: str = None, limite: int = 1000) -> List[dict]:
+        """
+        Fichiers où une entité apparaît
+
+        Args:
+            valeur: Valeur exacte (IP, email, lien...), ou préfixe terminé par "*"
+            categorie: Type d'entité ("ip", "email", "url", "heure", "date") (optionnel)
+            limite: Nombre maximal de résultats
+
+        Returns:
+            Liste de {'valeur', 'categorie', 'chemin', 'analyse'}, un par fichier et par valeur
+        """
+        if valeur.endswith("*"):
+            # Préfixe: intervalle sur la clé primaire plutôt que LIKE (sensible à la casse ici)
+            debut = valeur[:-1]
+            condition, parametres = "e.valeur >= ? AND e.valeur < ?", [debut, debut + "\U0010ffff"]
+        else:
+            condition, parametres = "e.valeur = ?", [valeur]
+        if categorie:
+            condition += " AND e.categorie = ?"
+            parametres.append(categorie)
+        requete = (
+            "SELECT e.valeur, e.categorie, f.chemin, f.analyse "
+            f"FROM entites e JOIN fichiers f ON f.id = e.fichier_id WHERE {condition} "
+            "ORDER BY e.valeur, f.chemin LIMIT ?")
+        colonnes = ('valeur', 'categorie', 'chemin', 'analyse')
+        return [dict(zip(colonnes, rangee)) for rangee in self.connexion.execute(requete, parametres + [limite])]
+
+    def alertes(self, mot_cle: str = None, chemin_log: str = None, depuis: int = None,
+                jusqua: int = None, limite: int = 100) -> List[dict]:
+        """
+        Alertes enregistrées, les plus récentes d'abord
+
+        Args:
+            mot_cle: Mot-clé détecté (optionnel)
+            chemin_log: Fichier d'origine (optionnel)
+            depuis: Date minimale en secondes epoch (optionnel)
+            jusqua: Date maximale en secondes epoch (optionnel)
+            limite: Nombre maximal d'alertes renvoyées
+
+        Returns:
+            Liste de {'chemin', 'ligne', 'mot_cle', 'position', 'contenu', 'horodatage'}
+        """
+        conditions, parametres = [], []
+        if mot_cle:
+            conditions.append("a.mot_cle = ?")
+            parametres.append(mot_cle)
+        if chemin_log:
+            conditions.append("f.chemin = ?")
+            parametres.append(os.path.abspath(chemin_log))
+        if depuis is not None:
+            conditions.append("a.horodatage >= ?")
+            parametres.append(depuis)
+        if jusqua is not None:
+            conditions.append("a.horodatage <= ?")
+            parametres.append(jusqua)
+        filtre = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        requete = (
+            "SELECT f.chemin, a.ligne, a.mot_cle, a.position, a.contenu, a.horodatage "
+            f"FROM alertes a JOIN fichiers f ON f.id = a.fichier_id {filtre}"
+            "ORDER BY a.horodatage DESC, f.chemin, a.ligne LIMIT ?")
+        colonnes = ('chemin', 'ligne', 'mot_cle', 'position', 'contenu', 'horodatage')
+        return [dict(zip(colonnes, rangee)) for rangee in self.connexion.execute(requete, parametres + [limite])]
+
+    def fichiers(self) -> List[dict]:
+        """Fichiers indexés, du plus récemment analysé au plus ancien"""
+        colonnes = ('chemin', 'taille', 'analyse', 'lignes', 'alertes')
+        return [dict(zip(colonnes, rangee)) for rangee in self.connexion.execute(
+            "SELECT chemin, taille, analyse, lignes, alertes FROM fichiers ORDER BY analyse DESC, chemin")]
+
+    def statistiques(self) -> dict:
+        """Nombre de fichiers, d'alertes et d'entités distinctes par type"""
+        requete = self.connexion.execute
+        return {
+            'fichiers': requete("SELECT COUNT(*) FROM fichiers").fetchone()[0],
+            'alertes': requete("SELECT COUNT(*) FROM alertes").fetchone()[0],
+            'entites': dict(requete("SELECT categorie, COUNT(DISTINCT valeur) FROM entites "
+                                    "GROUP BY categorie ORDER BY categorie").fetchall()),
+        }
+
+
+def rechercher_index(valeur: str, categorie: str = None, chemin_index: str = FICHIER_INDEX,
+                     limite: int = 1000) -> List[dict]:
+    """
+    Affiche les fichiers indexés où apparaît une entité
+
+    Args:
+        valeur: Valeur exacte, ou préfixe terminé par "*" (ex: "10.0.0.*")
+        categorie: Type d'entité ("ip", "email", "url", "heure", "date") (optionnel)
+        chemin_index: Base SQLite de l'index
+        limite: Nombre maximal de résultats
+
+    Returns:
+        Résultats de IndexEntites.rechercher
+    """
+    if not os.path.exists(chemin_index):
+        print(f"{Colors.RED}✗ Erreur: Index introuvable: {chemin_index}{Colors.ENDC}")
+        return []
+    index = IndexEntites(chemin_index)
+    try:
+        debut = time.perf_counter()
+        resultats = index.rechercher(valeur, categorie, limite)
+        duree = (time.perf_counter() - debut) * 1000
+        statistiques = index.statistiques()
+    finally:
+        index.fermer()
+
+    print(f"{Colors.BOLD}🔎 {valeur}: {len(resultats)} résultat(s) en {duree:.1f} ms "
+          f"({statistiques['fichiers']} fichiers indexés){Colors.ENDC}")
+    for resultat in resultats:
+        print(f"{Colors.CYAN}   {resultat['categorie']:<6}{Colors.ENDC} {resultat['valeur']:<30} "
+              f"{resultat['chemin']} (analysé le {resultat['analyse']})")
+    return resultats
+
+# ============================================================================
+# FONCTION PRINCIPALE D'ANALYSE
+# ============================================================================
+
+def scanner_fichier(chemin: str, mots_sensibles: List[str] = None, mots_entiers: bool = False,
+                    workers: int = 1, sur_alerte: Callable[[dict], None] = None,
+                    memoire_mappee: bool = False, debut: int = 0, fin: int = None,
+                    etat: EtatAnalyse = None, format_log: str = None) -> EtatAnalyse:
+    """
+    Parcourt un fichier et accumule entités et alertes, sans rapport ni résumé
+
+    Args:
+        chemin: Chemin du fichier à analyser
+        mots_sensibles: Liste de mots-clés à détecter (optionnel)
+        mots_entiers: Ne détecter que les mots-clés délimités (optionnel)
+        workers: Nombre de processus (1 = séquentiel, 0 = tous les cœurs)
+        sur_alerte: Fonction appelée pour chaque alerte, dans l'ordre du fichier
+        memoire_mappee: Parcourir le fichier en octets par projection mémoire (mmap)
+            (les fichiers compressés sont toujours lus en flux, sans workers ni mmap)
+        debut: Premier octet à analyser, en début de ligne (fichiers compatibles ASCII)
+        fin: Octet suivant le dernier à analyser (fin du fichier par défaut)
+        etat: État vierge à compléter, par exemple avec sur_entite pour une sortie en flux
+            (un nouvel état par défaut); un état aux étapes séquentielles (corrélation) exige
+            workers = 1
+        format_log: Format des lignes: nom de FORMATS_LOG, "auto" pour le reconnaître sur les
+            premières lignes, None pour l'extraction générique. Les analyseurs dédiés servent
+            aux parcours ligne à ligne; les parcours par blocs d'octets (mmap, fichiers
+            compressés) gardent leurs motifs appliqués au bloc entier
+
+    Returns:
+        EtatAnalyse du fichier (numéros de ligne relatifs à debut); etat.format_log indique
+        le format retenu
+
+    Raises:
+        ValueError: Étape séquentielle avec plusieurs workers, format de log inconnu
+    """
+    if not workers:
+        workers = os.cpu_count() or 1
+
+    # Encodage choisi une seule fois sur un échantillon de tête
+    encodage = detecter_encodage(chemin)
+    etat = etat or EtatAnalyse()
+    if workers != 1 and etat.sequentielle:
+        sequentielles = [nom for nom, etape in etat.etapes.items() if etape.sequentielle]
+        raise ValueError(f"{', '.join(sequentielles)} exclut workers != 1 (l'analyse suit l'ordre du fichier)")
+    # Année des dates syslog d'après la dernière modification du fichier
+    etat.choisir_reference_dates(os.path.getmtime(chemin))
+    if format_log:
+        etat.choisir_format(detecter_format(chemin, encodage) if format_log == "auto" else format_log)
+    compresse = detecter_compression(chemin) is not None
+    if compresse and _compatible_ascii(encodage):
+        # Flux décompressé: ni découpage en plages ni projection mémoire
+        return _analyser_compresse(chemin, mots_sensibles, mots_entiers, sur_alerte, encodage, etat)
+    if compresse or not _compatible_ascii(encodage):
+        # UTF-16/32: les parcours par octets ne s'appliquent pas
+        workers, memoire_mappee, debut, fin = 1, False, 0, None
+
+    if workers > 1:
+        return _analyser_parallele(chemin, mots_sensibles, mots_entiers, workers,
+                                   memoire_mappee, encodage, debut, fin, sur_alerte, etat)
+
+    if memoire_mappee or debut or fin is not None:
+        analyser = _analyser_plage_mmap if memoire_mappee else _analyser_plage
+        if fin is None:
+            fin = os.path.getsize(chemin)
+        return analyser(chemin, debut, fin, mots_sensibles, mots_entiers, sur_alerte, encodage, etat)
+
+    # Détecteur compilé une seule fois (mots sensibles par défaut si non fournis)
+    detecteur = compiler_mots_cles(mots_sensibles, mots_entiers)
+    etat = etat or EtatAnalyse()
+    ligne_num = 0
+
+    # Lecture unique: les octets invalides sont repris en latin-1 sans relire le fichier
+    with io.TextIOWrapper(ouvrir_flux(chemin), encoding=encodage, errors=REPLI_LATIN1) as f:
+        for ligne in f:
+            ligne_num += 1
+            ligne = ligne.strip()
+
+            if not ligne:  # Ignorer les lignes vides
+                continue
+
+            for alerte in etat.traiter_ligne(ligne_num, ligne, detecteur):
+                if sur_alerte:
+                    sur_alerte(alerte)
+
+    etat.lignes = ligne_num
+    return etat
+
+
+def terminer_analyse(chemin: str, etat: EtatAnalyse, flux: SortieFlux = None,
+                     rapport: str = FICHIER_SORTIE) -> ResultatsEntites:
+    """
+    Sauvegarde le rapport d'un état d'analyse et affiche les statistiques
+
+    Args:
+        chemin: Fichier analysé
+        etat: État accumulé
+        flux: Sortie en flux à terminer par son résumé JSON, à la place du rapport texte
+        rapport: Chemin du rapport texte
+
+    Returns:
+        Tuple (emails, ips, heures, dates, liens) - listes triées, autres types dans .autres
+    """
+    # Conversion des ensembles en listes triées
+    resultats = etat.resultats()
+    emails_list, ips_list, heures_list, dates_list, liens_list = resultats
+
+    for etape in etat.etapes.values():
+        etape.terminer()
+
+    # Sauvegarde des résultats
+    if flux:
+        flux.terminer(chemin, etat)
+    else:
+        sauvegarder_resultats(chemin, emails_list, ips_list, heures_list, dates_list, liens_list,
+                              etat.alertes, rapport, resultats.autres, list(etat.etapes.values()))
+
+    # Affichage du résumé
+    print(f"\n{Colors.GREEN}✅ Analyse terminée!{Colors.ENDC}")
+    print(f"{Colors.CYAN}{'═' * 70}{Colors.ENDC}")
+    print(f"{Colors.BOLD}📊 STATISTIQUES:{Colors.ENDC}")
+    print(f"   • Lignes analysées: {etat.lignes}")
+    cardinalites = {c: f"≈{n}" if c in etat.estimees else n for c, n in etat.cardinalites().items()}
+    print(f"   • Emails trouvés: {cardinalites['emails']}")
+    print(f"   • IPs trouvées: {cardinalites['ips']}")
+    print(f"   • Heures trouvées: {cardinalites['heures']}")
+    print(f"   • Dates trouvées: {cardinalites['dates']}")
+    print(f"   • Liens trouvés: {cardinalites['urls']}")
+    for categorie in etat.autres:
+        print(f"   • {REGISTRE_ENTITES[categorie].libelle}: {cardinalites[categorie]}")
+    print(f"   • Alertes: {etat.nombre_alertes}")
+    for categorie, titre in (("ips", "IPs"), ("emails", "Emails"), ("urls", "Liens")):
+        tete = ", ".join(f"{valeur} ({compte})" for valeur, compte, _ in etat.plus_frequentes(categorie, 3))
+        if tete:
+            print(f"   • {titre} les plus fréquents: {tete}")
+    for etape in etat.etapes.values():
+        etape.afficher()
+    print(f"{Colors.CYAN}{'═' * 70}{Colors.ENDC}\n")
+    if flux:
+        print(f"{Colors.GREEN}💾 Résultats sauvegardés dans: {flux.chemin} (résumé: {flux.chemin_resume}){Colors.ENDC}\n")
+    else:
+        print(f"{Colors.GREEN}💾 Résultats sauvegardés dans: {rapport}{Colors.ENDC}\n")
+
+    return resultats
+
+
+# Étapes par nom (EtatAnalyse.depuis_dict)
+ETAPES: Dict[str, type] = {etape.nom: etape for etape in (
+    EtapeFrequences, EtapeEsquisse, EtapeChronologie, EtapeAcces, EtapeGabarits,
+    EtapeCorrelation, EtapeMenaces, EtapeSecrets)}
+
+
+def creer_etapes(esquisses: int = 0, frequences: str = None, chronologie: bool = False,
+                 acces: bool = False, minutes: str = None, gabarits: bool = False,
+                 correlation: bool = False, seuils: Dict[str, Tuple[int, int]] = None,
+                 ioc: List[str] = None, cache_ioc: str = FICHIER_CACHE_IOC,
+                 secrets: bool = False) -> List[Etape]:
+    """
+    Étapes des analyses demandées, qui se cumulent sur un même parcours
+
+    Args:
+        esquisses: Mémoire bornée: nombre d'emails, IPs et liens les plus fréquents suivis,
+            les valeurs distinctes étant estimées (0 = ensembles exacts)
+        frequences: Compter les occurrences et construire des histogrammes par "minute" ou
+            par "heure" (optionnel)
+        chronologie: Convertir la date de chaque ligne en secondes epoch et rapporter
+            période, trous et désordres (optionnel)
+        gabarits: Regrouper les lignes en alerte par gabarit dans le rapport, à la place de la
+            liste des alertes, qui ne sont plus gardées en mémoire (optionnel)
+        correlation: Corréler les échecs d'authentification par IP et par compte dans des
+            fenêtres glissantes (force brute, bourrage d'identifiants); analyse séquentielle,
+            workers = 1 (optionnel)
+        seuils: Seuils de corrélation remplaçant ceux de SEUILS_FORCE_BRUTE (optionnel)
+        ioc: Listes de blocage locales (fichiers ou dossiers: IP et plages CIDR, domaines,
+            URL ou leurs empreintes SHA-256); chaque IP, domaine et URL rencontré y est
+            cherché et une correspondance devient une alerte de gravité haute (optionnel)
+        cache_ioc: Cache binaire des listes compilées, reconstruit quand une liste change
+            (None = compiler les listes à chaque analyse)
+        secrets: Chercher les secrets exposés (clés d'API AWS, GitHub, Slack..., jetons JWT,
+            jetons d'entropie élevée); chacun devient une alerte de gravité haute, masqué
+            partout: entités, contenu de toutes les alertes de sa ligne, indicateurs d'IOC
+            (optionnel)
+
+    Returns:
+        Étapes dans l'ordre de leurs alertes et de leurs sections du rapport
+
+    Raises:
+        ValueError: Résolution inconnue, minutes sans acces, liste d'IOC illisible
+    """
+    if frequences and frequences not in RESOLUTIONS_HISTOGRAMME:
+        raise ValueError(f"Résolution inconnue: {frequences} (choix: {', '.join(RESOLUTIONS_HISTOGRAMME)})")
+    if minutes and not acces:
+        raise ValueError("Options incompatibles: minutes demande acces")
+    etapes: List[Etape] = []
+    if frequences:
+        etapes.append(EtapeFrequences(RESOLUTIONS_HISTOGRAMME[frequences]))
+    if esquisses:
+        etapes.append(EtapeEsquisse(esquisses))
+    if chronologie:
+        etapes.append(EtapeChronologie())
+    if acces:
+        etapes.append(EtapeAcces(minutes))
+    if gabarits:
+        etapes.append(EtapeGabarits())
+    if correlation:
+        etapes.append(EtapeCorrelation(seuils))
+    # Un seul détecteur: les secrets masqués dans les indicateurs sont ceux que cherche l'étape secrets
+    detecteur = DetecteurSecrets() if secrets else None
+    if ioc:
+        debut = time.monotonic()
+        listes = ListesIOC.ouvrir(ioc, cache_ioc)
+        resume_listes = listes.resume()
+        print(f"{Colors.CYAN}🛡️  Listes IOC: {resume_listes['plages_ip']} plages IP, "
+              f"{resume_listes['domaines']} domaines, {resume_listes['urls']} URL "
+              f"({time.monotonic() - debut:.2f} s){Colors.ENDC}")
+        etapes.append(EtapeMenaces(listes, detecteur))
+    if secrets:
+        etapes.append(EtapeSecrets(detecteur))
+    return etapes
+
+
+def verifier_options(reprise: bool = False, memoire_mappee: bool = False, format_log: str = None,
+                     depuis=None, jusqua=None, entites: List[str] = None, index: str = None,
+                     workers: int = 1, etapes: List[Etape] = ()) -> None:
+    """
+    Refuse les combinaisons d'options de analyser_fichier_log qu'une analyse ne peut pas honorer
 
-# ============================================================================
-# FONCTION PRINCIPALE D'ANALYSE
-# ============================================================================
+    Args:
+        reprise, memoire_mappee, format_log, depuis, jusqua, entites, index, workers, etapes:
+            Options du même nom
+
+    Raises:
+        ValueError: Options incompatibles, toutes nommées dans le message
+    """
+    conflits = []
+    if reprise:
+        # Une reprise n'analyse que les ajouts avec l'état de base de son point de reprise
+        ignorees = [etape.nom for etape in etapes] + [
+            nom for nom, valeur in (("format_log", format_log), ("depuis", depuis),
+                                    ("jusqua", jusqua), ("entites", entites))
+            if valeur is not None]
+        if ignorees:
+            conflits.append(f"reprise exclut {', '.join(ignorees)}")
+    sequentielles = [etape.nom for etape in etapes if etape.sequentielle]
+    if sequentielles and workers != 1:
+        conflits.append(f"{', '.join(sequentielles)} exclut workers != 1 (l'analyse suit l'ordre du fichier)")
+    if format_log and memoire_mappee:
+        conflits.append("format_log exclut memoire_mappee (lignes extraites en octets, sans analyseur de format)")
+    if index and (depuis is not None or jusqua is not None):
+        # L'index remplace les entrées du fichier, et les lignes d'une fenêtre sont numérotées
+        # depuis son début: une fenêtre effacerait l'historique indexé du fichier
+        conflits.append("index exclut depuis et jusqua (l'index porte sur le fichier entier)")
+    if conflits:
+        raise ValueError(f"Options incompatibles: {'; '.join(conflits)}")
 
-def analyser_fichier_log(chemin: str, mots_sensibles: List[str] = None) -> Tuple[List[str], List[str], List[str], List[str],List[str]]:
+
+def analyser_fichier_log(chemin: str, mots_sensibles: List[str] = None, mots_entiers: bool = False,
+                         workers: int = 1, memoire_mappee: bool = False, reprise: bool = False,
+                         rendu: str = "detail", rapport: str = FICHIER_SORTIE, sortie: str = None,
+                         resume: str = None, format_log: str = None, index: str = None,
+                         depuis=None, jusqua=None, index_temporel: bool = True,
+                         entites: List[str] = None, etapes: List[Etape] = None) -> ResultatsEntites:
     """
     Analyse un fichier log et extrait les données sensibles
     
     Args:
         chemin: Chemin du fichier à analyser
         mots_sensibles: Liste de mots-clés à détecter (optionnel)
+        mots_entiers: Ne détecter que les mots-clés délimités (optionnel)
+        workers: Nombre de processus pour les gros fichiers (1 = séquentiel, 0 = tous les cœurs)
+        memoire_mappee: Parcours en octets par projection mémoire, mémoire constante (optionnel)
+        reprise: Reprendre au dernier point de reprise et n'analyser que les ajouts (optionnel,
+            exclut etapes, format_log, depuis, jusqua et entites)
+        rendu: Affichage des alertes: "detail", "limite", "agrege" ou "silencieux" (optionnel)
+        rapport: Chemin du rapport texte (optionnel)
+        sortie: Fichier .ndjson/.jsonl/.csv écrit au fil de l'analyse, à la place du rapport
+            texte; les alertes ne sont alors plus gardées en mémoire (optionnel)
+        resume: Chemin du résumé JSON de la sortie en flux (optionnel)
+        format_log: "auto" pour reconnaître le format (Apache/nginx, syslog, JSON, auditd) et
+            extraire les champs avec son analyseur dédié, ou nom d'un format de FORMATS_LOG
+            (optionnel, exclut memoire_mappee)
+        index: Base SQLite (ex: FICHIER_INDEX) où ajouter entités et alertes de ce fichier,
+            interrogeable ensuite par rechercher_index sans relire les logs (optionnel, fichier
+            entier: exclut depuis et jusqua)
+        depuis: Début de la fenêtre temporelle à analyser dans un log trié par date: secondes
+            epoch, date ("2025-01-15 02:10", "Jan 15 02:10:00") ou heure seule ("02:10", jour
+            de la première ligne datée); la position est trouvée par dichotomie, seule la
+            fenêtre est lue (optionnel)
+        jusqua: Fin de la fenêtre temporelle, incluse (optionnel)
+        index_temporel: Après l'analyse complète d'un gros log trié, écrire à côté son index
+            temporel (<log>.cfsidx, repère date → octet par Mo) que les fenêtres temporelles
+            suivantes utilisent tant que la taille et l'inode du log n'ont pas changé
+        entites: Types de REGISTRE_ENTITES extraits en plus des emails, IPs, heures, dates et
+            liens: "ipv6", "macs", "empreintes", "cves", "domaines", "ports" (None = types actifs
+            par défaut: empreintes, CVE et ports; [] = aucun)
+        etapes: Analyses complémentaires de creer_etapes (esquisses, fréquences, chronologie,
+            accès web, gabarits, corrélation, IOC, secrets), qui se cumulent sur le même
+            parcours (optionnel)
+
+    Une combinaison d'options incompatible est refusée (verifier_options) avant toute lecture.
     
     Returns:
-        Tuple (emails, ips, heures, dates) - listes déduplicatées
+        Tuple (emails, ips, heures, dates, liens) - listes déduplicatées, valeurs des autres
+        types par catégorie dans l'attribut autres
     """
-    # Utiliser les mots sensibles par défaut si non fournis
-    if mots_sensibles is None:
-        mots_sensibles = MOTS_SENSIBLES
-    
-    # Initialisation des listes
-    emails, ips, heures, dates, urls = set(), set(), set(), set(), set()
-    alertes = []
-    
     # Vérification de l'existence du fichier
     if not os.path.exists(chemin):
         print(f"{Colors.RED}✗⚠ Erreur: Fichier introuvable⚠️: {chemin}{Colors.ENDC}")
-        return [], [], [], [], []
+        return ResultatsEntites()
     
     # Vérification de l'extension
-    if not chemin.lower().endswith(EXTENSIONS_SUPPORTEES):
+    if not extension_supportee(chemin):
         print(f"{Colors.YELLOW}⚠ Avertissement: Extension non standard. Formats recommandés: {EXTENSIONS_SUPPORTEES}{Colors.ENDC}")
     
     print(f"{Colors.GREEN}📂✅⚡CyberForgeScan⚡Analyse Votre fichier: {chemin}{Colors.ENDC}")
     print(f"{Colors.CYAN}{'─' * 70}{Colors.ENDC}\n")
     
-    ligne_num = 0
-    
+    afficheur = RenduAlertes(rendu)
+    flux = None
+    base = None
     try:
-        # Tentative de lecture avec plusieurs encodages
-        encodages = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
-        fichier_ouvert = False
-        
-        for encodage in encodages:
+        etapes = list(etapes or ())
+        verifier_options(reprise, memoire_mappee, format_log, depuis, jusqua, entites, index,
+                         workers, etapes)
+        sur_alerte = afficheur
+        sur_entite = None
+        if sortie:
+            flux = SortieFlux(sortie, resume)
+        if index:
+            base = IndexEntites(index)
+            # Une reprise n'analyse que les ajouts: compléter l'index au lieu de le remplacer
+            base.commencer(chemin, remplacer=not reprise)
+        destinations = [d for d in (flux, base) if d]
+        if destinations:
+
+            def sur_alerte(alerte: dict) -> None:
+                for destination in destinations:
+                    destination(alerte)
+                afficheur(alerte)
+
+            def sur_entite(categorie: str, valeur: str) -> None:
+                for destination in destinations:
+                    destination.entite(categorie, valeur)
+
+        try:
+            if reprise:
+                # Les alertes de cette exécution restent en mémoire (rapport), les précédentes
+                # sont dans le journal des alertes du point de reprise
+                etat, position = scanner_incremental(chemin, mots_sensibles, mots_entiers, workers,
+                                                     sur_alerte, memoire_mappee, sur_entite)
+            else:
+                # Les gabarits remplacent la liste des alertes du rapport
+                gabarits = any(etape.section == "alertes" for etape in etapes)
+                etat = EtatAnalyse(sur_entite, conserver_alertes=not flux and not gabarits, etapes=etapes)
+                etat.choisir_entites(entites)
+                debut, fin = 0, None
+                if depuis is not None or jusqua is not None:
+                    reperes = IndexTemporel.charger(chemin) if index_temporel else None
+                    debut, fin, debut_epoch, fin_epoch = plage_temporelle(chemin, depuis, jusqua, reperes)
+                    bornes = [time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(epoch)) if epoch is not None else "…"
+                              for epoch in (debut_epoch, fin_epoch)]
+                    print(f"{Colors.CYAN}🎯 Fenêtre {bornes[0]} → {bornes[1]} UTC: octets {debut} à {fin} "
+                          f"({(fin - debut) / (1024 * 1024):.1f} Mo sur {os.path.getsize(chemin) / (1024 * 1024):.1f}), "
+                          f"lignes numérotées depuis le début de la fenêtre"
+                          f"{f', index temporel de {len(reperes)} repères' if reperes else ''}{Colors.ENDC}")
+                etat, position = scanner_fichier(chemin, mots_sensibles, mots_entiers, workers,
+                                                 sur_alerte=sur_alerte, memoire_mappee=memoire_mappee,
+                                                 debut=debut, fin=fin, etat=etat, format_log=format_log), 0
+        finally:
+            afficheur.terminer()
+        if position:
+            print(f"{Colors.CYAN}♻️  Reprise à l'octet {position}: seules les nouvelles lignes ont été analysées{Colors.ENDC}")
+        if reprise:
+            print(f"{Colors.CYAN}📜 Alertes de toutes les analyses incrémentales: {chemin_journal_alertes(chemin)}{Colors.ENDC}")
+        if format_log:
+            print(f"{Colors.CYAN}🧩 Format des lignes: {etat.format_log or 'non reconnu, extraction générique'}{Colors.ENDC}")
+        if base:
+            base.terminer(etat)
+            print(f"{Colors.GREEN}🗃️  Index mis à jour: {index}{Colors.ENDC}")
+        if index_temporel and depuis is None and jusqua is None:
             try:
-                with open(chemin, "r", encoding=encodage) as f:
-                    fichier_ouvert = True
-                    
-                    for ligne in f:
-                        ligne_num += 1
-                        ligne = ligne.strip()
-                        
-                        if not ligne:  # Ignorer les lignes vides
-                            continue
-                        
-                        # Extraction des données
-                        e, i, h, d,u = extraire_info_ligne(ligne)
-                        
-                        # Ajout aux ensembles (déduplique automatiquement)
-                        emails.update(e)
-                        heures.update(h)
-                        dates.update(d)
-                        urls.update(u)
-                        
-                        # Validation et ajout des IPs
-                        for ip in i:
-                            if valider_ip(ip):
-                                ips.add(ip)
-                        
-                        # Détection de mots sensibles
-                        ligne_lower = ligne.lower()
-                        for mot in mots_sensibles:
-                            if mot.lower() in ligne_lower:
-                                alerte = {
-                                    'ligne': ligne_num,
-                                    'mot_cle': mot,
-                                    'contenu': ligne[:100]  # Limiter à 100 caractères
-                                }
-                                alertes.append(alerte)
-                                
-                                # Affichage de l'alerte
-                                print(f"{Colors.RED}🚨 ALERTE - Ligne {ligne_num}{Colors.ENDC}")
-                                print(f"{Colors.YELLOW}   Mot-clé: {mot}{Colors.ENDC}")
-                                print(f"{Colors.CYAN}   Contenu: {ligne[:100]}{'...' if len(ligne) > 100 else ''}{Colors.ENDC}")
-                                print(f"{Colors.CYAN}   {'─' * 70}{Colors.ENDC}\n")
-                    
-                    break  # Sortir de la boucle si la lecture a réussi
-                    
-            except UnicodeDecodeError:
-                if encodage == encodages[-1]:  # Dernier encodage tenté
-                    raise
-                continue  # Essayer l'encodage suivant
-        
-        if not fichier_ouvert:
-            raise Exception("Impossible de lire le fichier avec les encodages supportés")
-        
-        # Conversion des ensembles en listes triées
-        emails_list = sorted(list(emails))
-        ips_list = sorted(list(ips))
-        heures_list = sorted(list(heures))
-        dates_list = sorted(list(dates))
-        liens_list= sorted(list(urls))
-        
-        # Sauvegarde des résultats
-        sauvegarder_resultats(chemin, emails_list, ips_list, heures_list, dates_list,liens_list, alertes)
+                reperes = IndexTemporel.mettre_a_jour(chemin)
+            except OSError as e:
+                reperes = None
+                print(f"{Colors.YELLOW}⚠ Index temporel non écrit: {e}{Colors.ENDC}")
+            if reperes:
+                print(f"{Colors.GREEN}🗂️  Index temporel: {len(reperes)} repères "
+                      f"({IndexTemporel.chemin_index(chemin)}){Colors.ENDC}")
         
-        # Affichage du résumé
-        print(f"\n{Colors.GREEN}✅ Analyse terminée!{Colors.ENDC}")
-        print(f"{Colors.CYAN}{'═' * 70}{Colors.ENDC}")
-        print(f"{Colors.BOLD}📊 STATISTIQUES:{Colors.ENDC}")
-        print(f"   • Lignes analysées: {ligne_num}")
-        print(f"   • Emails trouvés: {len(emails_list)}")
-        print(f"   • IPs trouvées: {len(ips_list)}")
-        print(f"   • Heures trouvées: {len(heures_list)}")
-        print(f"   • Dates trouvées: {len(dates_list)}")
-        print(f"   • Liens trouvés: {len(liens_list)}")
-        print(f"   • Alertes: {len(alertes)}")
-        print(f"{Colors.CYAN}{'═' * 70}{Colors.ENDC}\n")
-        print(f"{Colors.GREEN}💾 Résultats sauvegardés dans: {FICHIER_SORTIE}{Colors.ENDC}\n")
-        
-        return emails_list, ips_list, heures_list, dates_list, liens_list
+        return terminer_analyse(chemin, etat, flux, rapport)
         
     except FileNotFoundError:
         print(f"{Colors.RED}✗ Erreur: Fichier introuvable: {chemin}{Colors.ENDC}")
-        return [], [], [], [], []
+        return ResultatsEntites()
     
     except PermissionError:
         print(f"{Colors.RED}✗ Erreur: Permission refusée pour lire: {chemin}{Colors.ENDC}")
-        return [], [], [], [], []
+        return ResultatsEntites()
+
+    except ValueError as e:
+        # Paramètre refusé: format inconnu, borne de fenêtre illisible...
+        print(f"{Colors.RED}✗ Erreur: {e}{Colors.ENDC}")
+        return ResultatsEntites()
     
     except Exception as e:
         print(f"{Colors.RED}✗ Erreur inattendue: {type(e).__name__} - {e}{Colors.ENDC}")
-        return [], [], [], [], []
+        return ResultatsEntites()
+
+    finally:
+        if base:
+            base.fermer()
+
+# ============================================================================
+# SUIVI EN CONTINU (tail -F)
+# ============================================================================
+
+class SuiviFichier:
+    """Lecture incrémentale d'un fichier log qui grossit, avec gestion de la rotation"""
+
+    def __init__(self, chemin: str, mots_sensibles: List[str] = None, mots_entiers: bool = False,
+                 depuis_debut: bool = False):
+        """
+        Prépare le suivi d'un fichier
+
+        Args:
+            chemin: Fichier à suivre
+            mots_sensibles: Liste de mots-clés à détecter (optionnel)
+            mots_entiers: Ne détecter que les mots-clés délimités (optionnel)
+            depuis_debut: Analyser aussi le contenu existant (sinon départ à la fin,
+                et les numéros de ligne sont comptés à partir de ce point)
+        """
+        self.chemin = chemin
+        self.detecteur = compiler_mots_cles(mots_sensibles, mots_entiers)
+        self.etat = EtatAnalyse()
+        self.depuis_debut = depuis_debut
+        self.identite = None       # (périphérique, inode) du fichier ouvert
+        self.position = 0          # Octets déjà lus dans le fichier ouvert
+        self.ligne_num = 0         # Numéro de ligne dans le fichier ouvert
+        self.rotations = 0
+        self.encodage = "utf-8"
+        self._fichier = None
+        self._reste = b""          # Ligne incomplète en attente de sa fin
+        self._premier_appel = True
+
+    def _ouvrir(self, depuis_debut: bool) -> bool:
+        """Ouvre (ou rouvre) le fichier, renvoie False s'il n'existe pas encore"""
+        try:
+            self._fichier = open(self.chemin, "rb")
+        except FileNotFoundError:
+            return False
+        infos = os.fstat(self._fichier.fileno())
+        self.identite = (infos.st_dev, infos.st_ino)
+        self.encodage = detecter_encodage(self.chemin)
+        if not _compatible_ascii(self.encodage):
+            self.encodage = "utf-8"
+        self.position = 0 if depuis_debut else infos.st_size
+        self._fichier.seek(self.position)
+        self.ligne_num = 0
+        self._reste = b""
+        return True
+
+    def _rotation_detectee(self) -> bool:
+        """Vrai si le chemin désigne un autre fichier (rotation) ou a été tronqué"""
+        try:
+            infos = os.stat(self.chemin)
+        except FileNotFoundError:
+            return False  # Entre le renommage et la recréation: attendre
+        return (infos.st_dev, infos.st_ino) != self.identite or infos.st_size < self.position
+
+    def _traiter(self, brute: bytes, alertes: List[dict]) -> None:
+        self.ligne_num += 1
+        self.etat.lignes += 1
+        ligne = _decoder_ligne(brute, self.encodage).strip()
+        if ligne:
+            alertes.extend(self.etat.traiter_ligne(self.ligne_num, ligne, self.detecteur))
+
+    def _lire_disponible(self) -> List[dict]:
+        """Lit tout ce qui a été ajouté depuis le dernier appel"""
+        alertes = []
+        while True:
+            donnees = self._fichier.read(TAILLE_BLOC)
+            if not donnees:
+                break
+            self.position += len(donnees)
+            lignes = (self._reste + donnees).split(b"\n")
+            self._reste = lignes.pop()
+            for brute in lignes:
+                self._traiter(brute, alertes)
+        return alertes
+
+    def lire_nouveautes(self) -> List[dict]:
+        """
+        Analyse les octets ajoutés depuis le dernier appel
+
+        Returns:
+            Alertes produites par les nouvelles lignes complètes
+        """
+        if self._fichier is None:
+            # Un fichier apparu après le premier appel est lu depuis son début
+            depuis_debut = self.depuis_debut or not self._premier_appel
+            self._premier_appel = False
+            if not self._ouvrir(depuis_debut):
+                return []
+
+        alertes = self._lire_disponible()
+        if self._rotation_detectee():
+            # Terminer l'ancien fichier (rotation par renommage) puis suivre le nouveau
+            alertes.extend(self._lire_disponible())
+            if self._reste:
+                self._traiter(self._reste, alertes)
+            self._fichier.close()
+            self._fichier = None
+            self.rotations += 1
+            if self._ouvrir(depuis_debut=True):
+                alertes.extend(self._lire_disponible())
+        return alertes
+
+    def fermer(self) -> List[dict]:
+        """Traite la dernière ligne incomplète et ferme le fichier"""
+        alertes = []
+        if self._reste:
+            self._traiter(self._reste, alertes)
+            self._reste = b""
+        if self._fichier is not None:
+            self._fichier.close()
+            self._fichier = None
+        return alertes
+
+
+def suivre_fichier_log(chemin: str, mots_sensibles: List[str] = None, mots_entiers: bool = False,
+                       intervalle: float = 1.0, depuis_debut: bool = False, duree_max: float = None,
+                       rendu: str = "detail", rapport: str = FICHIER_SORTIE, sortie: str = None,
+                       resume: str = None, etapes: List[Etape] = None) -> ResultatsEntites:
+    """
+    Surveille un fichier log en continu et affiche les alertes au fil de l'eau
+
+    Seuls les octets ajoutés sont lus; les entités et alertes restent en mémoire.
+    Arrêt par Ctrl+C (ou après duree_max secondes), suivi du rapport habituel.
+
+    Args:
+        chemin: Fichier à surveiller (ex: /var/log/auth.log)
+        mots_sensibles: Liste de mots-clés à détecter (optionnel)
+        mots_entiers: Ne détecter que les mots-clés délimités (optionnel)
+        intervalle: Délai maximal en secondes entre deux lectures
+        depuis_debut: Analyser aussi le contenu déjà présent
+        duree_max: Durée de surveillance en secondes (illimitée par défaut)
+        rendu: Affichage des alertes: "detail", "limite", "agrege" ou "silencieux"
+        rapport: Chemin du rapport texte
+        sortie: Fichier .ndjson/.jsonl/.csv alimenté à chaque lecture, à la place du
+            rapport texte; les alertes ne sont alors plus gardées en mémoire
+        resume: Chemin du résumé JSON de la sortie en flux
+        etapes: Analyses complémentaires de creer_etapes, par exemple la corrélation des échecs
+            d'authentification (force brute, bourrage d'identifiants)
+
+    Returns:
+        Tuple (emails, ips, heures, dates, liens) à l'arrêt
+    """
+    print(f"{Colors.GREEN}👁️  Surveillance de: {chemin} (Ctrl+C pour arrêter){Colors.ENDC}")
+    print(f"{Colors.CYAN}{'─' * 70}{Colors.ENDC}\n")
+
+    suivi = SuiviFichier(chemin, mots_sensibles, mots_entiers, depuis_debut)
+    afficheur = RenduAlertes(rendu)
+    flux = None
+    if sortie:
+        flux = SortieFlux(sortie, resume)
+    etapes = list(etapes or ())
+    gabarits = any(etape.section == "alertes" for etape in etapes)
+    suivi.etat = EtatAnalyse(flux.entite if flux else None, conserver_alertes=not flux and not gabarits,
+                             etapes=etapes)
+    debut = time.monotonic()
+    rotations = 0
+    try:
+        while duree_max is None or time.monotonic() - debut < duree_max:
+            for alerte in suivi.lire_nouveautes():
+                if flux:
+                    flux(alerte)
+                afficheur(alerte)
+            # Latence bornée par l'intervalle de lecture
+            afficheur.vider()
+            if flux:
+                flux.vider()
+            if suivi.rotations != rotations:
+                rotations = suivi.rotations
+                print(f"{Colors.YELLOW}🔄 Rotation détectée, reprise au début de {chemin}{Colors.ENDC}\n")
+            time.sleep(intervalle)
+    except KeyboardInterrupt:
+        afficheur.vider()
+        print(f"\n{Colors.YELLOW}Surveillance arrêtée{Colors.ENDC}")
+    finally:
+        for alerte in suivi.fermer():
+            if flux:
+                flux(alerte)
+            afficheur(alerte)
+        afficheur.terminer()
+
+    if not os.path.exists(chemin):
+        if flux:
+            flux.terminer(chemin, suivi.etat)
+        return suivi.etat.resultats()
+    return terminer_analyse(chemin, suivi.etat, flux, rapport)
+
+# ============================================================================
+# POINTS DE REPRISE (ANALYSE INCRÉMENTALE)
+# ============================================================================
+
+# Dossier des points de reprise (un fichier JSON par log analysé)
+DOSSIER_REPRISES = "reprises_analyse"
+
+# Octets précédant la position de reprise, comparés pour détecter une réécriture
+TAILLE_EMPREINTE = 4096
+
+# Version 2: types supplémentaires du registre d'entités dans l'état et la signature
+# Version 3: alertes hors du point de reprise, ajoutées à un journal à part
+VERSION_REPRISE = 3
+
+# Suffixe du journal des alertes des exécutions successives (NDJSON, ajout seul)
+SUFFIXE_JOURNAL_ALERTES = ".alertes.ndjson"
+
+
+def _chemin_reprise(chemin: str) -> str:
+    """Fichier de reprise associé à un log"""
+    absolu = os.path.abspath(chemin)
+    cle = hashlib.sha1(absolu.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(DOSSIER_REPRISES, f"{os.path.basename(absolu)}.{cle}.json")
+
+
+def chemin_journal_alertes(chemin: str) -> str:
+    """Journal NDJSON des alertes des analyses incrémentales d'un log"""
+    return _chemin_reprise(chemin)[:-len(".json")] + SUFFIXE_JOURNAL_ALERTES
+
+
+def _empreinte(chemin: str, position: int) -> str:
+    """Empreinte SHA-1 des octets précédant une position"""
+    with open(chemin, "rb") as f:
+        f.seek(max(0, position - TAILLE_EMPREINTE))
+        return hashlib.sha1(f.read(min(position, TAILLE_EMPREINTE))).hexdigest()
+
+
+def _signature_configuration(mots_sensibles: List[str], mots_entiers: bool,
+                             categories: Tuple[str, ...] = None) -> str:
+    """Signature des réglages qui influencent les résultats (mots-clés, types d'entités extraits)"""
+    mots = compiler_mots_cles(mots_sensibles, mots_entiers).mots
+    if categories is None:
+        categories = categories_supplementaires()
+    return hashlib.sha1(json.dumps([mots, mots_entiers, list(categories)]).encode("utf-8")).hexdigest()
+
+
+def _fin_derniere_ligne(chemin: str, taille: int) -> int:
+    """Position suivant le dernier '\\n' du fichier (0 s'il n'y en a pas)"""
+    with open(chemin, "rb") as f:
+        position = taille
+        while position > 0:
+            debut = max(0, position - TAILLE_BLOC)
+            f.seek(debut)
+            saut = f.read(position - debut).rfind(b"\n")
+            if saut >= 0:
+                return debut + saut + 1
+            position = debut
+    return 0
+
+
+def charger_reprise(chemin: str, mots_sensibles: List[str] = None, mots_entiers: bool = False) -> Optional[dict]:
+    """
+    Charge le point de reprise d'un fichier s'il est encore valable
+
+    Il est écarté si le fichier a changé d'inode (rotation), a été tronqué,
+    si les octets précédant la position ont changé, ou si la liste de
+    mots-clés ou les types d'entités actifs du registre ne sont plus les mêmes.
+
+    Args:
+        chemin: Fichier log
+        mots_sensibles: Liste de mots-clés de l'analyse en cours
+        mots_entiers: Mode mots délimités de l'analyse en cours
+
+    Returns:
+        Dictionnaire de reprise, ou None pour une analyse complète
+    """
+    try:
+        with open(_chemin_reprise(chemin), "r", encoding="utf-8") as f:
+            reprise = json.load(f)
+        infos = os.stat(chemin)
+    except (OSError, ValueError):
+        return None
+
+    if (reprise.get('version') != VERSION_REPRISE
+            or reprise['identite'] != [infos.st_dev, infos.st_ino]
+            or infos.st_size < reprise['position']
+            or reprise['configuration'] != _signature_configuration(mots_sensibles, mots_entiers)
+            or _empreinte(chemin, reprise['position']) != reprise['empreinte']):
+        return None
+    return reprise
+
+
+def _journaliser_alertes(chemin: str, alertes: List[dict], taille: int = 0) -> int:
+    """
+    Ajoute les alertes d'une exécution au journal d'un log
+
+    Le journal est d'abord ramené à la taille notée par le point de reprise:
+    les alertes d'une exécution interrompue avant son point de reprise, qui
+    seront de nouveau produites, n'y restent pas en double.
+
+    Args:
+        chemin: Fichier log
+        alertes: Nouvelles alertes (numéros de ligne globaux)
+        taille: Taille valide du journal (0 = nouveau journal)
+
+    Returns:
+        Nouvelle taille du journal
+    """
+    os.makedirs(DOSSIER_REPRISES, exist_ok=True)
+    journal = chemin_journal_alertes(chemin)
+    with open(journal, "ab") as f:
+        f.truncate(taille)
+        f.seek(taille)
+        for alerte in alertes:
+            f.write(json.dumps(alerte, ensure_ascii=False).encode("utf-8") + b"\n")
+        return f.tell()
+
+
+def enregistrer_reprise(chemin: str, etat: EtatAnalyse, position: int,
+                        mots_sensibles: List[str] = None, mots_entiers: bool = False,
+                        taille_journal: int = 0) -> None:
+    """
+    Écrit le point de reprise d'un fichier (remplacement atomique)
+
+    Le point de reprise ne garde que les entités, les comptes et la position;
+    les alertes sont dans le journal (chemin_journal_alertes).
+
+    Args:
+        chemin: Fichier log
+        etat: État cumulé jusqu'à position
+        position: Octet suivant la dernière ligne complète analysée
+        mots_sensibles: Liste de mots-clés utilisée
+        mots_entiers: Mode mots délimités utilisé
+        taille_journal: Taille du journal des alertes jusqu'à position
+    """
+    infos = os.stat(chemin)
+    reprise = {
+        'version': VERSION_REPRISE,
+        'chemin': os.path.abspath(chemin),
+        'identite': [infos.st_dev, infos.st_ino],
+        'position': position,
+        'empreinte': _empreinte(chemin, position),
+        'configuration': _signature_configuration(mots_sensibles, mots_entiers, etat.supplementaires),
+        'date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'journal_alertes': taille_journal,
+        'etat': etat.vers_dict(avec_alertes=False)
+    }
+    os.makedirs(DOSSIER_REPRISES, exist_ok=True)
+    destination = _chemin_reprise(chemin)
+    temporaire = destination + ".tmp"
+    with open(temporaire, "w", encoding="utf-8") as f:
+        json.dump(reprise, f, ensure_ascii=False)
+    os.replace(temporaire, destination)
+
+
+def scanner_incremental(chemin: str, mots_sensibles: List[str] = None, mots_entiers: bool = False,
+                        workers: int = 1, sur_alerte: Callable[[dict], None] = None,
+                        memoire_mappee: bool = False,
+                        sur_entite: Callable[[str, str], None] = None) -> Tuple[EtatAnalyse, int]:
+    """
+    Analyse seulement ce qui a été ajouté depuis le dernier point de reprise
+
+    Seules les lignes complètes sont analysées: une dernière ligne en cours
+    d'écriture le sera au passage suivant. Le coût ne dépend que des ajouts
+    (et du nombre d'entités distinctes): l'état renvoyé ne contient que les
+    alertes de cette exécution, celles des précédentes sont dans le journal
+    des alertes (chemin_journal_alertes), complété à chaque passage.
+
+    Args:
+        chemin: Fichier à analyser
+        mots_sensibles: Liste de mots-clés à détecter (optionnel)
+        mots_entiers: Ne détecter que les mots-clés délimités (optionnel)
+        workers: Nombre de processus (1 = séquentiel, 0 = tous les cœurs)
+        sur_alerte: Fonction appelée pour chaque nouvelle alerte
+        memoire_mappee: Parcours par projection mémoire
+        sur_entite: Fonction appelée pour chaque entité absente du point de reprise
+            (à la fusion, après le parcours des ajouts)
+
+    Returns:
+        (état cumulé ancien + nouveau - alertes de cette exécution seulement, nombre
+        cumulé -, octet de reprise ou 0 si analyse complète)
+    """
+    if detecter_compression(chemin) or not _compatible_ascii(detecter_encodage(chemin)):
+        # Reprise à un octet donné impossible en UTF-16/32 ou dans un flux compressé
+        return scanner_fichier(chemin, mots_sensibles, mots_entiers, workers,
+                               sur_alerte, memoire_mappee, etat=EtatAnalyse(sur_entite)), 0
+
+    reprise = charger_reprise(chemin, mots_sensibles, mots_entiers)
+    if reprise:
+        etat = EtatAnalyse.depuis_dict(reprise['etat'])
+        debut = reprise['position']
+        taille_journal = reprise['journal_alertes']
+    else:
+        etat = EtatAnalyse()
+        debut = taille_journal = 0
+    etat.sur_entite = sur_entite
+
+    fin = _fin_derniere_ligne(chemin, os.path.getsize(chemin))
+    base = etat.lignes
+
+    def recaler(alerte: dict) -> None:
+        # Numéros de ligne globaux avant affichage
+        alerte['ligne'] += base
+        if sur_alerte:
+            sur_alerte(alerte)
+
+    if fin > debut:
+        nouveau = scanner_fichier(chemin, mots_sensibles, mots_entiers, workers,
+                                  recaler, memoire_mappee, debut=debut, fin=fin)
+        etat.fusionner(nouveau)
+    taille_journal = _journaliser_alertes(chemin, etat.alertes, taille_journal)
+    enregistrer_reprise(chemin, etat, max(fin, debut), mots_sensibles, mots_entiers, taille_journal)
+    return etat, debut
+
+# ============================================================================
+# ANALYSE D'UN DOSSIER
+# ============================================================================
+
+# Taille visée d'un lot de petits fichiers confié à un même processus
+TAILLE_LOT = 8 * 1024 * 1024
+
+# Nombre maximal de fichiers dans un lot
+FICHIERS_PAR_LOT = 256
+
+
+def lister_fichiers_logs(dossier: str, motifs: List[str] = None, exclure: List[str] = None) -> List[str]:
+    """
+    Parcourt récursivement un dossier et sélectionne les fichiers à analyser
+
+    Args:
+        dossier: Dossier racine
+        motifs: Motifs glob supplémentaires sur le nom (ex: "*.log.*" pour auth.log.1)
+        exclure: Motifs glob de noms ou de chemins à ignorer
+
+    Returns:
+        Chemins triés des fichiers retenus
+    """
+    motifs = motifs or []
+    exclure = exclure or []
+    retenus = []
+    for racine, _, fichiers in os.walk(dossier):
+        for nom in fichiers:
+            chemin = os.path.join(racine, nom)
+            if nom.endswith(SUFFIXE_INDEX_TEMPOREL) or any(fnmatch.fnmatch(nom, m) or fnmatch.fnmatch(chemin, m)
+                                                          for m in exclure):
+                continue
+            if extension_supportee(nom) or any(fnmatch.fnmatch(nom, m) for m in motifs):
+                if os.path.isfile(chemin):
+                    retenus.append(chemin)
+    return sorted(retenus)
+
+
+def grouper_en_lots(chemins: List[str]) -> List[List[str]]:
+    """
+    Regroupe les petits fichiers pour que le coût par tâche ne domine pas
+
+    Les fichiers plus gros que TAILLE_LOT forment chacun leur propre lot.
+
+    Args:
+        chemins: Fichiers à répartir
+
+    Returns:
+        Liste de lots (listes de chemins)
+    """
+    lots, courant, taille_courante = [], [], 0
+    for chemin in chemins:
+        try:
+            taille = os.path.getsize(chemin)
+        except OSError:
+            taille = 0
+        if taille >= TAILLE_LOT:
+            lots.append([chemin])
+            continue
+        courant.append(chemin)
+        taille_courante += taille
+        if taille_courante >= TAILLE_LOT or len(courant) >= FICHIERS_PAR_LOT:
+            lots.append(courant)
+            courant, taille_courante = [], 0
+    if courant:
+        lots.append(courant)
+    return lots
+
+
+def _analyser_lot(chemins: List[str], mots_sensibles: List[str], mots_entiers: bool,
+                  memoire_mappee: bool) -> List[Tuple[str, Optional[EtatAnalyse], Optional[str]]]:
+    """
+    Analyse un lot de fichiers (exécuté dans un processus du pool)
+
+    Returns:
+        Liste de (chemin, état ou None, message d'erreur ou None)
+    """
+    resultats = []
+    for chemin in chemins:
+        try:
+            etat = scanner_fichier(chemin, mots_sensibles, mots_entiers, memoire_mappee=memoire_mappee)
+            for alerte in etat.alertes:
+                alerte['fichier'] = chemin
+            resultats.append((chemin, etat, None))
+        except (OSError, ValueError, EOFError, lzma.LZMAError) as e:
+            resultats.append((chemin, None, f"{type(e).__name__} - {e}"))
+    return resultats
+
+
+def scanner_dossier_logs(dossier: str, mots_sensibles: List[str] = None, mots_entiers: bool = False,
+                         workers: int = 0, motifs: List[str] = None, exclure: List[str] = None,
+                         memoire_mappee: bool = False,
+                         sur_fichier: Callable[[str, Optional[EtatAnalyse], Optional[str]], None] = None
+                         ) -> Tuple[Dict[str, EtatAnalyse], Dict[str, str]]:
+    """
+    Analyse tous les logs d'une arborescence dans un pool de processus borné
+
+    Args:
+        dossier: Dossier racine
+        mots_sensibles: Liste de mots-clés à détecter (optionnel)
+        mots_entiers: Ne détecter que les mots-clés délimités (optionnel)
+        workers: Nombre de processus (0 = tous les cœurs)
+        motifs: Motifs glob de noms à inclure en plus de EXTENSIONS_SUPPORTEES
+        exclure: Motifs glob à ignorer
+        memoire_mappee: Parcours par projection mémoire
+        sur_fichier: Fonction appelée à la fin de chaque fichier (chemin, état, erreur)
+
+    Returns:
+        (états par fichier, erreurs par fichier)
+    """
+    workers = workers or os.cpu_count() or 1
+    lots = grouper_en_lots(lister_fichiers_logs(dossier, motifs, exclure))
+    etats: Dict[str, EtatAnalyse] = {}
+    erreurs: Dict[str, str] = {}
+
+    def recevoir(resultats):
+        for chemin, etat, erreur in resultats:
+            if etat is not None:
+                etats[chemin] = etat
+            else:
+                erreurs[chemin] = erreur
+            if sur_fichier:
+                sur_fichier(chemin, etat, erreur)
+
+    if workers <= 1 or len(lots) <= 1:
+        for lot in lots:
+            recevoir(_analyser_lot(lot, mots_sensibles, mots_entiers, memoire_mappee))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(lots))) as pool:
+            futures = [pool.submit(_analyser_lot, lot, mots_sensibles, mots_entiers, memoire_mappee)
+                       for lot in lots]
+            for future in as_completed(futures):
+                recevoir(future.result())
+
+    return dict(sorted(etats.items())), erreurs
+
+
+def analyser_dossier(dossier: str, mots_sensibles: List[str] = None, mots_entiers: bool = False,
+                     workers: int = 0, motifs: List[str] = None, exclure: List[str] = None,
+                     memoire_mappee: bool = False, rendu: str = "detail", rapport: str = FICHIER_SORTIE,
+                     sortie: str = None, resume: str = None,
+                     index: str = None) -> ResultatsEntites:
+    """
+    Analyse un dossier de logs et produit un rapport fusionné attribuant chaque résultat à son fichier
+
+    Args:
+        dossier: Dossier racine
+        mots_sensibles: Liste de mots-clés à détecter (optionnel)
+        mots_entiers: Ne détecter que les mots-clés délimités (optionnel)
+        workers: Nombre de processus (0 = tous les cœurs)
+        motifs: Motifs glob supplémentaires (ex: ["*.log.*"] pour les logs tournés)
+        exclure: Motifs glob à ignorer
+        memoire_mappee: Parcours par projection mémoire
+        rendu: Affichage des alertes: "detail", "limite", "agrege" ou "silencieux"
+        rapport: Chemin du rapport texte
+        sortie: Fichier .ndjson/.jsonl/.csv écrit fichier par fichier, à la place du rapport
+            texte (entités et alertes portent le champ "fichier")
+        resume: Chemin du résumé JSON de la sortie en flux
+        index: Base SQLite où ajouter entités et alertes de chaque fichier (optionnel)
+
+    Returns:
+        Tuple (emails, ips, heures, dates, liens) fusionnés
+    """
+    if not os.path.isdir(dossier):
+        print(f"{Colors.RED}✗ Erreur: Dossier introuvable: {dossier}{Colors.ENDC}")
+        return ResultatsEntites()
+
+    print(f"{Colors.GREEN}📂✅⚡CyberForgeScan⚡Analyse du dossier: {dossier}{Colors.ENDC}")
+    print(f"{Colors.CYAN}{'─' * 70}{Colors.ENDC}\n")
+
+    afficheur = RenduAlertes(rendu)
+    flux = SortieFlux(sortie, resume) if sortie else None
+    base = IndexEntites(index) if index else None
+
+    def sur_fichier(chemin: str, etat: Optional[EtatAnalyse], erreur: Optional[str]) -> None:
+        if erreur:
+            afficheur.vider()
+            print(f"{Colors.RED}✗ {chemin}: {erreur}{Colors.ENDC}")
+            return
+        if base:
+            base.commencer(chemin)
+        if flux or base:
+            for categorie in CATEGORIES_ENTITES + tuple(etat.autres):
+                for valeur in sorted(etat.ensemble(categorie)):
+                    if flux:
+                        flux.entite(categorie, valeur, chemin)
+                    if base:
+                        base.entite(categorie, valeur)
+        for alerte in etat.alertes:
+            if flux:
+                flux(alerte)
+            if base:
+                base(alerte)
+            afficheur(alerte)
+        if base:
+            base.terminer(etat)
+
+    try:
+        etats, erreurs = scanner_dossier_logs(dossier, mots_sensibles, mots_entiers, workers,
+                                              motifs, exclure, memoire_mappee, sur_fichier)
+    finally:
+        afficheur.terminer()
+        if base:
+            base.fermer()
+
+    total = EtatAnalyse()
+    for etat in etats.values():
+        total.fusionner(etat)
+    resultats = total.resultats()
+
+    if flux:
+        flux.terminer(dossier, total, fichiers=len(etats), erreurs=erreurs)
+    else:
+        sauvegarder_resultats_dossier(dossier, etats, erreurs, rapport)
+
+    print(f"\n{Colors.GREEN}✅ Analyse du dossier terminée!{Colors.ENDC}")
+    print(f"{Colors.CYAN}{'═' * 70}{Colors.ENDC}")
+    print(f"{Colors.BOLD}📊 STATISTIQUES:{Colors.ENDC}")
+    print(f"   • Fichiers analysés: {len(etats)}")
+    print(f"   • Fichiers en erreur: {len(erreurs)}")
+    print(f"   • Lignes analysées: {total.lignes}")
+    print(f"   • Emails trouvés: {len(resultats[0])}")
+    print(f"   • IPs trouvées: {len(resultats[1])}")
+    print(f"   • Heures trouvées: {len(resultats[2])}")
+    print(f"   • Dates trouvées: {len(resultats[3])}")
+    print(f"   • Liens trouvés: {len(resultats[4])}")
+    for categorie, valeurs in resultats.autres.items():
+        print(f"   • {REGISTRE_ENTITES[categorie].libelle}: {len(valeurs)}")
+    print(f"   • Alertes: {total.nombre_alertes}")
+    print(f"{Colors.CYAN}{'═' * 70}{Colors.ENDC}\n")
+    if flux:
+        print(f"{Colors.GREEN}💾 Résultats sauvegardés dans: {flux.chemin} (résumé: {flux.chemin_resume}){Colors.ENDC}\n")
+    else:
+        print(f"{Colors.GREEN}💾 Résultats sauvegardés dans: {rapport}{Colors.ENDC}\n")
+
+    return resultats
+
+# ============================================================================
+# FUSION CHRONOLOGIQUE DE PLUSIEURS LOGS
+# ============================================================================
+
+def lignes_datees(chemin: str, indice: int = 0) -> Iterator[Tuple[int, int, int, str]]:
+    """
+    Lit un log en flux et date chacune de ses lignes non vides
+
+    Une ligne sans date (suite d'une trace de pile...) prend la date de la ligne
+    datée qui la précède; les lignes non datées en tête du fichier prennent 0.
+
+    Args:
+        chemin: Fichier log, éventuellement compressé
+        indice: Numéro de la source, reporté dans chaque tuple (départage les égalités)
+
+    Yields:
+        (secondes epoch, indice, numéro de ligne, ligne)
+    """
+    encodage = detecter_encodage(chemin)
+    annee = AnneesSyslog(os.path.getmtime(chemin)).suivre
+    epoch = 0
+    with io.TextIOWrapper(ouvrir_flux(chemin), encoding=encodage, errors=REPLI_LATIN1) as f:
+        for ligne_num, ligne in enumerate(f, 1):
+            ligne = ligne.strip()
+            if not ligne:
+                continue
+            date = horodatage_ligne(ligne, annee)
+            if date is not None:
+                epoch = date
+            yield epoch, indice, ligne_num, ligne
+
+
+def fusionner_logs(chemins: List[str]) -> Iterator[Tuple[int, int, int, str]]:
+    """
+    Fusionne des logs triés par date en une seule chronologie (fusion à k voies)
+
+    heapq.merge garde une seule ligne en attente par fichier dans un tas: la mémoire
+    dépend du nombre de fichiers, pas de leur taille. À date égale, l'ordre des
+    chemins puis celui des lignes est conservé.
+
+    Args:
+        chemins: Fichiers log, chacun trié par date
+
+    Yields:
+        (secondes epoch, indice du fichier dans chemins, numéro de ligne, ligne)
+    """
+    return heapq.merge(*(lignes_datees(chemin, indice) for indice, chemin in enumerate(chemins)))
+
+
+def analyser_logs_fusionnes(chemins: List[str], mots_sensibles: List[str] = None, mots_entiers: bool = False,
+                            rendu: str = "detail", rapport: str = FICHIER_SORTIE, sortie: str = None,
+                            resume: str = None,
+                            fil_chronologique: str = None) -> ResultatsEntites:
+    """
+    Analyse plusieurs logs (machines, services) comme une seule chronologie
+
+    Les lignes de tous les fichiers passent par l'extraction et la détection habituelles
+    dans l'ordre de leurs dates; chaque alerte porte son fichier d'origine ("fichier"),
+    sa ligne dans ce fichier et sa date ("horodatage"). Le rapport attribue les entités
+    à leurs fichiers et liste les alertes dans l'ordre chronologique.
+
+    Args:
+        chemins: Fichiers log à fusionner, chacun trié par date (compressés acceptés)
+        mots_sensibles: Liste de mots-clés à détecter (optionnel)
+        mots_entiers: Ne détecter que les mots-clés délimités (optionnel)
+        rendu: Affichage des alertes: "detail", "limite", "agrege" ou "silencieux"
+        rapport: Chemin du rapport texte
+        sortie: Fichier .ndjson/.jsonl/.csv écrit au fil de l'analyse, à la place du rapport texte
+        resume: Chemin du résumé JSON de la sortie en flux
+        fil_chronologique: Fichier texte recevant la chronologie fusionnée, une ligne par
+            ligne de log précédée de sa date UTC et de sa source (optionnel)
+
+    Returns:
+        Tuple (emails, ips, heures, dates, liens) fusionnés
+    """
+    erreurs = {chemin: "Fichier introuvable" for chemin in chemins if not os.path.isfile(chemin)}
+    chemins = [chemin for chemin in chemins if chemin not in erreurs]
+    for chemin, erreur in erreurs.items():
+        print(f"{Colors.RED}✗ {chemin}: {erreur}{Colors.ENDC}")
+    if not chemins:
+        return ResultatsEntites()
+
+    # Étiquette de source: chemin relatif au dossier commun (auth.log de deux machines reste distinct)
+    commun = os.path.commonpath([os.path.abspath(os.path.dirname(chemin) or ".") for chemin in chemins])
+    sources = [os.path.relpath(os.path.abspath(chemin), commun) for chemin in chemins]
+
+    print(f"{Colors.GREEN}📂✅⚡CyberForgeScan⚡Fusion chronologique de {len(chemins)} fichiers{Colors.ENDC}")
+    print(f"{Colors.CYAN}{'─' * 70}{Colors.ENDC}\n")
+
+    afficheur = RenduAlertes(rendu)
+    flux = SortieFlux(sortie, resume) if sortie else None
+    detecteur = compiler_mots_cles(mots_sensibles, mots_entiers)
+    etats = {}
+    for chemin, source in zip(chemins, sources):
+        sur_entite = partial(flux.entite, fichier=source) if flux else None
+        etats[chemin] = EtatAnalyse(sur_entite, conserver_alertes=not flux)
+    ordre = [etats[chemin] for chemin in chemins]
+    chronologie = []
+    fil = open(fil_chronologique, "w", encoding="utf-8") if fil_chronologique else None
+    try:
+        for epoch, indice, ligne_num, ligne in fusionner_logs(chemins):
+            etat = ordre[indice]
+            etat.lignes = ligne_num
+            if fil:
+                fil.write(f"{time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(epoch))} [{sources[indice]}] {ligne}\n")
+            for alerte in etat.traiter_ligne(ligne_num, ligne, detecteur):
+                alerte['fichier'] = sources[indice]
+                alerte['horodatage'] = epoch
+                if flux:
+                    flux(alerte)
+                else:
+                    chronologie.append(alerte)
+                afficheur(alerte)
+    finally:
+        afficheur.terminer()
+        if fil:
+            fil.close()
+
+    total = EtatAnalyse()
+    for etat in etats.values():
+        total.fusionner(etat)
+    resultats = total.resultats()
+
+    if flux:
+        flux.terminer(commun, total, fichiers=len(etats), erreurs=erreurs)
+    else:
+        sauvegarder_resultats_dossier(commun, etats, erreurs, rapport, chronologie)
+
+    print(f"\n{Colors.GREEN}✅ Fusion chronologique terminée!{Colors.ENDC}")
+    print(f"{Colors.CYAN}{'═' * 70}{Colors.ENDC}")
+    print(f"{Colors.BOLD}📊 STATISTIQUES:{Colors.ENDC}")
+    print(f"   • Fichiers fusionnés: {len(etats)}")
+    print(f"   • Fichiers en erreur: {len(erreurs)}")
+    print(f"   • Lignes analysées: {total.lignes}")
+    print(f"   • Emails trouvés: {len(resultats[0])}")
+    print(f"   • IPs trouvées: {len(resultats[1])}")
+    print(f"   • Heures trouvées: {len(resultats[2])}")
+    print(f"   • Dates trouvées: {len(resultats[3])}")
+    print(f"   • Liens trouvés: {len(resultats[4])}")
+    for categorie, valeurs in resultats.autres.items():
+        print(f"   • {REGISTRE_ENTITES[categorie].libelle}: {len(valeurs)}")
+    print(f"   • Alertes: {total.nombre_alertes}")
+    print(f"{Colors.CYAN}{'═' * 70}{Colors.ENDC}\n")
+    if fil_chronologique:
+        print(f"{Colors.GREEN}🕒 Chronologie fusionnée: {fil_chronologique}{Colors.ENDC}")
+    if flux:
+        print(f"{Colors.GREEN}💾 Résultats sauvegardés dans: {flux.chemin} (résumé: {flux.chemin_resume}){Colors.ENDC}\n")
+    else:
+        print(f"{Colors.GREEN}💾 Résultats sauvegardés dans: {rapport}{Colors.ENDC}\n")
+
+    return resultats
 
 # ============================================================================
 # SAUVEGARDE DES RÉSULTATS
 # ============================================================================
 
 def sauvegarder_resultats(chemin_source: str, emails: List[str], ips: List[str], 
-                          heures: List[str], dates: List[str],urls: List[str], alertes: List[dict]) -> None:
+                          heures: List[str], dates: List[str],urls: List[str], alertes: List[dict],
+                          fichier_sortie: str = FICHIER_SORTIE, autres: Dict[str, List[str]] = None,
+                          etapes: List[Etape] = None) -> None:
     """
     Sauvegarde les résultats de l'analyse dans un fichier
     
@@ -254,9 +5420,13 @@ def sauvegarder_resultats(chemin_source: str, emails: List[str], ips: List[str],
         heures: Liste des heures trouvées
         dates: Liste des dates trouvées
         alertes: Liste des alertes détectées
+        fichier_sortie: Chemin du rapport texte
+        autres: Valeurs des types supplémentaires du registre, par catégorie (optionnel)
+        etapes: Étapes de l'analyse, chacune écrivant sa section avant les alertes, à leur
+            place (gabarits) ou après, selon Etape.section (optionnel)
     """
     try:
-        with open(FICHIER_SORTIE, "w", encoding="utf-8") as f:
+        with open(fichier_sortie, "w", encoding="utf-8") as f:
             # En-tête
             f.write("=" * 80 + "\n")
             f.write("CYBER FORGE SCAN - RAPPORT D'ANALYSE DE LOG\n")
@@ -317,22 +5487,151 @@ def sauvegarder_resultats(chemin_source: str, emails: List[str], ips: List[str],
             else:
                 f.write("Aucun lien trouvé.\n")
             f.write("\n")
+
+            # Types supplémentaires du registre (IPv6, MAC, empreintes...)
+            for categorie, valeurs in (autres or {}).items():
+                type_entite = REGISTRE_ENTITES[categorie]
+                f.write(f"{type_entite.icone} {type_entite.libelle.upper()} ({len(valeurs)}):\n")
+                f.write("-" * 80 + "\n")
+                if valeurs:
+                    for i, valeur in enumerate(valeurs, 1):
+                        f.write(f"{i:3d}. {valeur}\n")
+                else:
+                    f.write("Aucune valeur trouvée.\n")
+                f.write("\n")
+            
+            etapes = etapes or []
+            for etape in etapes:
+                if etape.section == "avant":
+                    etape.ecrire_rapport(f)
+
+            # Alertes (regroupées par gabarit si demandé)
+            remplacantes = [etape for etape in etapes if etape.section == "alertes"]
+            for etape in remplacantes:
+                etape.ecrire_rapport(f)
+            if not remplacantes:
+                f.write(f"🚨 ALERTES DE SÉCURITÉ ({len(alertes)}):\n")
+                f.write("-" * 80 + "\n")
+                if alertes:
+                    for i, alerte in enumerate(alertes, 1):
+                        gravite = " [GRAVITÉ HAUTE]" if alerte.get('gravite') == GRAVITE_HAUTE else ""
+                        f.write(f"\n{i}. Ligne {alerte['ligne']} - Mot-clé: {alerte['mot_cle']}{gravite}\n")
+                        if alerte.get('indicateur'):
+                            liste = f" (liste: {alerte['liste']})" if alerte.get('liste') else ""
+                            f.write(f"   Indicateur: {alerte['indicateur']}{liste}\n")
+                        f.write(f"   Contenu: {alerte['contenu']}\n")
+                else:
+                    f.write("Aucune alerte détectée.\n")
+
+            for etape in etapes:
+                if etape.section == "apres":
+                    etape.ecrire_rapport(f)
+            
+            # Pied de page
+            f.write("\n" + "=" * 80 + "\n")
+            f.write("FIN DU RAPPORT\n")
+            f.write("=" * 80 + "\n")
             
-            # Alertes
-            f.write(f"🚨 ALERTES DE SÉCURITÉ ({len(alertes)}):\n")
+    except Exception as e:
+        print(f"{Colors.RED}✗ Erreur lors de la sauvegarde: {e}{Colors.ENDC}")
+
+
+def sauvegarder_resultats_dossier(dossier: str, etats: Dict[str, EtatAnalyse], erreurs: Dict[str, str],
+                                  fichier_sortie: str = FICHIER_SORTIE,
+                                  chronologie: List[dict] = None) -> None:
+    """
+    Sauvegarde le rapport fusionné de l'analyse d'un dossier
+
+    Chaque entité est suivie des fichiers où elle apparaît, et les alertes
+    sont regroupées par fichier.
+
+    Args:
+        dossier: Dossier analysé
+        etats: État de chaque fichier analysé
+        erreurs: Message d'erreur des fichiers illisibles
+        fichier_sortie: Chemin du rapport texte
+        chronologie: Alertes de logs fusionnés, dans l'ordre de leurs dates, listées à la
+            place des alertes par fichier (optionnel)
+    """
+    sections = [
+        ("📧 EMAILS TROUVÉS", "emails", "Aucun email trouvé."),
+        ("🌐 ADRESSES IP TROUVÉES", "ips", "Aucune adresse IP trouvée."),
+        ("🕐 HEURES TROUVÉES", "heures", "Aucune heure trouvée."),
+        ("📅 DATES TROUVÉES", "dates", "Aucune date trouvée."),
+        ("🔗 LIENS TROUVÉS", "urls", "Aucun lien trouvé."),
+    ]
+    for categorie in dict.fromkeys(c for etat in etats.values() for c in etat.autres):
+        type_entite = REGISTRE_ENTITES[categorie]
+        sections.append((f"{type_entite.icone} {type_entite.libelle.upper()}", categorie, "Aucune valeur trouvée."))
+    try:
+        with open(fichier_sortie, "w", encoding="utf-8") as f:
+            # En-tête
+            f.write("=" * 80 + "\n")
+            if chronologie is None:
+                f.write("CYBER FORGE SCAN - RAPPORT D'ANALYSE DE DOSSIER\n")
+            else:
+                f.write("CYBER FORGE SCAN - RAPPORT DE CHRONOLOGIE FUSIONNÉE\n")
+            f.write("=" * 80 + "\n\n")
+
+            f.write(f"📂 Dossier analysé: {dossier}\n")
+            f.write(f"📅 Date d'analyse: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+            f.write(f"📊 Fichiers analysés: {len(etats)} ({len(erreurs)} en erreur)\n")
+            f.write("\n" + "-" * 80 + "\n\n")
+
+            # Fichiers
+            f.write(f"🗂️ FICHIERS ({len(etats)}):\n")
             f.write("-" * 80 + "\n")
-            if alertes:
-                for i, alerte in enumerate(alertes, 1):
-                    f.write(f"\n{i}. Ligne {alerte['ligne']} - Mot-clé: {alerte['mot_cle']}\n")
-                    f.write(f"   Contenu: {alerte['contenu']}\n")
+            for i, (chemin, etat) in enumerate(etats.items(), 1):
+                f.write(f"{i:3d}. {chemin} - {etat.lignes} lignes, {len(etat.alertes)} alertes\n")
+            for chemin, erreur in erreurs.items():
+                f.write(f"  ✗ {chemin} - {erreur}\n")
+            f.write("\n")
+
+            # Entités avec attribution par fichier
+            for titre, attribut, vide in sections:
+                provenance: Dict[str, List[str]] = {}
+                for chemin, etat in etats.items():
+                    valeurs = getattr(etat, attribut) if attribut in CATEGORIES_ENTITES else etat.autres.get(attribut, ())
+                    for valeur in valeurs:
+                        provenance.setdefault(valeur, []).append(chemin)
+                f.write(f"{titre} ({len(provenance)}):\n")
+                f.write("-" * 80 + "\n")
+                if provenance:
+                    for i, valeur in enumerate(sorted(provenance), 1):
+                        fichiers = provenance[valeur]
+                        noms = ", ".join(os.path.relpath(c, dossier) for c in fichiers[:3])
+                        if len(fichiers) > 3:
+                            noms += f" (+{len(fichiers) - 3})"
+                        f.write(f"{i:3d}. {valeur}  [{noms}]\n")
+                else:
+                    f.write(vide + "\n")
+                f.write("\n")
+
+            # Alertes par fichier, ou dans l'ordre chronologique des logs fusionnés
+            total = sum(len(etat.alertes) for etat in etats.values())
+            f.write(f"🚨 ALERTES DE SÉCURITÉ ({total}):\n")
+            f.write("-" * 80 + "\n")
+            if total and chronologie is not None:
+                for i, alerte in enumerate(chronologie, 1):
+                    moment = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(alerte['horodatage']))
+                    f.write(f"  {i}. {moment} {alerte['fichier']}:{alerte['ligne']} - Mot-clé: {alerte['mot_cle']}\n")
+                    f.write(f"     Contenu: {alerte['contenu']}\n")
+            elif total:
+                for chemin, etat in etats.items():
+                    if not etat.alertes:
+                        continue
+                    f.write(f"\n📄 {chemin} ({len(etat.alertes)}):\n")
+                    for i, alerte in enumerate(etat.alertes, 1):
+                        f.write(f"  {i}. Ligne {alerte['ligne']} - Mot-clé: {alerte['mot_cle']}\n")
+                        f.write(f"     Contenu: {alerte['contenu']}\n")
             else:
                 f.write("Aucune alerte détectée.\n")
-            
+
             # Pied de page
             f.write("\n" + "=" * 80 + "\n")
             f.write("FIN DU RAPPORT\n")
             f.write("=" * 80 + "\n")
-            
+
     except Exception as e:
         print(f"{Colors.RED}✗ Erreur lors de la sauvegarde: {e}{Colors.ENDC}")
 
@@ -340,7 +5639,8 @@ def sauvegarder_resultats(chemin_source: str, emails: List[str], ips: List[str],
 # FONCTION D'AFFICHAGE
 # ============================================================================
 
-def afficher(emails: List[str], ips: List[str], heures: List[str], dates: List[str],urls: List[str], fichier: str = None) -> None:
+def afficher(emails: List[str], ips: List[str], heures: List[str], dates: List[str],urls: List[str], fichier: str = None,
+             autres: Dict[str, List[str]] = None) -> None:
     """
     Affiche les résultats de l'analyse de manière formatée
     
@@ -350,6 +5650,8 @@ def afficher(emails: List[str], ips: List[str], heures: List[str], dates: List[s
         heures: Liste des heures trouvées
         dates: Liste des dates trouvées
         fichier: Nom du fichier analysé (optionnel)
+        autres: Valeurs des types supplémentaires du registre, par catégorie
+            (attribut autres des résultats d'analyse, optionnel)
     """
     print(f"{Colors.GREEN}{Colors.BOLD}")
     print("╔══════════════════════════════════════════════════════════╗")
@@ -426,6 +5728,17 @@ def afficher(emails: List[str], ips: List[str], heures: List[str], dates: List[s
             print(f"   {i:2d}. {url}")
     else:
         print(f"{Colors.YELLOW}📅 Aucune lien trouvé trouvée{Colors.ENDC}")
+    print()
+
+    # Types supplémentaires du registre (IPv6, MAC, empreintes...)
+    autres = autres or {}
+    for categorie, valeurs in autres.items():
+        type_entite = REGISTRE_ENTITES[categorie]
+        if valeurs:
+            print(f"{Colors.GREEN}{type_entite.icone} {type_entite.libelle} ({len(valeurs)}):{Colors.ENDC}")
+            for i, valeur in enumerate(valeurs, 1):
+                print(f"   {i:2d}. {valeur}")
+            print()
     
     # Résumé final
     print(f"{Colors.BOLD}{Colors.GREEN}{'✅' * 35}")
@@ -435,6 +5748,8 @@ def afficher(emails: List[str], ips: List[str], heures: List[str], dates: List[s
     print(f"  • Heures trouvées: {len(heures)}")
     print(f"  • Dates trouvées: {len(dates)}")
     print(f"  • Liens trouvés: {len(urls)}")
+    for categorie, valeurs in autres.items():
+        print(f"  • {REGISTRE_ENTITES[categorie].libelle}: {len(valeurs)}")
     print(f"{'✅' * 35}{Colors.ENDC}\n")
 
 # ============================================================================
@@ -462,11 +5777,12 @@ def main():
     chemin = chemin.strip('"').strip("'")
     
     # Analyse du fichier
-    emails, ips, heures, dates, urls = analyser_fichier_log(chemin)
+    resultats = analyser_fichier_log(chemin)
+    emails, ips, heures, dates, urls = resultats
     
     # Affichage des résultats
-    if emails or ips or heures or dates or urls:
-        afficher(emails, ips, heures, dates, urls)
+    if emails or ips or heures or dates or urls or any(resultats.autres.values()):
+        afficher(emails, ips, heures, dates, urls, autres=resultats.autres)
     else:
         print(f"{Colors.YELLOW}⚠ Aucune donnée extraite du fichier{Colors.ENDC}")
 
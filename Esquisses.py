@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Esquisses probabilistes à mémoire bornée - CYBER FORGE SCAN
+Comptage approximatif des valeurs distinctes et des valeurs les plus fréquentes,
+quelle que soit la taille des logs analysés
+"""
+
+import base64
+import hashlib
+import math
+from typing import Dict, List, Optional, Tuple
+
+__all__ = [
+    "HyperLogLog",
+    "SpaceSaving",
+    "TDigest",
+]
+
+# ============================================================================
+# HACHAGE
+# ============================================================================
+
+def _hachage64(valeur: str) -> int:
+    """
+    Hachage 64 bits stable d'une chaîne
+
+    hash() est salé à chaque lancement de Python: il ne permettrait pas de
+    fusionner des esquisses produites par des processus ou des exécutions différents.
+    """
+    return int.from_bytes(hashlib.blake2b(valeur.encode("utf-8", "surrogatepass"), digest_size=8).digest(), "little")
+
+# ============================================================================
+# HYPERLOGLOG (NOMBRE DE VALEURS DISTINCTES)
+# ============================================================================
+
+class HyperLogLog:
+    """
+    Estimation du nombre de valeurs distinctes en mémoire fixe
+
+    Avec la précision par défaut (14), 16 Ko de registres et une erreur
+    relative typique de 0,8 %, que le flux contienne mille ou un milliard de valeurs.
+    """
+
+    def __init__(self, precision: int = 14):
+        """
+        Args:
+            precision: Nombre de bits d'index (4 à 18), soit 2**precision registres d'un octet
+        """
+        if not 4 <= precision <= 18:
+            raise ValueError(f"Précision hors limites: {precision} (4 à 18)")
+        self.precision = precision
+        self.registres = bytearray(1 << precision)
+
+    def ajouter(self, valeur: str) -> None:
+        """Enregistre une valeur (les doublons ne changent pas l'estimation)"""
+        h = _hachage64(valeur)
+        bits = 64 - self.precision
+        index = h >> bits
+        reste = h & ((1 << bits) - 1)
+        # Rang du premier bit à 1 dans les bits restants
+        rang = bits - reste.bit_length() + 1
+        if rang > self.registres[index]:
+            self.registres[index] = rang
+
+    def estimation(self) -> int:
+        """Nombre estimé de valeurs distinctes"""
+        m = len(self.registres)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimation = alpha * m * m / sum(2.0 ** -r for r in self.registres)
+        vides = self.registres.count(0)
+        if estimation <= 2.5 * m and vides:
+            # Petites cardinalités: comptage linéaire, plus précis
+            estimation = m * math.log(m / vides)
+        return round(estimation)
+
+    def fusionner(self, autre: "HyperLogLog") -> None:
+        """Ajoute les valeurs vues par une autre esquisse de même précision"""
+        if autre.precision != self.precision:
+            raise ValueError(f"Précisions différentes: {self.precision} et {autre.precision}")
+        self.registres = bytearray(map(max, self.registres, autre.registres))
+
+    def vers_dict(self) -> dict:
+        """Représentation sérialisable en JSON"""
+        return {'precision': self.precision, 'registres': base64.b64encode(bytes(self.registres)).decode("ascii")}
+
+    @classmethod
+    def depuis_dict(cls, donnees: dict) -> "HyperLogLog":
+        """Reconstruit une esquisse à partir de vers_dict()"""
+        esquisse = cls(donnees['precision'])
+        esquisse.registres = bytearray(base64.b64decode(donnees['registres']))
+        return esquisse
+
+# ============================================================================
+# SPACE-SAVING (VALEURS LES PLUS FRÉQUENTES)
+# ============================================================================
+
+class SpaceSaving:
+    """
+    Suivi des k valeurs les plus fréquentes d'un flux (algorithme Space-Saving)
+
+    Au plus k compteurs: une valeur nouvelle remplace la moins comptée et hérite
+    de son compte comme marge d'erreur. Toute valeur plus fréquente que total/k
+    est garantie d'être suivie. Les compteurs sont rangés par compte (paniers),
+    ce qui rend chaque ajout en temps constant.
+    """
+
+    def __init__(self, k: int = 100):
+        """
+        Args:
+            k: Nombre de compteurs (valeurs suivies)
+        """
+        if k < 1:
+            raise ValueError(f"k doit être positif: {k}")
+        self.k = k
+        self.total = 0
+        self.comptes: Dict[str, int] = {}
+        self.erreurs: Dict[str, int] = {}
+        self._paniers: Dict[int, Dict[str, None]] = {}
+        self._minimum = 0
+
+    def _deplacer(self, valeur: str, ancien: int, nouveau: int) -> None:
+        """Change une valeur de panier et tient à jour le plus petit compte"""
+        if ancien:
+            panier = self._paniers[ancien]
+            del panier[valeur]
+            if not panier:
+                del self._paniers[ancien]
+                if ancien == self._minimum:
+                    # Incréments unitaires: le nouveau minimum est ancien + 1
+                    self._minimum = nouveau
+        self._paniers.setdefault(nouveau, {})[valeur] = None
+        self.comptes[valeur] = nouveau
+
+    def ajouter(self, valeur: str) -> None:
+        """Compte une occurrence d'une valeur"""
+        self.total += 1
+        compte = self.comptes.get(valeur)
+        if compte is not None:
+            self._deplacer(valeur, compte, compte + 1)
+        elif len(self.comptes) < self.k:
+            self.erreurs[valeur] = 0
+            self._deplacer(valeur, 0, 1)
+            self._minimum = 1
+        else:
+            # Remplacement d'une valeur parmi les moins comptées
+            minimum = self._minimum
+            panier = self._paniers[minimum]
+            evincee = next(iter(panier))
+            del panier[evincee]
+            del self.comptes[evincee]
+            del self.erreurs[evincee]
+            if not panier:
+                del self._paniers[minimum]
+                self._minimum = minimum + 1
+            self.erreurs[valeur] = minimum
+            self._deplacer(valeur, 0, minimum + 1)
+
+    def plus_frequents(self, n: int = None) -> List[Tuple[str, int, int]]:
+        """
+        Valeurs suivies par compte décroissant
+
+        Args:
+            n: Nombre de valeurs renvoyées (toutes par défaut)
+
+        Returns:
+            Liste de (valeur, compte estimé, erreur maximale); le compte réel
+            est compris entre compte - erreur et compte
+        """
+        classement = sorted(self.comptes.items(), key=lambda x: (-x[1], x[0]))
+        return [(valeur, compte, self.erreurs[valeur]) for valeur, compte in classement[:n]]
+
+    def fusionner(self, autre: "SpaceSaving") -> None:
+        """
+        Ajoute les comptes d'une autre esquisse (plage ou exécution différente)
+
+        Une valeur absente d'une esquisse pleine y a pu être comptée jusqu'à son
+        plus petit compte: ce minimum est ajouté au compte et à l'erreur.
+        """
+        min_self = self._minimum if len(self.comptes) >= self.k else 0
+        min_autre = autre._minimum if len(autre.comptes) >= autre.k else 0
+        fusion = []
+        for valeur in self.comptes.keys() | autre.comptes.keys():
+            compte = self.comptes.get(valeur, min_self) + autre.comptes.get(valeur, min_autre)
+            erreur = self.erreurs.get(valeur, min_self) + autre.erreurs.get(valeur, min_autre)
+            fusion.append((valeur, compte, erreur))
+        fusion.sort(key=lambda x: (-x[1], x[0]))
+        self.total += autre.total
+        self._reconstruire(fusion[:self.k])
+
+    def _reconstruire(self, entrees: List[Tuple[str, int, int]]) -> None:
+        """Remplace les compteurs par une liste de (valeur, compte, erreur)"""
+        self.comptes = {}
+        self.erreurs = {}
+        self._paniers = {}
+        for valeur, compte, erreur in entrees:
+            self.comptes[valeur] = compte
+            self.erreurs[valeur] = erreur
+            self._paniers.setdefault(compte, {})[valeur] = None
+        self._minimum = min(self._paniers) if self._paniers else 0
+
+    def vers_dict(self) -> dict:
+        """Représentation sérialisable en JSON"""
+        return {'k': self.k, 'total': self.total, 'compteurs': self.plus_frequents()}
+
+    @classmethod
+    def depuis_dict(cls, donnees: dict) -> "SpaceSaving":
+        """Reconstruit une esquisse à partir de vers_dict()"""
+        esquisse = cls(donnees['k'])
+        esquisse.total = donnees['total']
+        esquisse._reconstruire([tuple(entree) for entree in donnees['compteurs']])
+        return esquisse
+
+# ============================================================================
+# T-DIGEST (QUANTILES)
+# ============================================================================
+
+class TDigest:
+    """
+    Estimation des quantiles d'un flux de valeurs (t-digest à fusion)
+
+    Les valeurs sont résumées par des centroïdes (moyenne, poids), petits aux
+    extrémités et gros au centre: les percentiles élevés (p95, p99) restent précis
+    avec quelques centaines de centroïdes au plus, quelle que soit la taille du flux.
+    Deux esquisses se fusionnent, par exemple celles de plages analysées en parallèle.
+    """
+
+    def __init__(self, compression: int = 100):
+        """
+        Args:
+            compression: Nombre de centroïdes visé (précision contre mémoire)
+        """
+        if compression < 10:
+            raise ValueError(f"Compression trop faible: {compression} (10 minimum)")
+        self.compression = compression
+        self.nombre = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self._centroides: List[Tuple[float, float]] = []
+        self._tampon: List[Tuple[float, float]] = []
+        self._inverse = False
+
+    def ajouter(self, valeur: float, poids: float = 1.0) -> None:
+        """Enregistre une valeur (ou un poids de valeurs identiques)"""
+        self._tampon.append((valeur, poids))
+        self.nombre += poids
+        if valeur < self.minimum:
+            self.minimum = valeur
+        if valeur > self.maximum:
+            self.maximum = valeur
+        if len(self._tampon) >= 5 * self.compression:
+            self._compresser()
+
+    def _limite(self, q: float) -> float:
+        """Rang (entre 0 et 1) au-delà duquel un centroïde commencé au rang q est complet"""
+        # Fonction d'échelle k1: k(q) = compression / 2π · asin(2q - 1)
+        k = self.compression / (2 * math.pi) * math.asin(2 * q - 1) + 1
+        if k >= self.compression / 4:
+            return 1.0
+        return (math.sin(2 * math.pi * k / self.compression) + 1) / 2
+
+    def _compresser(self) -> None:
+        """Fusionne le tampon avec les centroïdes en respectant la fonction d'échelle"""
+        if not self._tampon:
+            return
+        # Sens de fusion alterné: aucune des deux queues n'accumule de gros centroïdes
+        self._inverse = not self._inverse
+        points = sorted(self._centroides + self._tampon, reverse=self._inverse)
+        self._tampon = []
+        total = self.nombre
+        centroides = []
+        moyenne, poids = points[0]
+        cumul = 0.0
+        limite = self._limite(0.0)
+        for valeur, p in points[1:]:
+            if (cumul + poids + p) / total <= limite:
+                poids += p
+                moyenne += (valeur - moyenne) * p / poids
+            else:
+                centroides.append((moyenne, poids))
+                cumul += poids
+                limite = self._limite(cumul / total)
+                moyenne, poids = valeur, p
+        centroides.append((moyenne, poids))
+        if self._inverse:
+            centroides.reverse()
+        self._centroides = centroides
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Valeur estimée au rang q (0.5 = médiane, 0.99 = p99)
+
+        Returns:
+            Valeur interpolée entre centroïdes, None si l'esquisse est vide
+        """
+        self._compresser()
+        if not self._centroides:
+            return None
+        if q <= 0:
+            return self.minimum
+        if q >= 1:
+            return self.maximum
+        cible = q * self.nombre
+        centroides = self._centroides
+        # Chaque centroïde est centré sur son rang cumulé; interpolation entre centres voisins
+        precedent_moyenne, precedent_centre = self.minimum, 0.0
+        cumul = 0.0
+        for moyenne, poids in centroides:
+            centre = cumul + poids / 2
+            if cible < centre:
+                part = (cible - precedent_centre) / (centre - precedent_centre) if centre > precedent_centre else 0
+                return precedent_moyenne + part * (moyenne - precedent_moyenne)
+            precedent_moyenne, precedent_centre = moyenne, centre
+            cumul += poids
+        part = (cible - precedent_centre) / (self.nombre - precedent_centre) if self.nombre > precedent_centre else 0
+        return precedent_moyenne + part * (self.maximum - precedent_moyenne)
+
+    def fusionner(self, autre: "TDigest") -> None:
+        """Ajoute les valeurs résumées par une autre esquisse"""
+        if not autre.nombre:
+            return
+        autre._compresser()
+        self._compresser()
+        self._tampon = list(autre._centroides)
+        self.nombre += autre.nombre
+        self.minimum = min(self.minimum, autre.minimum)
+        self.maximum = max(self.maximum, autre.maximum)
+        self._compresser()
+
+    def vers_dict(self) -> dict:
+        """Représentation sérialisable en JSON"""
+        self._compresser()
+        return {'compression': self.compression, 'nombre': self.nombre,
+                'minimum': self.minimum if self.nombre else None,
+                'maximum': self.maximum if self.nombre else None,
+                'centroides': self._centroides}
+
+    @classmethod
+    def depuis_dict(cls, donnees: dict) -> "TDigest":
+        """Reconstruit une esquisse à partir de vers_dict()"""
+        esquisse = cls(donnees['compression'])
+        esquisse.nombre = donnees['nombre']
+        if esquisse.nombre:
+            esquisse.minimum = donnees['minimum']
+            esquisse.maximum = donnees['maximum']
+        esquisse._centroides = [tuple(centroide) for centroide in donnees['centroides']]
+        return esquisse
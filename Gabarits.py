@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Extraction de gabarits de lignes de log (arbre de profondeur fixe, à la Drain) - CYBER FORGE SCAN
+Regroupe des millions de lignes presque identiques en quelques gabarits à champs variables
+"""
+
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+__all__ = [
+    "Gabarit",
+    "MineurGabarits",
+    "VARIABLE",
+]
+
+# Jeton des champs variables d'un gabarit
+VARIABLE = "<*>"
+
+# Jetons remplacés par VARIABLE avant tout découpage: ceux qui contiennent un chiffre
+# (adresses IP et ports, PID, nombres, identifiants hexadécimaux, dates et heures).
+# Le regard arrière n'essaie le motif qu'en début de jeton.
+RE_VARIABLES = re.compile(r"(?<!\S)(?=\S*\d)\S+")
+
+# Lignes masquées gardées en cache avant réinitialisation (mémoire bornée)
+TAILLE_CACHE = 100_000
+
+# ============================================================================
+# GABARIT
+# ============================================================================
+
+class Gabarit:
+    """Groupe de lignes de même forme: jetons fixes et champs variables"""
+
+    __slots__ = ("identifiant", "jetons", "chemin", "nombre", "premiere_ligne", "exemple", "mots_cles")
+
+    def __init__(self, identifiant: int, jetons: List[str], chemin: tuple = (),
+                 premiere_ligne: int = 0, exemple: str = ""):
+        """
+        Args:
+            identifiant: Numéro du gabarit, dans l'ordre de création
+            jetons: Jetons de la première ligne (déjà masquée)
+            chemin: Jetons de tête qui ont conduit à sa feuille dans l'arbre
+            premiere_ligne: Numéro de la première ligne du groupe
+            exemple: Première ligne du groupe, telle quelle
+        """
+        self.identifiant = identifiant
+        self.jetons = jetons
+        self.chemin = chemin
+        self.nombre = 0
+        self.premiere_ligne = premiere_ligne
+        self.exemple = exemple
+        self.mots_cles: Counter = Counter()
+
+    @property
+    def texte(self) -> str:
+        """Gabarit lisible, champs variables notés <*>"""
+        return " ".join(self.jetons)
+
+    def similarite(self, jetons: List[str]) -> float:
+        """Part des jetons fixes du gabarit retrouvés à la même place (même longueur supposée)"""
+        egaux = 0
+        for a, b in zip(self.jetons, jetons):
+            if a == b and a != VARIABLE:
+                egaux += 1
+        return egaux / len(jetons) if jetons else 1.0
+
+    def generaliser(self, jetons: List[str]) -> None:
+        """Remplace par VARIABLE les jetons qui diffèrent de ceux d'une nouvelle ligne"""
+        if self.jetons != jetons:
+            self.jetons = [a if a == b else VARIABLE for a, b in zip(self.jetons, jetons)]
+
+    def vers_dict(self) -> dict:
+        """Représentation sérialisable en JSON"""
+        return {
+            'gabarit': self.texte,
+            'nombre': self.nombre,
+            'premiere_ligne': self.premiere_ligne,
+            'exemple': self.exemple,
+            'mots_cles': dict(self.mots_cles.most_common()),
+        }
+
+# ============================================================================
+# ARBRE DE PROFONDEUR FIXE
+# ============================================================================
+
+class MineurGabarits:
+    """
+    Regroupement en ligne de lignes de log en gabarits (algorithme Drain)
+
+    Une ligne est masquée (IP, nombres...), découpée en jetons, puis routée dans
+    un arbre de profondeur fixe: nombre de jetons, puis premiers jetons. La feuille
+    contient quelques gabarits: la ligne rejoint le plus semblable au-delà du seuil,
+    qui se généralise, ou en crée un nouveau. Un cache des lignes masquées déjà vues
+    évite le parcours pour les répétitions exactes. La mémoire dépend du nombre de
+    gabarits, et non du nombre de lignes.
+    """
+
+    def __init__(self, profondeur: int = 4, seuil: float = 0.4, max_enfants: int = 100):
+        """
+        Args:
+            profondeur: Profondeur de l'arbre (3 minimum): longueur, puis profondeur - 2 premiers jetons
+            seuil: Similarité minimale pour rejoindre un gabarit existant (0 à 1)
+            max_enfants: Enfants par nœud au-delà desquels les jetons inconnus passent par <*>
+        """
+        if profondeur < 3:
+            raise ValueError(f"Profondeur trop faible: {profondeur} (3 minimum)")
+        self.profondeur = profondeur
+        self.seuil = seuil
+        self.max_enfants = max_enfants
+        self.gabarits: List[Gabarit] = []
+        self.lignes = 0
+        self._racine: Dict[int, dict] = {}
+        self._cache: Dict[str, Gabarit] = {}
+
+    def ajouter(self, ligne: str, ligne_num: int = 0, mots_cles: Iterable[str] = (),
+                nombre: int = 1) -> Gabarit:
+        """
+        Range une ligne dans son gabarit
+
+        Args:
+            ligne: Contenu de la ligne
+            ligne_num: Numéro de la ligne (retenu pour la première du gabarit)
+            mots_cles: Mots-clés sensibles relevés sur la ligne
+            nombre: Nombre d'occurrences représentées (fusion de mineurs)
+
+        Returns:
+            Gabarit de la ligne
+        """
+        self.lignes += nombre
+        masquee = RE_VARIABLES.sub(VARIABLE, ligne)
+        gabarit = self._cache.get(masquee)
+        if gabarit is None:
+            gabarit = self._ranger(masquee.split(), ligne_num, ligne)
+            if len(self._cache) >= TAILLE_CACHE:
+                self._cache.clear()
+            self._cache[masquee] = gabarit
+        gabarit.nombre += nombre
+        if mots_cles:
+            gabarit.mots_cles.update(mots_cles)
+        return gabarit
+
+    def _ranger(self, jetons: List[str], ligne_num: int, ligne: str) -> Gabarit:
+        """Parcourt l'arbre et renvoie le gabarit existant ou nouveau de ces jetons"""
+        feuille, chemin = self._feuille(jetons)
+        meilleur, meilleure_similarite = None, -1.0
+        for gabarit in feuille:
+            similarite = gabarit.similarite(jetons)
+            if similarite > meilleure_similarite:
+                meilleur, meilleure_similarite = gabarit, similarite
+        if meilleur is not None and meilleure_similarite >= self.seuil:
+            meilleur.generaliser(jetons)
+            return meilleur
+        gabarit = Gabarit(len(self.gabarits), jetons, chemin, ligne_num, ligne[:100])
+        self.gabarits.append(gabarit)
+        feuille.append(gabarit)
+        return gabarit
+
+    def _feuille(self, jetons: List[str]) -> Tuple[List[Gabarit], tuple]:
+        """Gabarits de la feuille atteinte par ces jetons (créée au besoin) et jetons de tête suivis"""
+        noeud = self._racine.setdefault(len(jetons), {})
+        niveaux = min(self.profondeur - 2, len(jetons))
+        chemin = tuple(jetons[:niveaux])
+        for i in range(niveaux):
+            jeton = jetons[i]
+            derniere = i == niveaux - 1
+            suivant = noeud.get(jeton)
+            if suivant is None:
+                if jeton != VARIABLE and len(noeud) >= self.max_enfants:
+                    # Nœud saturé: les jetons inconnus partagent la branche <*>
+                    jeton = VARIABLE
+                    suivant = noeud.get(jeton)
+                if suivant is None:
+                    suivant = noeud[jeton] = [] if derniere else {}
+            noeud = suivant
+        if isinstance(noeud, dict):
+            # Ligne vide ou plus courte que l'arbre: feuille sous la clé None
+            noeud = noeud.setdefault(None, [])
+        return noeud, chemin
+
+    def fusionner(self, autre: "MineurGabarits") -> None:
+        """Ajoute les gabarits d'un autre mineur (plage suivante ou exécution différente)"""
+        for gabarit in autre.gabarits:
+            # Routage par les jetons de tête d'origine, que le gabarit a pu généraliser depuis
+            jetons = list(gabarit.chemin) + gabarit.jetons[len(gabarit.chemin):]
+            cible = self._ranger(jetons, gabarit.premiere_ligne, gabarit.exemple)
+            cible.generaliser(gabarit.jetons)
+            cible.nombre += gabarit.nombre
+            cible.mots_cles.update(gabarit.mots_cles)
+        self.lignes += autre.lignes
+        self._cache.clear()
+
+    def decaler_lignes(self, decalage: int) -> None:
+        """Ajoute un décalage aux numéros de première ligne (plage située plus loin dans le fichier)"""
+        for gabarit in self.gabarits:
+            gabarit.premiere_ligne += decalage
+
+    def plus_frequents(self, n: Optional[int] = None) -> List[Gabarit]:
+        """Gabarits par nombre de lignes décroissant (puis ordre d'apparition)"""
+        return sorted(self.gabarits, key=lambda g: (-g.nombre, g.identifiant))[:n]
+
+    def vers_dict(self, n: Optional[int] = None) -> dict:
+        """Représentation sérialisable en JSON des n gabarits les plus fréquents"""
+        return {
+            'lignes': self.lignes,
+            'gabarits': len(self.gabarits),
+            'plus_frequents': [g.vers_dict() for g in self.plus_frequents(n)],
+        }
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Listes locales d'indicateurs de compromission (IOC) - CYBER FORGE SCAN
+Recherche compacte d'IP (plages CIDR), de domaines et d'empreintes d'URL dans
+des listes de blocage de plusieurs millions d'entrées, hors ligne
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+from array import array
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+
+__all__ = [
+    "FICHIER_CACHE_IOC",
+    "ListesIOC",
+]
+
+# Cache binaire par défaut des listes compilées
+FICHIER_CACHE_IOC = "listes_ioc.cache"
+
+# Signature et version du format du cache
+MAGIQUE_CACHE = b"CFSIOC1\n"
+
+# Adresses des fichiers hosts de blocage ("0.0.0.0 domaine.malveillant")
+ADRESSES_HOSTS = {"0.0.0.0", "127.0.0.1", "::", "::1"}
+
+# Commentaire: "#" en début de ligne ou après une espace (pas le fragment d'une URL)
+RE_COMMENTAIRE = re.compile(r"(?:^|\s)#.*")
+
+# Adresse IPv4 ou plage CIDR, convertie sans le module ipaddress (dix fois plus rapide)
+RE_IPV4_CIDR = re.compile(r"(\d{1,3})\.(\d{1,3})\.(\d{1,3})\.(\d{1,3})(?:/(\d{1,2}))?")
+
+# Empreinte SHA-256 d'une URL (format des listes de type URLhaus)
+RE_EMPREINTE = re.compile(r"[0-9a-fA-F]{64}")
+RE_DOMAINE = re.compile(r"(?:[a-z0-9_](?:[a-z0-9_-]{0,61}[a-z0-9])?\.)+[a-z][a-z0-9-]{0,62}")
+
+# Résultats de recherche gardés en mémoire avant réinitialisation (mémoire bornée)
+TAILLE_MEMO = 100_000
+
+# Listes déjà chargées dans ce processus, par chemin absolu du cache (une lecture par worker)
+_LISTES_PROCESSUS: Dict[str, "ListesIOC"] = {}
+
+
+def _cle_domaine(domaine: str) -> int:
+    """Clé de 64 bits d'un domaine (collision improbable: 2^-64 par paire)"""
+    return int.from_bytes(hashlib.blake2b(domaine.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def _cle_url(url: str) -> int:
+    """64 premiers bits du SHA-256 d'une URL, ceux d'une empreinte de liste"""
+    return int.from_bytes(hashlib.sha256(url.encode("utf-8")).digest()[:8], "big")
+
+
+def _cle_empreinte(empreinte: str) -> int:
+    """64 premiers bits d'une empreinte SHA-256 hexadécimale"""
+    return int(empreinte[:16], 16)
+
+# ============================================================================
+# LISTES COMPILÉES
+# ============================================================================
+
+class ListesIOC:
+    """
+    Listes de blocage compilées en tableaux triés
+
+    Les plages IPv4 (adresses seules et CIDR) sont fusionnées en intervalles
+    disjoints: deux tableaux d'entiers de 32 bits (débuts, fins) et une recherche
+    dichotomique. Domaines et URL sont réduits à des clés de 64 bits triées,
+    8 octets par entrée au lieu d'une chaîne dans un ensemble. Un domaine listé
+    couvre ses sous-domaines. Chaque entrée retient la liste dont elle provient.
+    """
+
+    def __init__(self):
+        self.listes: List[str] = []
+        self.ip_debuts = array("I")
+        self.ip_fins = array("I")
+        self.ip_listes = array("H")
+        self.domaines = array("Q")
+        self.domaines_listes = array("H")
+        self.urls = array("Q")
+        self.urls_listes = array("H")
+        self.ignorees = 0
+        self.signature: list = []
+        # Cache binaire d'où proviennent les tableaux (None = listes compilées sans cache)
+        self.cache: Optional[str] = None
+        self._memo: Dict[Tuple[str, str], Optional[str]] = {}
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def fichiers_listes(chemins: Iterable[str]) -> List[str]:
+        """Fichiers de listes désignés par des chemins de fichiers ou de dossiers (non récursif)"""
+        fichiers = []
+        for chemin in chemins:
+            if os.path.isdir(chemin):
+                fichiers.extend(sorted(os.path.join(chemin, nom) for nom in os.listdir(chemin)
+                                       if os.path.isfile(os.path.join(chemin, nom))))
+            else:
+                fichiers.append(chemin)
+        return [os.path.abspath(fichier) for fichier in fichiers]
+
+    @staticmethod
+    def _signature(fichiers: List[str]) -> list:
+        """Chemin, taille et date de modification de chaque liste (validité du cache)"""
+        signature = []
+        for fichier in fichiers:
+            infos = os.stat(fichier)
+            signature.append([fichier, infos.st_size, infos.st_mtime_ns])
+        return signature
+
+    @classmethod
+    def ouvrir(cls, chemins: Iterable[str], cache: Optional[str] = FICHIER_CACHE_IOC) -> "ListesIOC":
+        """
+        Charge des listes depuis le cache binaire s'il correspond, sinon les compile et l'écrit
+
+        Args:
+            chemins: Fichiers de listes ou dossiers qui en contiennent
+            cache: Fichier du cache binaire (None = pas de cache)
+
+        Returns:
+            Listes compilées
+        """
+        fichiers = cls.fichiers_listes(chemins)
+        if cache:
+            # Un cache rangé dans le dossier des listes n'en fait pas partie
+            fichiers = [f for f in fichiers if f not in (os.path.abspath(cache), os.path.abspath(cache) + ".tmp")]
+        signature = cls._signature(fichiers)
+        if cache and os.path.exists(cache):
+            try:
+                listes = cls.depuis_cache(cache)
+                if listes.signature == signature:
+                    _LISTES_PROCESSUS[listes.cache] = listes
+                    return listes
+            except (OSError, ValueError, KeyError):
+                pass  # Cache illisible ou d'une autre version: recompiler
+        listes = cls.compiler(fichiers)
+        listes.signature = signature
+        if cache:
+            listes.ecrire_cache(cache)
+            listes.cache = os.path.abspath(cache)
+            _LISTES_PROCESSUS[listes.cache] = listes
+        return listes
+
+    @classmethod
+    def partagees(cls, cache: str, signature: list = None) -> "ListesIOC":
+        """
+        Listes d'un cache binaire, lues une seule fois par processus
+
+        Args:
+            cache: Fichier du cache binaire
+            signature: Signature attendue des listes (None = pas de contrôle)
+
+        Returns:
+            Listes compilées, communes à tous les états du processus
+        """
+        cache = os.path.abspath(cache)
+        listes = _LISTES_PROCESSUS.get(cache)
+        if listes is None or (signature is not None and listes.signature != signature):
+            listes = cls.depuis_cache(cache)
+            if signature is not None and listes.signature != signature:
+                raise ValueError(f"Cache IOC modifié depuis le chargement des listes: {cache}")
+            _LISTES_PROCESSUS[cache] = listes
+        return listes
+
+    @classmethod
+    def compiler(cls, fichiers: List[str]) -> "ListesIOC":
+        """
+        Lit des listes texte: une entrée par ligne, commentaires après "#"
+
+        Une entrée est une IP ou une plage CIDR, une empreinte SHA-256 d'URL, une URL,
+        ou un domaine (aussi au format hosts: "0.0.0.0 domaine"). Les entrées IPv6 et
+        illisibles sont comptées dans ignorees.
+        """
+        listes = cls()
+        plages, domaines, urls = [], [], []
+        for numero, fichier in enumerate(fichiers):
+            listes.listes.append(os.path.basename(fichier))
+            with open(fichier, "r", encoding="utf-8", errors="replace") as f:
+                for ligne in f:
+                    champs = (RE_COMMENTAIRE.sub("", ligne) if "#" in ligne else ligne).split()
+                    if not champs:
+                        continue
+                    entree = champs[1] if len(champs) > 1 and champs[0] in ADRESSES_HOSTS else champs[0]
+                    if not listes._ajouter(entree, numero, plages, domaines, urls):
+                        listes.ignorees += 1
+
+        # Intervalles triés puis fusionnés: disjoints, une seule dichotomie par recherche.
+        # Une plage qui en chevauche une autre lui est rattachée (liste de la première).
+        plages.sort()
+        for debut, fin, numero in plages:
+            if listes.ip_fins and (debut <= listes.ip_fins[-1] or
+                                   (debut == listes.ip_fins[-1] + 1 and numero == listes.ip_listes[-1])):
+                if fin > listes.ip_fins[-1]:
+                    listes.ip_fins[-1] = fin
+            else:
+                listes.ip_debuts.append(debut)
+                listes.ip_fins.append(fin)
+                listes.ip_listes.append(numero)
+        for cles, valeurs, numeros in ((domaines, listes.domaines, listes.domaines_listes),
+                                       (urls, listes.urls, listes.urls_listes)):
+            cles.sort()
+            precedente = None
+            for cle, numero in cles:
+                if cle != precedente:
+                    valeurs.append(cle)
+                    numeros.append(numero)
+                    precedente = cle
+        return listes
+
+    @staticmethod
+    def _ajouter(entree: str, numero: int, plages: list, domaines: list, urls: list) -> bool:
+        """Classe une entrée de liste; False si elle n'est pas exploitable"""
+        if "://" in entree:
+            urls.append((_cle_url(entree), numero))
+            return True
+        if len(entree) == 64 and RE_EMPREINTE.fullmatch(entree):
+            urls.append((_cle_empreinte(entree), numero))
+            return True
+        ipv4 = RE_IPV4_CIDR.fullmatch(entree)
+        if ipv4:
+            a, b, c, d, prefixe = ipv4.groups()
+            octets = (int(a), int(b), int(c), int(d))
+            prefixe = int(prefixe) if prefixe else 32
+            if max(octets) > 255 or prefixe > 32:
+                return False
+            adresse = (octets[0] << 24) | (octets[1] << 16) | (octets[2] << 8) | octets[3]
+            hote = (1 << (32 - prefixe)) - 1
+            plages.append((adresse & ~hote, adresse | hote, numero))
+            return True
+        if ":" in entree:
+            return False  # IPv6: les IP extraites des logs sont IPv4
+        domaine = entree.lower().strip(".")
+        if domaine.startswith("*."):
+            domaine = domaine[2:]
+        if RE_DOMAINE.fullmatch(domaine):
+            domaines.append((_cle_domaine(domaine), numero))
+            return True
+        return False
+
+    # ------------------------------------------------------------------
+    # Cache binaire
+    # ------------------------------------------------------------------
+
+    def _tableaux(self) -> List[Tuple[str, array]]:
+        return [("ip_debuts", self.ip_debuts), ("ip_fins", self.ip_fins), ("ip_listes", self.ip_listes),
+                ("domaines", self.domaines), ("domaines_listes", self.domaines_listes),
+                ("urls", self.urls), ("urls_listes", self.urls_listes)]
+
+    def ecrire_cache(self, chemin: str) -> None:
+        """Écrit les tableaux tels quels après un en-tête JSON (relecture sans analyse du texte)"""
+        entete = {
+            'ordre': sys.byteorder,
+            'signature': self.signature,
+            'listes': self.listes,
+            'ignorees': self.ignorees,
+            'tableaux': [[nom, tableau.typecode, tableau.itemsize, len(tableau)] for nom, tableau in self._tableaux()],
+        }
+        provisoire = chemin + ".tmp"
+        with open(provisoire, "wb") as f:
+            f.write(MAGIQUE_CACHE)
+            f.write(json.dumps(entete).encode("utf-8") + b"\n")
+            for _, tableau in self._tableaux():
+                tableau.tofile(f)
+        os.replace(provisoire, chemin)
+
+    @classmethod
+    def depuis_cache(cls, chemin: str) -> "ListesIOC":
+        """Relit un cache écrit par ecrire_cache (ValueError s'il est incompatible)"""
+        listes = cls()
+        with open(chemin, "rb") as f:
+            if f.readline() != MAGIQUE_CACHE:
+                raise ValueError(f"Cache IOC d'un autre format: {chemin}")
+            entete = json.loads(f.readline())
+            if entete['ordre'] != sys.byteorder:
+                raise ValueError(f"Cache IOC d'un autre ordre d'octets: {chemin}")
+            listes.signature = entete['signature']
+            listes.listes = entete['listes']
+            listes.ignorees = entete['ignorees']
+            tableaux = dict(listes._tableaux())
+            for nom, typecode, taille, nombre in entete['tableaux']:
+                tableau = tableaux[nom]
+                if tableau.typecode != typecode or tableau.itemsize != taille:
+                    raise ValueError(f"Cache IOC d'une autre plateforme: {chemin}")
+                tableau.fromfile(f, nombre)
+        listes.cache = os.path.abspath(chemin)
+        return listes
+
+    # ------------------------------------------------------------------
+    # Recherche
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.ip_debuts) + len(self.domaines) + len(self.urls)
+
+    def __getstate__(self) -> dict:
+        # Copie vers un processus du pool: le chemin du cache suffit, les tableaux
+        # sont relus une fois par processus (partagees). Sans cache, tout est copié.
+        if self.cache:
+            return {'cache': self.cache, 'signature': self.signature}
+        etat = self.__dict__.copy()
+        etat['_memo'] = {}
+        return etat
+
+    def __setstate__(self, etat: dict) -> None:
+        if set(etat) == {'cache', 'signature'}:
+            etat = ListesIOC.partagees(etat['cache'], etat['signature']).__dict__
+        self.__dict__.update(etat)
+        self._memo = {}
+
+    def _memoriser(self, cle: Tuple[str, str], liste: Optional[str]) -> Optional[str]:
+        if len(self._memo) >= TAILLE_MEMO:
+            self._memo.clear()
+        self._memo[cle] = liste
+        return liste
+
+    def verifier_ip(self, ip: str) -> Optional[str]:
+        """Nom de la liste contenant cette IPv4 (adresse seule ou dans une plage), sinon None"""
+        cle = ("ip", ip)
+        if cle in self._memo:
+            return self._memo[cle]
+        liste = None
+        if self.ip_debuts:
+            a, b, c, d = ip.split(".")
+            valeur = (int(a) << 24) | (int(b) << 16) | (int(c) << 8) | int(d)
+            i = bisect_right(self.ip_debuts, valeur) - 1
+            if i >= 0 and valeur <= self.ip_fins[i]:
+                liste = self.listes[self.ip_listes[i]]
+        return self._memoriser(cle, liste)
+
+    def verifier_domaine(self, domaine: str) -> Optional[str]:
+        """Nom de la liste contenant ce domaine ou l'un de ses domaines parents, sinon None"""
+        domaine = domaine.lower().rstrip(".")
+        cle = ("domaine", domaine)
+        if cle in self._memo:
+            return self._memo[cle]
+        liste = None
+        if self.domaines:
+            etiquettes = domaine.split(".")
+            # Du domaine complet au domaine de second niveau (le TLD seul n'est pas cherché)
+            for i in range(len(etiquettes) - 1):
+                cle_domaine = _cle_domaine(".".join(etiquettes[i:]))
+                j = bisect_right(self.domaines, cle_domaine) - 1
+                if j >= 0 and self.domaines[j] == cle_domaine:
+                    liste = self.listes[self.domaines_listes[j]]
+                    break
+        return self._memoriser(cle, liste)
+
+    def verifier_url(self, url: str) -> Optional[str]:
+        """Nom de la liste contenant l'empreinte SHA-256 de cette URL, sinon None"""
+        cle = ("url", url)
+        if cle in self._memo:
+            return self._memo[cle]
+        liste = None
+        if self.urls:
+            cle_url = _cle_url(url)
+            i = bisect_right(self.urls, cle_url) - 1
+            if i >= 0 and self.urls[i] == cle_url:
+                liste = self.listes[self.urls_listes[i]]
+        return self._memoriser(cle, liste)
+
+    def resume(self) -> dict:
+        """Nombre d'entrées par type (après fusion des plages et dédoublonnage)"""
+        return {
+            'listes': self.listes,
+            'plages_ip': len(self.ip_debuts),
+            'domaines': len(self.domaines),
+            'urls': len(self.urls),
+            'ignorees': self.ignorees,
+        }
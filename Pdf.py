@@ -105,22 +105,18 @@ def lire_txt(path: str) -> Optional[List[str]]:
     Returns:
         Liste de lignes ou None si erreur
     """
-    encodages = ["utf-8", "cp1252", "latin-1", "iso-8859-1"]
+    # Encodage choisi sur un échantillon, le fichier n'est lu qu'une fois
+    from Analyse import detecter_encodage, REPLI_LATIN1
     
-    for encodage in encodages:
-        try:
-            with open(path, "r", encoding=encodage) as f:
-                lines = [clean_text(line) for line in f if line.strip()]
-                print(f"✅ Fichier lu avec l'encodage: {encodage}")
-                return lines
-        except UnicodeDecodeError:
-            continue
-        except Exception as e:
-            print(f"❌ Erreur lors de la lecture: {e}")
-            return None
-    
-    print("❌ Impossible de détecter l'encodage du fichier")
-    return None
+    try:
+        encodage = detecter_encodage(path)
+        with open(path, "r", encoding=encodage, errors=REPLI_LATIN1) as f:
+            lines = [clean_text(line) for line in f if line.strip()]
+            print(f"✅ Fichier lu avec l'encodage: {encodage}")
+            return lines
+    except Exception as e:
+        print(f"❌ Erreur lors de la lecture: {e}")
+        return None
 
 
 # ================= CLASSE PDF PERSONNALISÉE =================
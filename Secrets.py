@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Détection de secrets exposés dans les logs (préfixes connus et entropie de Shannon) - CYBER FORGE SCAN
+Repère clés d'API, jetons et identifiants encodés dans les lignes, et ne restitue
+que des valeurs masquées
+"""
+
+import hashlib
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # numpy facultatif: histogrammes par Counter, jeton par jeton
+    np = None
+
+__all__ = [
+    "DetecteurSecrets",
+    "MOTIFS_SECRETS",
+    "empreinte_secret",
+    "entropies",
+    "masquer",
+    "masquer_texte",
+]
+
+# Longueur minimale d'un jeton candidat
+LONGUEUR_MIN_SECRET = 20
+
+# Entropie (bits par caractère) au-delà de laquelle un jeton sans préfixe connu est un secret.
+# Un jeton court ne peut pas l'atteindre (au plus log2(longueur) bits): le seuil descend alors
+# à FACTEUR_ENTROPIE * log2(longueur), que dépassent 95 % des jetons base64 aléatoires de
+# 20 caractères, mais ni les chemins, ni les noms d'hôtes, ni les UUID et empreintes hexadécimales.
+SEUIL_ENTROPIE = 4.5
+FACTEUR_ENTROPIE = 0.87
+
+# Secrets reconnus à leur préfixe, quelle que soit leur entropie (type -> motif)
+MOTIFS_SECRETS = {
+    "aws": r"(?:AKIA|ASIA|AGPA|AIDA|AROA|ANPA|ANVA|AIPA)[A-Z0-9]{16}",
+    "github": r"gh[pousr]_[A-Za-z0-9]{36,}|github_pat_[A-Za-z0-9_]{22,}",
+    "gitlab": r"glpat-[A-Za-z0-9_\-]{20,}",
+    "slack": r"xox[abprs]-[A-Za-z0-9\-]{10,}",
+    "stripe": r"[rs]k_live_[A-Za-z0-9]{20,}",
+    "google": r"AIza[A-Za-z0-9_\-]{35}",
+    "jwt": r"eyJ[A-Za-z0-9_\-]+\.eyJ[A-Za-z0-9_\-]+\.[A-Za-z0-9_\-]+",
+}
+
+# Caractères des jetons candidats: base64, base64url, hexadécimal, séparateurs des jetons JWT.
+# Le regard arrière n'essaie le motif qu'en début de suite (pas de retour sur chaque caractère).
+CLASSE_JETON = r"A-Za-z0-9+/_.\-"
+MOTIF_CANDIDAT = rf"(?<![{CLASSE_JETON}])[{CLASSE_JETON}]{{%d,}}={{0,2}}"
+
+# Table de translate() ramenant un bloc à sa classe de caractères: "a" pour ceux des jetons,
+# " " pour les autres. Les suites candidates s'y cherchent par bytes.find, sans expression.
+_OCTETS_JETON = frozenset(b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/_.-")
+_CLASSES = bytes(0x61 if octet in _OCTETS_JETON else 0x20 for octet in range(256))
+
+# Jetons mesurés par lot dans un même histogramme numpy (lot x 256 compteurs)
+LOT_ENTROPIE = 4096
+
+# Jetons déjà classés gardés en mémoire avant réinitialisation (mémoire bornée)
+TAILLE_MEMO = 100_000
+
+# Table de k * log2(k) pour les effectifs des histogrammes
+_N_LOG_N = [0.0] + [k * math.log2(k) for k in range(1, 1025)]
+
+
+def _entropie(jeton: bytes) -> float:
+    """Entropie de Shannon d'un jeton, en bits par octet (histogramme compté par Counter, en C)"""
+    n = len(jeton)
+    effectifs = Counter(jeton).values()
+    if n < len(_N_LOG_N):
+        somme = sum(map(_N_LOG_N.__getitem__, effectifs))
+    else:
+        somme = sum(k * math.log2(k) for k in effectifs)
+    return math.log2(n) - somme / n
+
+
+def entropies(jetons: List[bytes]) -> List[float]:
+    """
+    Entropies de Shannon d'une liste de jetons, en bits par octet
+
+    Avec numpy, les histogrammes d'octets d'un lot de jetons sont comptés d'un seul
+    bincount sur leur concaténation, et les entropies calculées en bloc.
+
+    Args:
+        jetons: Jetons non vides
+
+    Returns:
+        Entropie de chaque jeton, dans l'ordre
+    """
+    if np is None or len(jetons) < 16:
+        return [_entropie(jeton) for jeton in jetons]
+    resultats = []
+    for i in range(0, len(jetons), LOT_ENTROPIE):
+        lot = jetons[i:i + LOT_ENTROPIE]
+        longueurs = np.fromiter(map(len, lot), dtype=np.int64, count=len(lot))
+        octets = np.frombuffer(b"".join(lot), dtype=np.uint8)
+        cases = np.repeat(np.arange(len(lot), dtype=np.int64) * 256, longueurs) + octets
+        effectifs = np.bincount(cases, minlength=len(lot) * 256).astype(np.float64)
+        # 0 log 0 = 1 log 1 = 0
+        n_log_n = (effectifs * np.log2(np.maximum(effectifs, 1.0))).reshape(len(lot), 256).sum(axis=1)
+        resultats.extend((np.log2(longueurs) - n_log_n / longueurs).tolist())
+    return resultats
+
+
+def masquer(valeur: str) -> str:
+    """Valeur masquée: 4 premiers et 2 derniers caractères, longueur cachée"""
+    if len(valeur) < 12:
+        return "*" * 8
+    return f"{valeur[:4]}{'*' * 8}{valeur[-2:]}"
+
+
+def masquer_texte(texte: str, secrets: List[Tuple[int, int, str, float]]) -> str:
+    """Texte dont chaque secret (début, fin, type, entropie), trié par position, est masqué"""
+    morceaux, precedent = [], 0
+    for debut, fin, _, _ in secrets:
+        morceaux.append(texte[precedent:debut])
+        morceaux.append(masquer(texte[debut:fin]))
+        precedent = fin
+    morceaux.append(texte[precedent:])
+    return "".join(morceaux)
+
+
+def empreinte_secret(valeur: str) -> str:
+    """Empreinte courte d'un secret: rapproche ses occurrences sans le révéler"""
+    return hashlib.sha256(valeur.encode("utf-8")).hexdigest()[:12]
+
+# ============================================================================
+# DÉTECTEUR
+# ============================================================================
+
+class DetecteurSecrets:
+    """
+    Recherche de secrets dans une ligne ou un bloc de lignes
+
+    Les jetons candidats (suites d'au moins longueur_min caractères base64) sont
+    isolés par translate et bytes.find sur les octets d'un bloc ou d'une ligne ASCII,
+    à plusieurs centaines de Mo/s, par une expression sur les autres lignes. Un jeton est un secret si son
+    préfixe est connu (MOTIFS_SECRETS) ou si son entropie, calculée en bloc pour
+    les jetons pas encore classés, atteint le seuil de sa longueur.
+    """
+
+    def __init__(self, seuil: float = SEUIL_ENTROPIE, longueur_min: int = LONGUEUR_MIN_SECRET):
+        """
+        Args:
+            seuil: Entropie minimale (bits par caractère) des jetons longs sans préfixe connu
+            longueur_min: Longueur minimale des jetons candidats
+        """
+        self.seuil = seuil
+        self.longueur_min = longueur_min
+        candidat = MOTIF_CANDIDAT % longueur_min
+        connus = "|".join(f"(?P<{nom}>{motif})" for nom, motif in MOTIFS_SECRETS.items())
+        self._candidats = re.compile(candidat)
+        self._suite = b"a" * longueur_min
+        self._connus = re.compile(connus.encode("ascii"))
+        # Jeton -> (longueur du secret, type, entropie) ou None: les chemins, référents
+        # et jetons de session répétés ne sont mesurés qu'une fois
+        self._memo: Dict[bytes, Optional[Tuple[int, str, float]]] = {}
+
+    def seuil_longueur(self, longueur: int) -> float:
+        """Entropie minimale d'un jeton sans préfixe connu de cette longueur"""
+        return min(self.seuil, FACTEUR_ENTROPIE * math.log2(longueur))
+
+    def _jetons_octets(self, bloc: bytes) -> List[Tuple[int, bytes]]:
+        """
+        (début, jeton) des jetons candidats d'un bloc, comme MOTIF_CANDIDAT
+
+        Le bloc ramené à sa classe de caractères (un translate) est parcouru par
+        bytes.find d'une suite de longueur_min "a": la première trouvée après la
+        fin d'un jeton commence forcément le suivant.
+        """
+        classes = bloc.translate(_CLASSES)
+        jetons = []
+        debut = classes.find(self._suite)
+        while debut >= 0:
+            fin = classes.find(b" ", debut)
+            if fin < 0:
+                fin = len(bloc)
+            # Remplissage base64 ("=" ou "==")
+            remplissage = fin
+            while remplissage < len(bloc) and remplissage - fin < 2 and bloc[remplissage] == 0x3D:
+                remplissage += 1
+            jetons.append((debut, bloc[debut:remplissage]))
+            debut = classes.find(self._suite, fin)
+        return jetons
+
+    def rechercher(self, texte: Union[str, bytes]) -> List[Tuple[int, int, str, float]]:
+        """
+        Secrets d'une ligne ou d'un bloc
+
+        Args:
+            texte: Ligne (str) ou bloc de lignes (octets)
+
+        Returns:
+            Liste triée de (début, fin, type, entropie); type "entropie" sans préfixe connu
+        """
+        if isinstance(texte, bytes):
+            jetons = self._jetons_octets(texte)
+        elif texte.isascii():
+            # Ligne ASCII: positions des octets et des caractères confondues
+            jetons = self._jetons_octets(texte.encode("ascii"))
+        else:
+            # Filtre préalable en octets: la plupart des lignes n'ont aucune suite assez longue
+            # (les caractères non encodables ne peuvent que rapprocher deux suites)
+            if self._suite not in texte.encode("utf-8", "ignore").translate(_CLASSES):
+                return []
+            jetons = [(m.start(), m.group().encode("ascii")) for m in self._candidats.finditer(texte)]
+        if not jetons:
+            return []
+        memo = self._memo
+        if len(memo) > TAILLE_MEMO:
+            memo.clear()
+        nouveaux = list(dict.fromkeys(jeton for _, jeton in jetons if jeton not in memo))
+        if nouveaux:
+            for jeton, entropie in zip(nouveaux, entropies(nouveaux)):
+                connu = self._connus.match(jeton)
+                if connu:
+                    memo[jeton] = (connu.end(), connu.lastgroup, entropie)
+                elif entropie >= self.seuil_longueur(len(jeton)):
+                    memo[jeton] = (len(jeton), "entropie", entropie)
+                else:
+                    memo[jeton] = None
+        secrets = []
+        for debut, jeton in jetons:
+            secret = memo[jeton]
+            if secret:
+                secrets.append((debut, debut + secret[0], secret[1], secret[2]))
+        return secrets
@@ -138,10 +138,13 @@ def menu_analyse():
     """Menu Analyse & Extraction"""
     while True:
         print_section("🔍 ANALYSE & EXTRACTION DE DONNÉES")
-        print(f"{Colors.GREEN}[1]{Colors.ENDC} Analyser un fichier log (emails, IPs, dates)")
+        print(f"{Colors.GREEN}[1]{Colors.ENDC} Analyser un fichier log ou un dossier de logs (emails, IPs, dates)")
         print(f"{Colors.GREEN}[2]{Colors.ENDC} Scanner un dossier")
         print(f"{Colors.GREEN}[3]{Colors.ENDC} Lister les gros fichiers")
         print(f"{Colors.GREEN}[4]{Colors.ENDC} Informations détaillées sur fichiers")
+        print(f"{Colors.GREEN}[5]{Colors.ENDC} Surveiller un fichier log en continu (tail -f)")
+        print(f"{Colors.GREEN}[6]{Colors.ENDC} Rechercher une IP, un email ou un lien dans l'index des analyses")
+        print(f"{Colors.GREEN}[7]{Colors.ENDC} Fusionner plusieurs logs en une chronologie")
         print(f"{Colors.GREEN}[0]{Colors.ENDC} Retour au menu principal")
         
         choix = input(f"\n{Colors.YELLOW}Votre choix: {Colors.ENDC}").strip()
@@ -150,12 +153,35 @@ def menu_analyse():
             break
         elif choix == "1":
             try:
-                from Analyse import analyser_fichier_log, afficher
+                from Analyse import analyser_fichier_log, analyser_dossier, afficher, creer_etapes, FICHIER_INDEX
                 print_info("Module d'analyse de fichiers log")
-                chemin = input(f"{Colors.YELLOW}Chemin du fichier à analyser: {Colors.ENDC}").strip()
-                if chemin:
-                    emails, ips, times, dates,urls= analyser_fichier_log(chemin)
-                    afficher(emails, ips, times, dates,urls, chemin)
+                chemin = input(f"{Colors.YELLOW}Chemin du fichier (ou dossier de logs) à analyser: {Colors.ENDC}").strip()
+                rendu = input(f"{Colors.YELLOW}Affichage des alertes (detail/limite/agrege/silencieux, défaut: detail): {Colors.ENDC}").strip() or "detail"
+                sortie = input(f"{Colors.YELLOW}Sortie en flux .ndjson/.csv (vide = rapport texte): {Colors.ENDC}").strip() or None
+                indexer = input(f"{Colors.YELLOW}Ajouter les résultats à l'index {FICHIER_INDEX} (o/N): {Colors.ENDC}").strip().lower()
+                index = FICHIER_INDEX if indexer in ("o", "oui") else None
+                if chemin and os.path.isdir(chemin):
+                    # Dossier: tous les logs, y compris les logs tournés (auth.log.1, ...)
+                    resultats = analyser_dossier(chemin, motifs=["*.log.*"], rendu=rendu,
+                                                 sortie=sortie, index=index)
+                    afficher(*resultats, chemin, autres=resultats.autres)
+                    pause()
+                elif chemin:
+                    listes = input(f"{Colors.YELLOW}Listes IOC à confronter (fichiers ou dossiers séparés par des virgules, vide = aucune): {Colors.ENDC}").strip()
+                    ioc = [liste.strip() for liste in listes.split(",") if liste.strip()] or None
+                    chercher_secrets = input(f"{Colors.YELLOW}Rechercher les secrets exposés: clés d'API, jetons (o/N): {Colors.ENDC}").strip().lower()
+                    fenetre = input(f"{Colors.YELLOW}Fenêtre temporelle d'un log trié (ex: 02:10,02:40 - vide = tout le fichier): {Colors.ENDC}").strip()
+                    depuis, _, jusqua = (borne.strip() or None for borne in fenetre.partition(","))
+                    types = input(f"{Colors.YELLOW}Types d'entités à extraire en plus (ex: ipv6,macs,domaines - vide = empreintes, CVE, ports): {Colors.ENDC}").strip()
+                    entites = [t.strip() for t in types.split(",") if t.strip()] or None
+                    if index and (depuis or jusqua):
+                        print_warning("Fenêtre temporelle: résultats non ajoutés à l'index (réservé aux fichiers entiers)")
+                        index = None
+                    etapes = creer_etapes(ioc=ioc, secrets=chercher_secrets in ("o", "oui"))
+                    resultats = analyser_fichier_log(chemin, rendu=rendu, sortie=sortie, index=index,
+                                                     depuis=depuis, jusqua=jusqua, entites=entites,
+                                                     etapes=etapes)
+                    afficher(*resultats, chemin, autres=resultats.autres)
                     #print(urls)
                     pause()
             except Exception as e:
@@ -209,6 +235,47 @@ def menu_analyse():
             except Exception as e:
                 print_error(f"Erreur: {e}")
                 pause()
+        
+        elif choix == "5":
+            try:
+                from Analyse import suivre_fichier_log, afficher
+                print_info("Surveillance continue d'un fichier log")
+                chemin = input(f"{Colors.YELLOW}Chemin du fichier à surveiller: {Colors.ENDC}").strip()
+                if chemin:
+                    resultats = suivre_fichier_log(chemin)
+                    afficher(*resultats, chemin, autres=resultats.autres)
+                    pause()
+            except Exception as e:
+                print_error(f"Erreur: {e}")
+                pause()
+
+        elif choix == "6":
+            try:
+                from Analyse import rechercher_index
+                print_info("Recherche dans l'index des analyses")
+                valeur = input(f"{Colors.YELLOW}Valeur recherchée (préfixe terminé par *, ex: 10.0.0.*): {Colors.ENDC}").strip()
+                if valeur:
+                    rechercher_index(valeur)
+                    pause()
+            except Exception as e:
+                print_error(f"Erreur: {e}")
+                pause()
+
+        elif choix == "7":
+            try:
+                from Analyse import analyser_logs_fusionnes, afficher
+                print_info("Fusion chronologique de plusieurs logs")
+                saisie = input(f"{Colors.YELLOW}Fichiers log triés à fusionner (séparés par des virgules): {Colors.ENDC}").strip()
+                chemins = [chemin.strip() for chemin in saisie.split(",") if chemin.strip()]
+                if chemins:
+                    rendu = input(f"{Colors.YELLOW}Affichage des alertes (detail/limite/agrege/silencieux, défaut: detail): {Colors.ENDC}").strip() or "detail"
+                    fil = input(f"{Colors.YELLOW}Fichier de la chronologie fusionnée (vide = aucun): {Colors.ENDC}").strip() or None
+                    resultats = analyser_logs_fusionnes(chemins, rendu=rendu, fil_chronologique=fil)
+                    afficher(*resultats, ", ".join(chemins), autres=resultats.autres)
+                    pause()
+            except Exception as e:
+                print_error(f"Erreur: {e}")
+                pause()
         else:
             print_error("Choix invalide")
             time.sleep(1)